@@ -1,10 +1,20 @@
 from .tenant import TenantMiddleware, get_current_tenant, get_tenant_id, get_tenant_slug, require_tenant
+from .tenant_cache import (
+    TenantSnapshot, resolve_tenant, resolve_active_tenant, invalidate_tenant,
+    on_tenant_invalidated, tenant_cache_stats
+)
 
 __all__ = [
     'TenantMiddleware',
     'get_current_tenant',
     'get_tenant_id', 
     'get_tenant_slug',
-    'require_tenant'
+    'require_tenant',
+    'TenantSnapshot',
+    'resolve_tenant',
+    'resolve_active_tenant',
+    'invalidate_tenant',
+    'on_tenant_invalidated',
+    'tenant_cache_stats'
 ]
 
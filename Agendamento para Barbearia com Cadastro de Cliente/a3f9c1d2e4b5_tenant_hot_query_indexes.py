@@ -0,0 +1,36 @@
+"""Índices compostos para as consultas mais frequentes por tenant
+
+Revision ID: a3f9c1d2e4b5
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a3f9c1d2e4b5'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (nome, tabela, colunas) - espelham os __table_args__ dos modelos
+INDEXES = [
+    ('ix_appointments_tenant_date', 'appointments', ['tenant_id', 'appointment_date']),
+    ('ix_appointments_staff_date_status', 'appointments', ['staff_id', 'appointment_date', 'status']),
+    ('ix_clients_tenant_phone', 'clients', ['tenant_id', 'phone']),
+    ('ix_clients_tenant_email', 'clients', ['tenant_id', 'email']),
+    ('ix_clients_tenant_active_name', 'clients', ['tenant_id', 'is_active', 'name']),
+    ('ix_staff_tenant_active_name', 'staff', ['tenant_id', 'is_active', 'name']),
+    ('ix_services_tenant_active_name', 'services', ['tenant_id', 'is_active', 'name']),
+]
+
+
+def upgrade():
+    # init_db pode já ter criado os índices em bancos novos
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
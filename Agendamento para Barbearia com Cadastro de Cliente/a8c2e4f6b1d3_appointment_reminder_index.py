@@ -0,0 +1,23 @@
+"""Índice de agendamentos por data para a janela de lembretes
+
+Revision ID: a8c2e4f6b1d3
+Revises: f1b3d5e7a9c2
+Create Date: 2026-10-18 18:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a8c2e4f6b1d3'
+down_revision = 'f1b3d5e7a9c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # init_db pode já ter criado o índice em bancos novos
+    op.create_index('ix_appointments_date_status', 'appointments', ['appointment_date', 'status'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_appointments_date_status', table_name='appointments', if_exists=True)
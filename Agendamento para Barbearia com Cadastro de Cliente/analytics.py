@@ -0,0 +1,145 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from src.models import db, Service, Staff
+from src.middleware.tenant import get_current_tenant
+from src.utils.availability import WEEKDAYS
+from src.utils.rollups import period_range
+from src.utils.analytics_engine import (
+    GROUP_KEYS, load_frame, load_staff_schedules, group_revenue, hour_histogram,
+    occupancy, cached_result
+)
+from datetime import datetime
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# Limite do intervalo personalizado (dois anos)
+MAX_RANGE_DAYS = 731
+
+def _get_range(args):
+    """Período pedido: start/end (YYYY-MM-DD) ou period=week|month|year"""
+    if args.get('start') or args.get('end'):
+        try:
+            start = datetime.strptime(args['start'], '%Y-%m-%d').date()
+            end = datetime.strptime(args['end'], '%Y-%m-%d').date()
+        except (KeyError, ValueError):
+            raise ValueError('Informe start e end no formato YYYY-MM-DD')
+        if end < start:
+            raise ValueError('end deve ser posterior a start')
+        if (end - start).days + 1 > MAX_RANGE_DAYS:
+            raise ValueError(f'Intervalo máximo de {MAX_RANGE_DAYS} dias')
+        return start, end
+    return period_range(args.get('period', 'month'))
+
+def _cache_ttl():
+    return current_app.config.get('ANALYTICS_CACHE_TTL', 300)
+
+def _labels(group_by, tenant_id, keys):
+    """Nomes legíveis das chaves agrupadas"""
+    if group_by == 'weekday':
+        return {key: WEEKDAYS[key] for key in keys}
+    if group_by == 'hour':
+        return {key: f'{key:02d}:00' for key in keys}
+    model = Staff if group_by == 'staff' else Service
+    if not keys:
+        return {}
+    return dict(
+        db.session.query(model.id, model.name).filter(
+            model.tenant_id == tenant_id,
+            model.id.in_(keys)
+        )
+    )
+
+@analytics_bp.route('/revenue', methods=['GET'])
+@jwt_required()
+def get_revenue():
+    """Receita agrupada por funcionário, serviço, dia da semana ou hora"""
+    try:
+        tenant = get_current_tenant()
+        if not tenant:
+            return jsonify({'error': 'Tenant não encontrado'}), 404
+        
+        group_by = request.args.get('group_by', 'staff')
+        if group_by not in GROUP_KEYS:
+            return jsonify({'error': f'group_by deve ser um de: {", ".join(GROUP_KEYS)}'}), 400
+        
+        try:
+            start, end = _get_range(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def compute():
+            groups = group_revenue(load_frame(tenant.id, start, end), group_by)
+            labels = _labels(group_by, tenant.id, [group['key'] for group in groups])
+            for group in groups:
+                group['label'] = labels.get(group['key'])
+            return groups
+        
+        groups = cached_result(tenant.id, 'revenue', start, end, compute, ttl=_cache_ttl(), group_by=group_by)
+        
+        return jsonify({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'group_by': group_by,
+            'groups': groups
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/hours', methods=['GET'])
+@jwt_required()
+def get_hour_histogram():
+    """Distribuição dos agendamentos por hora de início"""
+    try:
+        tenant = get_current_tenant()
+        if not tenant:
+            return jsonify({'error': 'Tenant não encontrado'}), 404
+        
+        try:
+            start, end = _get_range(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        histogram = cached_result(
+            tenant.id, 'hours', start, end,
+            lambda: hour_histogram(load_frame(tenant.id, start, end)),
+            ttl=_cache_ttl()
+        )
+        
+        return jsonify({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'histogram': histogram
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/occupancy', methods=['GET'])
+@jwt_required()
+def get_occupancy():
+    """Percentual de ocupação das cadeiras por funcionário e por hora do dia"""
+    try:
+        tenant = get_current_tenant()
+        if not tenant:
+            return jsonify({'error': 'Tenant não encontrado'}), 404
+        
+        try:
+            start, end = _get_range(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def compute():
+            schedules = load_staff_schedules(tenant.id)
+            result = occupancy(load_frame(tenant.id, start, end), schedules, start, end)
+            labels = _labels('staff', tenant.id, [staff_id for staff_id, _ in schedules])
+            for staff in result['staff']:
+                staff['name'] = labels.get(staff['staff_id'])
+            return result
+        
+        result = cached_result(tenant.id, 'occupancy', start, end, compute, ttl=_cache_ttl())
+        
+        return jsonify(dict(result, start=start.isoformat(), end=end.isoformat())), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,265 @@
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import select
+from src.models import db, Appointment, Staff
+from src.models.appointment import AppointmentStatus
+from src.utils.schedule import cached_schedule
+from src.utils.cache import LRUTTLCache, MISSING
+from src.utils.client_stats import UNCOUNTED_STATUSES
+
+MINUTES_PER_DAY = 24 * 60
+
+# Códigos numéricos dos status (posição na enumeração)
+STATUS_CODES = {status: code for code, status in enumerate(AppointmentStatus)}
+UNCOUNTED_CODES = np.array([STATUS_CODES[status] for status in UNCOUNTED_STATUSES])
+COMPLETED_CODE = STATUS_CODES[AppointmentStatus.COMPLETED]
+
+GROUP_KEYS = ('staff', 'service', 'weekday', 'hour')
+
+_results = LRUTTLCache(max_size=256, ttl=300)
+
+class AppointmentFrame:
+    """Colunas dos agendamentos de um período como arrays NumPy"""
+
+    def __init__(self, start_minutes, duration, price, staff_id, service_id, status):
+        # Minutos desde 1970-01-01 (horário local, como appointment_date)
+        self.start_minutes = start_minutes
+        self.duration = duration
+        self.price = price
+        self.staff_id = staff_id
+        self.service_id = service_id
+        self.status = status
+        self.counted = ~np.isin(status, UNCOUNTED_CODES)
+
+    def __len__(self):
+        return len(self.start_minutes)
+
+    @property
+    def day(self):
+        return self.start_minutes // MINUTES_PER_DAY
+
+    @property
+    def weekday(self):
+        # 1970-01-01 foi quinta-feira; 0 = segunda-feira, como date.weekday()
+        return (self.day + 3) % 7
+
+    @property
+    def hour(self):
+        return (self.start_minutes % MINUTES_PER_DAY) // 60
+
+    def keys(self, group_by):
+        if group_by == 'staff':
+            return self.staff_id
+        if group_by == 'service':
+            return self.service_id
+        if group_by == 'weekday':
+            return self.weekday
+        if group_by == 'hour':
+            return self.hour
+        raise ValueError(f'Agrupamento inválido: {group_by}')
+
+def _epoch_minutes(value):
+    return int((value - datetime(1970, 1, 1)).total_seconds() // 60)
+
+def load_frame(tenant_id, start, end):
+    """Carregar as colunas dos agendamentos do período [start, end] com uma consulta"""
+    range_start = datetime.combine(start, datetime.min.time())
+    range_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+    stmt = select(
+        Appointment.appointment_date,
+        Appointment.duration_minutes,
+        Appointment.final_price,
+        Appointment.staff_id,
+        Appointment.service_id,
+        Appointment.status
+    ).where(
+        Appointment.tenant_id == tenant_id,
+        Appointment.appointment_date >= range_start,
+        Appointment.appointment_date < range_end
+    )
+    rows = db.session.execute(stmt).all()
+
+    count = len(rows)
+    if not count:
+        empty = np.zeros(0, dtype=np.int64)
+        return AppointmentFrame(empty, empty, np.zeros(0), empty, empty, empty)
+
+    dates, durations, prices, staff_ids, service_ids, statuses = zip(*rows)
+    return AppointmentFrame(
+        start_minutes=np.fromiter((_epoch_minutes(value) for value in dates), dtype=np.int64, count=count),
+        duration=np.fromiter((value or 0 for value in durations), dtype=np.int64, count=count),
+        price=np.fromiter((value or 0.0 for value in prices), dtype=np.float64, count=count),
+        staff_id=np.fromiter(staff_ids, dtype=np.int64, count=count),
+        service_id=np.fromiter(service_ids, dtype=np.int64, count=count),
+        status=np.fromiter((STATUS_CODES[value] for value in statuses), dtype=np.int64, count=count)
+    )
+
+def group_revenue(frame, group_by):
+    """Receita, quantidade e ticket médio por chave, com bincount sobre índices agrupados"""
+    keys = frame.keys(group_by)
+    if not len(frame):
+        return []
+
+    unique, inverse = np.unique(keys, return_inverse=True)
+    counted = frame.counted
+    completed = frame.status == COMPLETED_CODE
+
+    count = np.bincount(inverse, weights=counted, minlength=len(unique))
+    revenue = np.bincount(inverse, weights=frame.price * counted, minlength=len(unique))
+    completed_revenue = np.bincount(inverse, weights=frame.price * completed, minlength=len(unique))
+    cancelled = np.bincount(inverse, weights=~counted, minlength=len(unique))
+
+    average = np.divide(revenue, count, out=np.zeros_like(revenue), where=count > 0)
+    return [
+        {
+            'key': int(key),
+            'appointments': int(count[index]),
+            'cancelled': int(cancelled[index]),
+            'revenue': round(float(revenue[index]), 2),
+            'completed_revenue': round(float(completed_revenue[index]), 2),
+            'average_ticket': round(float(average[index]), 2)
+        }
+        for index, key in enumerate(unique)
+    ]
+
+def hour_histogram(frame):
+    """Quantidade de agendamentos que contam por hora de início (24 posições)"""
+    return np.bincount(frame.hour[frame.counted], minlength=24).tolist()
+
+def merge_intervals(staff_id, start_minutes, end_minutes):
+    """Fundir intervalos sobrepostos de cada funcionário de forma vetorizada
+
+    Cada funcionário é deslocado para uma faixa própria da reta, então uma
+    única ordenação e um máximo acumulado fundem todos ao mesmo tempo.
+    Retorna (staff, owner, starts, ends): os funcionários distintos e, por
+    bloco, o índice do dono em `staff` e os limites em minutos da época.
+    """
+    staff, staff_index = np.unique(staff_id, return_inverse=True)
+    if not len(staff_id):
+        empty = np.zeros(0, dtype=np.int64)
+        return staff, empty, empty, empty
+
+    span = int(end_minutes.max() - start_minutes.min()) + 1
+    offset = staff_index * span - int(start_minutes.min())
+    starts = start_minutes + offset
+    ends = end_minutes + offset
+
+    order = np.argsort(starts, kind='stable')
+    starts = starts[order]
+    ends = ends[order]
+    offset = offset[order]
+    owners = staff_index[order]
+
+    # Um novo bloco começa quando o início passa do maior fim anterior
+    running_end = np.maximum.accumulate(ends)
+    new_block = np.empty(len(starts), dtype=bool)
+    new_block[0] = True
+    new_block[1:] = starts[1:] > running_end[:-1]
+    block_starts = np.flatnonzero(new_block)
+
+    block_offset = offset[block_starts]
+    return (
+        staff,
+        owners[block_starts],
+        starts[block_starts] - block_offset,
+        np.maximum.reduceat(ends, block_starts) - block_offset
+    )
+
+def minute_profile(start_minutes, end_minutes):
+    """Soma de intervalos por minuto do dia (array de 1440) via vetor de diferenças"""
+    day_start = start_minutes - start_minutes % MINUTES_PER_DAY
+    first = start_minutes - day_start
+    last = np.minimum(end_minutes - day_start, MINUTES_PER_DAY)
+
+    diff = np.zeros(MINUTES_PER_DAY + 1, dtype=np.int64)
+    np.add.at(diff, first, 1)
+    np.add.at(diff, last, -1)
+    return np.cumsum(diff[:-1])
+
+def work_intervals(staff_schedules, start, end):
+    """Expedientes (staff_id, início, fim) em minutos desde a época para cada dia do período"""
+    staff_ids, starts, ends = [], [], []
+    day = start
+    while day <= end:
+        base = _epoch_minutes(datetime.combine(day, datetime.min.time()))
+        for staff_id, schedule in staff_schedules:
+            for interval_start, interval_end in schedule.day(day).intervals:
+                staff_ids.append(staff_id)
+                starts.append(base + interval_start)
+                ends.append(base + interval_end)
+        day += timedelta(days=1)
+    return (
+        np.array(staff_ids, dtype=np.int64),
+        np.array(starts, dtype=np.int64),
+        np.array(ends, dtype=np.int64)
+    )
+
+def occupancy(frame, staff_schedules, start, end):
+    """Ocupação das cadeiras: minutos agendados sobre minutos de expediente"""
+    busy_start = frame.start_minutes[frame.counted]
+    busy_end = busy_start + frame.duration[frame.counted]
+    busy_staff = frame.staff_id[frame.counted]
+
+    work_staff, work_start, work_end = work_intervals(staff_schedules, start, end)
+    capacity = {}
+    if len(work_staff):
+        unique_staff, staff_index = np.unique(work_staff, return_inverse=True)
+        totals = np.bincount(staff_index, weights=work_end - work_start)
+        capacity = dict(zip(unique_staff.tolist(), totals.tolist()))
+
+    # Blocos fundidos: sobreposições do mesmo funcionário contam uma vez só
+    staff_ids, owners, block_start, block_end = merge_intervals(busy_staff, busy_start, busy_end)
+    booked_totals = np.bincount(owners, weights=block_end - block_start, minlength=len(staff_ids))
+    busy = dict(zip(staff_ids.tolist(), booked_totals.tolist()))
+
+    staff = []
+    for staff_id, _ in staff_schedules:
+        available = capacity.get(staff_id, 0.0)
+        booked = busy.get(staff_id, 0.0)
+        staff.append({
+            'staff_id': staff_id,
+            'booked_minutes': int(booked),
+            'available_minutes': int(available),
+            'occupancy': round(booked / available * 100, 1) if available else None
+        })
+
+    # Perfil por hora: cadeiras ocupadas / cadeiras em expediente no mesmo minuto
+    booked_profile = minute_profile(block_start, block_end) if len(block_start) else np.zeros(MINUTES_PER_DAY)
+    capacity_profile = minute_profile(work_start, work_end) if len(work_start) else np.zeros(MINUTES_PER_DAY)
+    booked_hours = booked_profile.reshape(24, 60).sum(axis=1)
+    capacity_hours = capacity_profile.reshape(24, 60).sum(axis=1)
+    by_hour = np.divide(
+        booked_hours * 100.0, capacity_hours,
+        out=np.zeros(24), where=capacity_hours > 0
+    )
+
+    total_available = float(sum(capacity.values()))
+    total_booked = float(sum(busy.values()))
+    return {
+        'occupancy': round(total_booked / total_available * 100, 1) if total_available else None,
+        'staff': staff,
+        'by_hour': [round(float(value), 1) for value in by_hour]
+    }
+
+def cached_result(tenant_id, kind, start, end, compute, ttl=None, **params):
+    """Resultado memorizado por tenant, tipo, período e parâmetros"""
+    key = (tenant_id, kind, start, end) + tuple(sorted(params.items()))
+    result = _results.get(key)
+    if result is MISSING:
+        result = compute()
+        _results.set(key, result, ttl=ttl)
+    return result
+
+def load_staff_schedules(tenant_id):
+    """Pares (staff_id, WorkSchedule compilado) dos funcionários ativos"""
+    rows = db.session.query(Staff.id, Staff.updated_at, Staff.work_schedule).filter_by(
+        tenant_id=tenant_id, is_active=True
+    ).order_by(Staff.id)
+    return [
+        (staff_id, cached_schedule(staff_id, updated_at or work_schedule, work_schedule))
+        for staff_id, updated_at, work_schedule in rows
+    ]
+
+def analytics_cache_stats():
+    return _results.stats()
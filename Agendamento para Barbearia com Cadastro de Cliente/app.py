@@ -4,6 +4,12 @@ import sqlite3
 import datetime
 import os
 import re
+import random
+import smtplib
+import threading
+import queue
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from email.message import EmailMessage
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -11,11 +17,45 @@ CORS(app)  # Enable CORS for all routes
 # Database configuration
 DATABASE = 'database.db'
 
+# SQLite tuning: seconds to wait on a locked database, per-connection statement
+# cache size and how long a request waits for the booking writer
+DB_BUSY_TIMEOUT = 5.0
+DB_CACHED_STATEMENTS = 256
+DB_WRITE_TIMEOUT = 10.0
+
+# One connection per thread, reused across requests
+_local = threading.local()
+
+# INSERT ... RETURNING needs SQLite 3.35+ (ON CONFLICT upserts need 3.24+)
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# SMTP configuration (emails are only logged when SMTP_SERVER is not set)
+SMTP_SERVER = os.environ.get('SMTP_SERVER')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', 587))
+SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'True').lower() == 'true'
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+SMTP_SENDER = os.environ.get('SMTP_SENDER')
+SMTP_TIMEOUT = 10
+
+# Notification outbox: batch size, idle poll interval and retry policy (seconds)
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_POLL_INTERVAL = 15
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BASE = 30
+OUTBOX_RETRY_MAX = 6 * 60 * 60
+
+# Wakes the worker right after a booking commits
+notification_event = threading.Event()
+
 def init_db():
     """Initialize the database with required tables"""
     conn = sqlite3.connect(DATABASE)
     cursor = conn.cursor()
     
+    # WAL lets readers proceed while a booking is being written (persists in the file)
+    cursor.execute('PRAGMA journal_mode=WAL')
+    
     # Create clientes table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS clientes (
@@ -40,15 +80,175 @@ def init_db():
         )
     ''')
     
+    # Create notificacoes table (outbox drained by the notification worker)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notificacoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chave TEXT NOT NULL UNIQUE,
+            destinatario TEXT NOT NULL,
+            assunto TEXT NOT NULL,
+            corpo TEXT NOT NULL,
+            status TEXT DEFAULT 'pendente',
+            tentativas INTEGER DEFAULT 0,
+            proxima_tentativa DATETIME DEFAULT CURRENT_TIMESTAMP,
+            ultimo_erro TEXT,
+            data_criacao DATETIME DEFAULT CURRENT_TIMESTAMP,
+            data_envio DATETIME
+        )
+    ''')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_notificacoes_status_proxima ON notificacoes (status, proxima_tentativa)'
+    )
+    
     conn.commit()
+    
+    # Bring existing databases up to date
+    migrate_db(conn)
     conn.close()
 
+def migrate_agendamentos_indexes(cursor):
+    """Index slot lookups and make double-booking impossible"""
+    # Older databases may already hold double bookings: keep the first one of each slot
+    cursor.execute('''
+        UPDATE agendamentos SET status = 'cancelado'
+        WHERE status = 'agendado' AND id NOT IN (
+            SELECT MIN(id) FROM agendamentos WHERE status = 'agendado'
+            GROUP BY data_agendamento, horario
+        )
+    ''')
+    
+    # Used by horarios_disponiveis and the booking slot check
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_agendamentos_data_horario_status
+        ON agendamentos (data_agendamento, horario, status)
+    ''')
+    
+    # At most one active booking per slot
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_agendamentos_horario_agendado
+        ON agendamentos (data_agendamento, horario) WHERE status = 'agendado'
+    ''')
+
+# Schema migrations, applied in order; PRAGMA user_version stores how many ran
+SCHEMA_MIGRATIONS = [
+    migrate_agendamentos_indexes,
+]
+
+def migrate_db(conn):
+    """Apply pending schema migrations in a single transaction"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= len(SCHEMA_MIGRATIONS):
+        return
+    
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        for migration in SCHEMA_MIGRATIONS[version:]:
+            migration(cursor)
+        cursor.execute(f'PRAGMA user_version = {len(SCHEMA_MIGRATIONS)}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+class ThreadConnection(sqlite3.Connection):
+    """Connection reused by its thread: close() only ends an open transaction"""
+    
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
 def get_db_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
+    """Get this thread's database connection (opened once, WAL mode)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(
+            DATABASE,
+            timeout=DB_BUSY_TIMEOUT,
+            factory=ThreadConnection,
+            cached_statements=DB_CACHED_STATEMENTS
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT * 1000)}')
+        _local.conn = conn
     return conn
 
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Never leave a transaction open on a reused connection"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+
+class WriterBusyError(Exception):
+    """Booking writer did not pick the job up in time"""
+
+class WriterQueue:
+    """Runs write jobs one at a time on a dedicated thread and connection
+    
+    Bookings no longer compete for SQLite's write lock: requests queue up
+    here and each job runs in its own BEGIN IMMEDIATE transaction.
+    """
+    
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='escritor-agendamentos', daemon=True)
+                self._thread.start()
+    
+    def submit(self, func, *args):
+        """Run func(conn, *args) in the writer thread and return its result (or raise its error)"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((func, args, future))
+        try:
+            return future.result(timeout=DB_WRITE_TIMEOUT)
+        except FutureTimeoutError:
+            # Still queued: drop it so it never commits after the client got an error
+            if future.cancel():
+                raise WriterBusyError()
+            # Already running: its outcome is the booking's outcome
+            return future.result()
+    
+    def stop(self):
+        """Finish the queued jobs, then end the writer thread and close its connection"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+    
+    def _run(self):
+        conn = get_db_connection()
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            func, args, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                result = func(conn, *args)
+                conn.commit()
+            except BaseException as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        sqlite3.Connection.close(conn)
+        del _local.conn
+
+booking_writer = WriterQueue()
+
 def validate_email(email):
     """Validate email format"""
     pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
@@ -61,13 +261,9 @@ def validate_phone(phone):
     # Check if it has 10 or 11 digits (Brazilian phone format)
     return len(digits_only) in [10, 11]
 
-def send_confirmation_email(cliente_data, agendamento_data):
-    """Send confirmation email to client and notification to owner"""
-    try:
-        # Email configuration (you would need to set up SMTP credentials)
-        # For demo purposes, we'll just log the email content
-        
-        email_content = f"""
+def build_confirmation_email(cliente_data, agendamento_data):
+    """Build subject and body of the confirmation email"""
+    email_content = f"""
         Olá {cliente_data['nome']},
         
         Seu agendamento foi confirmado com sucesso!
@@ -82,14 +278,170 @@ def send_confirmation_email(cliente_data, agendamento_data):
         Atenciosamente,
         Equipe Barbearia Clássica
         """
-        
-        print(f"Email enviado para {cliente_data['email']}:")
-        print(email_content)
-        
-        return True
-    except Exception as e:
-        print(f"Erro ao enviar email: {e}")
-        return False
+    return 'Agendamento confirmado - Barbearia Clássica', email_content
+
+def enqueue_confirmation_email(cursor, appointment_id, cliente_data, agendamento_data):
+    """Queue the confirmation email in the caller's transaction (ignored if already queued)"""
+    subject, body = build_confirmation_email(cliente_data, agendamento_data)
+    cursor.execute(
+        'INSERT OR IGNORE INTO notificacoes (chave, destinatario, assunto, corpo, proxima_tentativa) '
+        'VALUES (?, ?, ?, ?, ?)',
+        (f'agendamento:{appointment_id}:confirmacao', cliente_data['email'], subject, body, utc_timestamp())
+    )
+
+def utc_timestamp(delay_seconds=0):
+    """UTC timestamp in SQLite's CURRENT_TIMESTAMP format"""
+    moment = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay_seconds)
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, in seconds"""
+    delay = min(OUTBOX_RETRY_BASE * 2 ** (attempts - 1), OUTBOX_RETRY_MAX)
+    return int(delay * random.uniform(0.8, 1.2))
+
+def deliver_batch(rows):
+    """Send a batch over a single SMTP connection; returns {id: error} for failed messages"""
+    if not SMTP_SERVER:
+        # No SMTP credentials configured: log the email content (demo mode)
+        for row in rows:
+            print(f"Email enviado para {row['destinatario']}:")
+            print(row['corpo'])
+        return {}
+    
+    try:
+        smtp = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_USE_TLS:
+            smtp.starttls()
+        if SMTP_USERNAME:
+            smtp.login(SMTP_USERNAME, SMTP_PASSWORD)
+    except (smtplib.SMTPException, OSError) as e:
+        return {row['id']: f'Falha na conexão SMTP: {e}' for row in rows}
+    
+    errors = {}
+    try:
+        for index, row in enumerate(rows):
+            message = EmailMessage()
+            message['From'] = SMTP_SENDER or SMTP_USERNAME
+            message['To'] = row['destinatario']
+            message['Subject'] = row['assunto']
+            message.set_content(row['corpo'])
+            try:
+                smtp.send_message(message)
+            except smtplib.SMTPServerDisconnected as e:
+                # Connection lost: the rest of the batch goes back to the queue
+                for pending in rows[index:]:
+                    errors[pending['id']] = f'Conexão SMTP encerrada: {e}'
+                break
+            except (smtplib.SMTPException, OSError) as e:
+                errors[row['id']] = str(e)
+    finally:
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+    return errors
+
+def process_notifications():
+    """Send one batch of due notifications; returns how many were processed"""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            "SELECT id, destinatario, assunto, corpo, tentativas FROM notificacoes "
+            "WHERE status = 'pendente' AND proxima_tentativa <= ? "
+            "ORDER BY proxima_tentativa, id LIMIT ?",
+            (utc_timestamp(), OUTBOX_BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            return 0
+        
+        errors = deliver_batch(rows)
+        for row in rows:
+            attempts = row['tentativas'] + 1
+            if row['id'] not in errors:
+                conn.execute(
+                    "UPDATE notificacoes SET status = 'enviado', tentativas = ?, ultimo_erro = NULL, "
+                    "data_envio = ? WHERE id = ?",
+                    (attempts, utc_timestamp(), row['id'])
+                )
+            elif attempts >= OUTBOX_MAX_ATTEMPTS:
+                conn.execute(
+                    "UPDATE notificacoes SET status = 'falhou', tentativas = ?, ultimo_erro = ? WHERE id = ?",
+                    (attempts, errors[row['id']], row['id'])
+                )
+            else:
+                conn.execute(
+                    "UPDATE notificacoes SET tentativas = ?, ultimo_erro = ?, proxima_tentativa = ? WHERE id = ?",
+                    (attempts, errors[row['id']], utc_timestamp(retry_delay(attempts)), row['id'])
+                )
+        conn.commit()
+        return len(rows)
+    finally:
+        conn.close()
+
+def notification_worker():
+    """Background loop draining the notification outbox"""
+    while True:
+        processed = 0
+        try:
+            processed = process_notifications()
+        except Exception as e:
+            print(f"Erro ao processar notificações: {e}")
+        
+        # A full batch means more messages may be due
+        if processed < OUTBOX_BATCH_SIZE:
+            notification_event.wait(OUTBOX_POLL_INTERVAL)
+            notification_event.clear()
+
+def start_notification_worker():
+    """Start the outbox worker thread (once per process)"""
+    thread = threading.Thread(target=notification_worker, name='notificacoes', daemon=True)
+    thread.start()
+    return thread
+
+class SlotTakenError(Exception):
+    """Requested time slot is already booked"""
+
+UPSERT_CLIENT_SQL = '''
+    INSERT INTO clientes (nome, email, telefone) VALUES (?, ?, ?)
+    ON CONFLICT(email) DO UPDATE SET nome = excluded.nome, telefone = excluded.telefone
+'''
+
+def upsert_client(cursor, nome, email, telefone):
+    """Insert or update a client by email in one statement; returns the client id"""
+    params = (nome, email, telefone)
+    if SQLITE_HAS_RETURNING:
+        return cursor.execute(UPSERT_CLIENT_SQL + ' RETURNING id', params).fetchone()[0]
+    
+    # lastrowid is not reliable when the upsert updates, so read the id back
+    cursor.execute(UPSERT_CLIENT_SQL, params)
+    return cursor.execute('SELECT id FROM clientes WHERE email = ?', (email,)).fetchone()[0]
+
+def book_appointment(conn, data):
+    """Create or update the client, book the slot and queue the confirmation (runs in the writer thread)"""
+    cursor = conn.cursor()
+    
+    # Create the client or update their info
+    client_id = upsert_client(cursor, data['nome'], data['email'], data['telefone'])
+    
+    # Create appointment; the partial unique index rejects a taken slot
+    try:
+        cursor.execute(
+            'INSERT INTO agendamentos (cliente_id, data_agendamento, horario) VALUES (?, ?, ?)',
+            (client_id, data['data'], data['horario'])
+        )
+    except sqlite3.IntegrityError:
+        raise SlotTakenError()
+    
+    appointment_id = cursor.lastrowid
+    
+    # Queue confirmation email in the same transaction; the worker sends it
+    agendamento_data = {
+        'data_agendamento': data['data'],
+        'horario': data['horario']
+    }
+    enqueue_confirmation_email(cursor, appointment_id, data, agendamento_data)
+    
+    return appointment_id
 
 # Routes
 @app.route('/')
@@ -186,62 +538,15 @@ def criar_agendamento():
         if appointment_date.weekday() == 6:  # Sunday = 6
             return jsonify({'error': 'Não atendemos aos domingos'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if client exists, if not create
-        client = cursor.execute(
-            'SELECT id FROM clientes WHERE email = ?', (data['email'],)
-        ).fetchone()
-        
-        if client:
-            client_id = client['id']
-            # Update client info if needed
-            cursor.execute(
-                'UPDATE clientes SET nome = ?, telefone = ? WHERE id = ?',
-                (data['nome'], data['telefone'], client_id)
-            )
-        else:
-            # Create new client
-            cursor.execute(
-                'INSERT INTO clientes (nome, email, telefone) VALUES (?, ?, ?)',
-                (data['nome'], data['email'], data['telefone'])
-            )
-            client_id = cursor.lastrowid
-        
-        # Check if time slot is available
-        existing_appointment = cursor.execute(
-            'SELECT id FROM agendamentos WHERE data_agendamento = ? AND horario = ? AND status = "agendado"',
-            (data['data'], data['horario'])
-        ).fetchone()
-        
-        if existing_appointment:
-            conn.close()
+        # All booking writes go through the single writer thread
+        try:
+            appointment_id = booking_writer.submit(book_appointment, data)
+        except SlotTakenError:
             return jsonify({'error': 'Horário já ocupado'}), 400
+        except WriterBusyError:
+            return jsonify({'error': 'Muitos agendamentos simultâneos, tente novamente'}), 503
         
-        # Create appointment
-        cursor.execute(
-            'INSERT INTO agendamentos (cliente_id, data_agendamento, horario) VALUES (?, ?, ?)',
-            (client_id, data['data'], data['horario'])
-        )
-        
-        appointment_id = cursor.lastrowid
-        conn.commit()
-        
-        # Get client data for email
-        client_data = cursor.execute(
-            'SELECT * FROM clientes WHERE id = ?', (client_id,)
-        ).fetchone()
-        
-        conn.close()
-        
-        # Send confirmation email
-        agendamento_data = {
-            'data_agendamento': data['data'],
-            'horario': data['horario']
-        }
-        
-        send_confirmation_email(dict(client_data), agendamento_data)
+        notification_event.set()
         
         return jsonify({
             'message': 'Agendamento criado com sucesso',
@@ -288,7 +593,7 @@ def horarios_disponiveis(data):
         cursor = conn.cursor()
         
         booked_times = cursor.execute(
-            'SELECT horario FROM agendamentos WHERE data_agendamento = ? AND status = "agendado"',
+            "SELECT horario FROM agendamentos WHERE data_agendamento = ? AND status = 'agendado'",
             (data,)
         ).fetchall()
         
@@ -347,6 +652,10 @@ if __name__ == '__main__':
     # Initialize database
     init_db()
     
+    # Start the notification worker (only in the reloader child that serves requests)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_notification_worker()
+    
     # Run the app
     app.run(host='0.0.0.0', port=5000, debug=True)
 
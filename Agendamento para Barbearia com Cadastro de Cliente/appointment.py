@@ -1,5 +1,5 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Enum
+from datetime import datetime, timedelta
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Enum, Index, DDL, event, and_
 from sqlalchemy.orm import relationship
 from . import db
 import enum
@@ -13,9 +13,26 @@ class AppointmentStatus(enum.Enum):
     CANCELLED = "cancelled"      # Cancelado
     NO_SHOW = "no_show"         # Não compareceu
 
+# Status que ocupam o horário do funcionário
+BLOCKING_STATUSES = (
+    AppointmentStatus.SCHEDULED,
+    AppointmentStatus.CONFIRMED,
+    AppointmentStatus.IN_PROGRESS
+)
+
 class Appointment(db.Model):
     """Modelo para agendamentos"""
     __tablename__ = 'appointments'
+    __table_args__ = (
+        # Listagens e calendário do tenant por período
+        Index('ix_appointments_tenant_date', 'tenant_id', 'appointment_date'),
+        # Disponibilidade e conflitos por funcionário
+        Index('ix_appointments_staff_date_status', 'staff_id', 'appointment_date', 'status'),
+        # Sondagem de sobreposição (end_at > início do novo horário)
+        Index('ix_appointments_staff_end', 'staff_id', 'end_at'),
+        # Recarga da janela de lembretes (todos os tenants, por período)
+        Index('ix_appointments_date_status', 'appointment_date', 'status'),
+    )
     
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey('tenants.id'), nullable=False)
@@ -26,6 +43,7 @@ class Appointment(db.Model):
     # Informações do agendamento
     appointment_date = Column(DateTime, nullable=False)
     duration_minutes = Column(Integer, nullable=False)
+    end_at = Column(DateTime, nullable=False)  # appointment_date + duration_minutes, mantido pelos eventos abaixo
     status = Column(Enum(AppointmentStatus), default=AppointmentStatus.SCHEDULED)
     
     # Informações financeiras
@@ -49,9 +67,9 @@ class Appointment(db.Model):
     service = relationship('Service', back_populates='appointments')
     staff_member = relationship('Staff', back_populates='appointments')
     
-    def to_dict(self):
-        """Converter para dicionário"""
-        return {
+    def to_dict(self, expand=True):
+        """Converter para dicionário (expand=False omite os dados relacionados)"""
+        data = {
             'id': self.id,
             'tenant_id': self.tenant_id,
             'client_id': self.client_id,
@@ -68,13 +86,57 @@ class Appointment(db.Model):
             'notes': self.notes,
             'client_notes': self.client_notes,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            # Dados relacionados
-            'client': self.client.to_dict() if self.client else None,
-            'service': self.service.to_dict() if self.service else None,
-            'staff_member': self.staff_member.to_dict() if self.staff_member else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+        
+        if expand:
+            # Dados relacionados
+            data['client'] = self.client.to_dict() if self.client else None
+            data['service'] = self.service.to_dict() if self.service else None
+            data['staff_member'] = self.staff_member.to_dict() if self.staff_member else None
+        
+        return data
+    
+    @staticmethod
+    def overlapping(staff_id, start, end, exclude_id=None):
+        """Query dos agendamentos ativos do funcionário que se sobrepõem a [start, end)"""
+        query = Appointment.query.filter(
+            and_(
+                Appointment.staff_id == staff_id,
+                Appointment.status.in_(BLOCKING_STATUSES),
+                Appointment.end_at > start,
+                Appointment.appointment_date < end
+            )
+        )
+        if exclude_id is not None:
+            query = query.filter(Appointment.id != exclude_id)
+        return query
     
     def __repr__(self):
         return f'<Appointment {self.id} - {self.appointment_date} - {self.status.value}>'
 
+@event.listens_for(Appointment, 'before_insert')
+@event.listens_for(Appointment, 'before_update')
+def sync_end_at(mapper, connection, target):
+    """Manter end_at coerente com appointment_date e duration_minutes"""
+    if target.appointment_date is not None and target.duration_minutes is not None:
+        target.end_at = target.appointment_date + timedelta(minutes=target.duration_minutes)
+
+# No PostgreSQL o banco impede sobreposições mesmo sob concorrência
+OVERLAP_CONSTRAINT = 'ex_appointments_staff_overlap'
+
+event.listen(
+    Appointment.__table__,
+    'after_create',
+    DDL(
+        'CREATE EXTENSION IF NOT EXISTS btree_gist; '
+        f'ALTER TABLE appointments ADD CONSTRAINT {OVERLAP_CONSTRAINT} '
+        'EXCLUDE USING gist (staff_id WITH =, tsrange(appointment_date, end_at) WITH &&) '
+        "WHERE (status IN ('SCHEDULED', 'CONFIRMED', 'IN_PROGRESS'))"
+    ).execute_if(dialect='postgresql')
+)
+
+def is_overlap_violation(error):
+    """Verificar se um IntegrityError veio da restrição de sobreposição"""
+    return getattr(error.orig, 'pgcode', None) == '23P01' or OVERLAP_CONSTRAINT in str(error.orig)
+
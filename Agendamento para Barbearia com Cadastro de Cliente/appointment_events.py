@@ -0,0 +1,25 @@
+from collections import namedtuple
+from src.utils.client_stats import stats_state, apply_transition, apply_created
+from src.utils.rollups import rollup_state, apply_rollup_transition, apply_rollup_changes
+
+# Estado derivado de um agendamento, capturado antes/depois de cada escrita
+AppointmentState = namedtuple('AppointmentState', ['stats', 'rollup'])
+
+EMPTY_STATE = AppointmentState(None, None)
+
+def capture(appointment):
+    """Capturar as contribuições do agendamento para estatísticas e agregados"""
+    if appointment is None:
+        return EMPTY_STATE
+    return AppointmentState(stats_state(appointment), rollup_state(appointment))
+
+def record_transition(before, after):
+    """Aplicar as diferenças (create: before=EMPTY_STATE, delete: after=EMPTY_STATE) na sessão atual"""
+    apply_transition(before.stats, after.stats)
+    apply_rollup_transition(before.rollup, after.rollup)
+
+def record_created(appointments):
+    """Aplicar vários agendamentos novos com um UPDATE/UPSERT por tabela"""
+    states = [capture(appointment) for appointment in appointments]
+    apply_created([state.stats for state in states])
+    apply_rollup_changes([(None, state.rollup) for state in states])
@@ -1,15 +1,30 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, select
 from src.models import db, Appointment, Client, Service, Staff
-from src.models.appointment import AppointmentStatus
+from src.models.appointment import AppointmentStatus, BLOCKING_STATUSES, is_overlap_violation
 from src.middleware.tenant import get_current_tenant
+from src.utils.availability import (
+    DEFAULT_SLOT_MINUTES, minutes_to_time, busy_intervals, available_starts, build_slots
+)
+from src.utils.availability import merge_intervals, overlapping_indices
+from src.utils.slot_index import refresh_appointment_days, refresh_staff_days, spanned_days
+from src.utils.appointment_events import capture, record_transition, record_created, EMPTY_STATE
+from src.utils.recurrence import expand_occurrences
+from src.utils.outbox import enqueue_confirmation, enqueue_cancellation, notify_outbox
+from src.utils.reminders import reminder_saved, reminder_removed
+from src.utils.schedule import staff_schedule
+from src.utils.query_options import get_view, appointment_options, VIEW_EXPANDED
+from src.utils.pagination import paginate_keyset
 from datetime import datetime, timedelta
 import json
 
 appointments_bp = Blueprint('appointments', __name__)
 
+# Limite de dias por consulta de disponibilidade em lote
+MAX_BATCH_DAYS = 31
+
 @appointments_bp.route('/', methods=['GET'])
 @jwt_required()
 def list_appointments():
@@ -27,9 +42,12 @@ def list_appointments():
         client_id = request.args.get('client_id')
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
+        view = get_view(request.args)
         
         # Query base
-        query = Appointment.query.filter_by(tenant_id=tenant.id)
+        query = Appointment.query.options(
+            *appointment_options('list', view)
+        ).filter_by(tenant_id=tenant.id)
         
         # Aplicar filtros
         if status:
@@ -55,6 +73,24 @@ def list_appointments():
             except ValueError:
                 return jsonify({'error': 'Formato de data inválido para date_to. Use YYYY-MM-DD'}), 400
         
+        # Paginação por cursor (opt-in): chave (appointment_date, id) decrescente
+        if 'cursor' in request.args:
+            appointments, next_cursor, total = paginate_keyset(
+                query,
+                [Appointment.appointment_date, Appointment.id],
+                cursor=request.args.get('cursor'),
+                per_page=per_page,
+                descending=True,
+                include_total=request.args.get('include_total', 'true').lower() == 'true'
+            )
+            
+            return jsonify({
+                'appointments': [appointment.to_dict(expand=view == VIEW_EXPANDED) for appointment in appointments],
+                'next_cursor': next_cursor,
+                'total': total,
+                'per_page': per_page
+            }), 200
+        
         # Ordenar por data do agendamento
         query = query.order_by(Appointment.appointment_date.desc())
         
@@ -66,13 +102,15 @@ def list_appointments():
         )
         
         return jsonify({
-            'appointments': [appointment.to_dict() for appointment in pagination.items],
+            'appointments': [appointment.to_dict(expand=view == VIEW_EXPANDED) for appointment in pagination.items],
             'total': pagination.total,
             'pages': pagination.pages,
             'current_page': page,
             'per_page': per_page
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': 'Parâmetros inválidos: ' + str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -120,22 +158,9 @@ def create_appointment():
         duration = data.get('duration_minutes', service.duration_minutes)
         end_time = appointment_date + timedelta(minutes=duration)
         
-        conflicting_appointments = Appointment.query.filter(
-            and_(
-                Appointment.staff_id == staff.id,
-                Appointment.status.in_([AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED, AppointmentStatus.IN_PROGRESS]),
-                or_(
-                    and_(
-                        Appointment.appointment_date <= appointment_date,
-                        Appointment.appointment_date + timedelta(minutes=Appointment.duration_minutes) > appointment_date
-                    ),
-                    and_(
-                        Appointment.appointment_date < end_time,
-                        Appointment.appointment_date >= appointment_date
-                    )
-                )
-            )
-        ).first()
+        # Sondagem indexada por (staff_id, end_at); no PostgreSQL a restrição
+        # de exclusão garante a mesma regra sob requisições concorrentes
+        conflicting_appointments = Appointment.overlapping(staff.id, appointment_date, end_time).first()
         
         if conflicting_appointments:
             return jsonify({'error': 'Funcionário não disponível neste horário'}), 400
@@ -165,22 +190,182 @@ def create_appointment():
         
         db.session.add(appointment)
         
-        # Atualizar estatísticas do cliente
-        client.total_appointments += 1
-        client.total_spent += final_price
-        client.last_visit = appointment_date
+        # Atualizar estatísticas do cliente e agregados diários (incrementos atômicos no banco)
+        record_transition(EMPTY_STATE, capture(appointment))
+        
+        # Atualizar bitmap de horários do funcionário no dia
+        refresh_appointment_days(appointment)
+        
+        # Confirmação gravada na fila na mesma transação; enviada pelo worker
+        db.session.flush()
+        enqueue_confirmation([appointment])
         
         db.session.commit()
+        notify_outbox()
+        reminder_saved(appointment)
         
         return jsonify({
             'message': 'Agendamento criado com sucesso',
-            'appointment': appointment.to_dict()
+            'appointment': appointment.to_dict(expand=get_view(request.args) == VIEW_EXPANDED)
+        }), 201
+        
+    except ValueError as e:
+        return jsonify({'error': 'Dados inválidos: ' + str(e)}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_overlap_violation(e):
+            return jsonify({'error': 'Funcionário não disponível neste horário'}), 400
+        return jsonify({'error': 'Erro de integridade dos dados'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@appointments_bp.route('/recurring', methods=['POST'])
+@jwt_required()
+def create_recurring_appointments():
+    """Criar série recorrente de agendamentos (semanal, quinzenal ou mensal)
+
+    Todas as ocorrências são verificadas com uma única consulta de intervalo;
+    as válidas são inseridas em lote e os conflitos reportados por ocorrência.
+    """
+    try:
+        tenant = get_current_tenant()
+        if not tenant:
+            return jsonify({'error': 'Tenant não encontrado'}), 404
+        
+        data = request.get_json()
+        
+        # Validar dados obrigatórios
+        required_fields = ['client_id', 'service_id', 'staff_id', 'appointment_date', 'recurrence']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'Campo {field} é obrigatório'}), 400
+        
+        client = Client.query.filter_by(id=data['client_id'], tenant_id=tenant.id).first()
+        if not client:
+            return jsonify({'error': 'Cliente não encontrado'}), 404
+        
+        service = Service.query.filter_by(id=data['service_id'], tenant_id=tenant.id).first()
+        if not service:
+            return jsonify({'error': 'Serviço não encontrado'}), 404
+        
+        staff = Staff.query.filter_by(id=data['staff_id'], tenant_id=tenant.id).first()
+        if not staff:
+            return jsonify({'error': 'Funcionário não encontrado'}), 404
+        
+        try:
+            first_date = datetime.fromisoformat(data['appointment_date'].replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido'}), 400
+        
+        if first_date < datetime.utcnow():
+            return jsonify({'error': 'Não é possível agendar para datas passadas'}), 400
+        
+        # Expandir a regra de recorrência
+        recurrence = data['recurrence']
+        if not isinstance(recurrence, dict):
+            return jsonify({'error': 'Recorrência inválida: informe frequency e count ou until'}), 400
+        try:
+            until = recurrence.get('until')
+            occurrences = expand_occurrences(
+                first_date,
+                recurrence.get('frequency', 'weekly'),
+                interval=int(recurrence.get('interval', 1)),
+                count=int(recurrence['count']) if recurrence.get('count') is not None else None,
+                until=datetime.strptime(until, '%Y-%m-%d').date() if until else None
+            )
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': f'Recorrência inválida: {e}'}), 400
+        
+        if not occurrences:
+            return jsonify({'error': 'Recorrência sem ocorrências: until é anterior à primeira data'}), 400
+        
+        duration = data.get('duration_minutes', service.duration_minutes)
+        intervals = [
+            (start, start + timedelta(minutes=duration))
+            for start in occurrences
+        ]
+        
+        # Uma consulta para todo o período da série, depois varredura O(n + m)
+        existing = Appointment.overlapping(
+            staff.id, intervals[0][0], intervals[-1][1]
+        ).with_entities(Appointment.appointment_date, Appointment.end_at).all()
+        busy = merge_intervals(existing)
+        conflicting = set(overlapping_indices(intervals, busy))
+        
+        price = data.get('price', service.price)
+        discount = data.get('discount', 0.0)
+        final_price = price - discount
+        status = AppointmentStatus(data.get('status', 'scheduled'))
+        
+        appointments = []
+        conflicts = []
+        for index, (start, end) in enumerate(intervals):
+            if index in conflicting:
+                conflicts.append({
+                    'appointment_date': start.isoformat(),
+                    'error': 'Funcionário não disponível neste horário'
+                })
+                continue
+            appointments.append(Appointment(
+                tenant_id=tenant.id,
+                client_id=client.id,
+                service_id=service.id,
+                staff_id=staff.id,
+                appointment_date=start,
+                duration_minutes=duration,
+                price=price,
+                discount=discount,
+                final_price=final_price,
+                payment_status=data.get('payment_status', 'pending'),
+                payment_method=data.get('payment_method'),
+                notes=data.get('notes'),
+                client_notes=data.get('client_notes'),
+                status=status
+            ))
+        
+        if not appointments:
+            return jsonify({
+                'error': 'Nenhuma ocorrência disponível',
+                'conflicts': conflicts
+            }), 400
+        
+        # Inserção em lote (executemany no flush)
+        db.session.add_all(appointments)
+        
+        # Estatísticas do cliente e agregados diários: um UPDATE/UPSERT para toda a série
+        record_created(appointments)
+        
+        # Bitmaps de horários: uma consulta para todos os dias afetados
+        refresh_staff_days(tenant.id, staff.id, [
+            day
+            for appointment in appointments
+            for day in spanned_days(appointment.appointment_date, appointment.duration_minutes)
+        ])
+        
+        # Uma confirmação para a série inteira
+        db.session.flush()
+        enqueue_confirmation(appointments)
+        
+        db.session.commit()
+        notify_outbox()
+        for appointment in appointments:
+            reminder_saved(appointment)
+        
+        expand = get_view(request.args) == VIEW_EXPANDED
+        return jsonify({
+            'message': f'{len(appointments)} agendamentos criados com sucesso',
+            'appointments': [appointment.to_dict(expand=expand) for appointment in appointments],
+            'conflicts': conflicts,
+            'total_occurrences': len(intervals)
         }), 201
         
     except ValueError as e:
         return jsonify({'error': 'Dados inválidos: ' + str(e)}), 400
-    except IntegrityError:
+    except IntegrityError as e:
         db.session.rollback()
+        if is_overlap_violation(e):
+            return jsonify({'error': 'Conflito de horário detectado ao salvar a série; tente novamente'}), 409
         return jsonify({'error': 'Erro de integridade dos dados'}), 400
     except Exception as e:
         db.session.rollback()
@@ -195,7 +380,10 @@ def get_appointment(appointment_id):
         if not tenant:
             return jsonify({'error': 'Tenant não encontrado'}), 404
         
-        appointment = Appointment.query.filter_by(
+        view = get_view(request.args)
+        appointment = Appointment.query.options(
+            *appointment_options('detail', view)
+        ).filter_by(
             id=appointment_id,
             tenant_id=tenant.id
         ).first()
@@ -203,8 +391,10 @@ def get_appointment(appointment_id):
         if not appointment:
             return jsonify({'error': 'Agendamento não encontrado'}), 404
         
-        return jsonify({'appointment': appointment.to_dict()}), 200
+        return jsonify({'appointment': appointment.to_dict(expand=view == VIEW_EXPANDED)}), 200
         
+    except ValueError as e:
+        return jsonify({'error': 'Parâmetros inválidos: ' + str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -226,6 +416,9 @@ def update_appointment(appointment_id):
             return jsonify({'error': 'Agendamento não encontrado'}), 404
         
         data = request.get_json()
+        previous = (appointment.staff_id, appointment.appointment_date, appointment.duration_minutes)
+        previous_state = capture(appointment)
+        previous_status = appointment.status
         
         # Atualizar campos permitidos
         if 'appointment_date' in data:
@@ -263,15 +456,48 @@ def update_appointment(appointment_id):
         if 'client_notes' in data:
             appointment.client_notes = data['client_notes']
         
+        # Verificar conflitos se horário, duração ou status mudaram
+        if any(field in data for field in ('appointment_date', 'duration_minutes', 'status')) \
+                and appointment.status in BLOCKING_STATUSES:
+            end_time = appointment.appointment_date + timedelta(minutes=appointment.duration_minutes)
+            with db.session.no_autoflush:
+                conflict = Appointment.overlapping(
+                    appointment.staff_id,
+                    appointment.appointment_date,
+                    end_time,
+                    exclude_id=appointment.id
+                ).first()
+            if conflict:
+                db.session.rollback()
+                return jsonify({'error': 'Funcionário não disponível neste horário'}), 400
+        
+        # Corrigir estatísticas do cliente e agregados (preço, status, dia) de forma atômica
+        record_transition(previous_state, capture(appointment))
+        
+        # Atualizar bitmaps do dia antigo e do novo
+        refresh_appointment_days(appointment, previous)
+        
+        cancelled = previous_status != AppointmentStatus.CANCELLED and appointment.status == AppointmentStatus.CANCELLED
+        if cancelled:
+            enqueue_cancellation(appointment)
+        
         db.session.commit()
+        if cancelled:
+            notify_outbox()
+        reminder_saved(appointment)
         
         return jsonify({
             'message': 'Agendamento atualizado com sucesso',
-            'appointment': appointment.to_dict()
+            'appointment': appointment.to_dict(expand=get_view(request.args) == VIEW_EXPANDED)
         }), 200
         
     except ValueError as e:
         return jsonify({'error': 'Dados inválidos: ' + str(e)}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_overlap_violation(e):
+            return jsonify({'error': 'Funcionário não disponível neste horário'}), 400
+        return jsonify({'error': 'Erro de integridade dos dados'}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -295,13 +521,24 @@ def delete_appointment(appointment_id):
         
         # Se o agendamento já foi realizado, apenas marcar como cancelado
         if appointment.status in [AppointmentStatus.COMPLETED, AppointmentStatus.IN_PROGRESS]:
+            previous_state = capture(appointment)
             appointment.status = AppointmentStatus.CANCELLED
+            record_transition(previous_state, capture(appointment))
+            refresh_appointment_days(appointment)
             db.session.commit()
+            reminder_removed(appointment.id)
             return jsonify({'message': 'Agendamento cancelado com sucesso'}), 200
         
-        # Caso contrário, excluir completamente
+        # Caso contrário, excluir completamente (avisando o cliente se ainda estava marcado)
+        if appointment.status in BLOCKING_STATUSES:
+            enqueue_cancellation(appointment)
+        record_transition(capture(appointment), EMPTY_STATE)
         db.session.delete(appointment)
+        db.session.flush()
+        refresh_appointment_days(appointment)
         db.session.commit()
+        notify_outbox()
+        reminder_removed(appointment_id)
         
         return jsonify({'message': 'Agendamento excluído com sucesso'}), 200
         
@@ -309,6 +546,91 @@ def delete_appointment(appointment_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Formatos de calendário emitidos em streaming e tamanho do lote lido do cursor
+CALENDAR_STREAM_FORMATS = ('ndjson', 'columnar')
+CALENDAR_YIELD_PER = 500
+
+CALENDAR_COLUMNS = [
+    'id', 'start', 'end', 'status', 'client_name', 'service_name',
+    'staff_name', 'price', 'payment_status'
+]
+
+# Colunas repetidas que o formato columnar codifica em dicionário
+CALENDAR_DICTIONARY_COLUMNS = ('status', 'client_name', 'service_name', 'staff_name', 'payment_status')
+
+def _calendar_select(tenant_id, date_from, date_to, staff_id=None):
+    """SELECT Core com os nomes relacionados, lido em lotes por cursor no servidor"""
+    stmt = select(
+        Appointment.id,
+        Appointment.appointment_date,
+        Appointment.end_at,
+        Appointment.status,
+        Client.name,
+        Service.name,
+        Staff.name,
+        Appointment.final_price,
+        Appointment.payment_status
+    ).join(
+        Client, Client.id == Appointment.client_id
+    ).join(
+        Service, Service.id == Appointment.service_id
+    ).join(
+        Staff, Staff.id == Appointment.staff_id
+    ).where(
+        and_(
+            Appointment.tenant_id == tenant_id,
+            Appointment.appointment_date >= date_from,
+            Appointment.appointment_date < date_to
+        )
+    )
+    
+    if staff_id:
+        stmt = stmt.where(Appointment.staff_id == int(staff_id))
+    
+    return stmt.order_by(Appointment.appointment_date).execution_options(
+        stream_results=True,
+        yield_per=CALENDAR_YIELD_PER
+    )
+
+def _calendar_rows(stmt):
+    for row in db.session.execute(stmt):
+        yield [
+            row[0],
+            row[1].isoformat(),
+            row[2].isoformat(),
+            row[3].value,
+            row[4], row[5], row[6], row[7], row[8]
+        ]
+
+def _stream_ndjson(stmt):
+    """Um evento JSON por linha"""
+    for row in _calendar_rows(stmt):
+        event = dict(zip(CALENDAR_COLUMNS, row))
+        event['title'] = f"{event['client_name']} - {event['service_name']}"
+        yield json.dumps(event) + '\n'
+
+def _stream_columnar(stmt):
+    """Linhas com códigos inteiros para valores repetidos; dicionários emitidos ao final"""
+    dictionaries = {name: {} for name in CALENDAR_DICTIONARY_COLUMNS}
+    encoded_positions = [
+        (position, dictionaries[name])
+        for position, name in enumerate(CALENDAR_COLUMNS)
+        if name in dictionaries
+    ]
+    
+    yield '{"columns":' + json.dumps(CALENDAR_COLUMNS) + ',"rows":['
+    
+    total = 0
+    for row in _calendar_rows(stmt):
+        for position, dictionary in encoded_positions:
+            row[position] = dictionary.setdefault(row[position], len(dictionary))
+        yield (',' if total else '') + json.dumps(row, separators=(',', ':'))
+        total += 1
+    
+    yield '],"dictionaries":' + json.dumps({
+        name: list(values) for name, values in dictionaries.items()
+    }) + ',"total":' + str(total) + '}'
+
 @appointments_bp.route('/calendar', methods=['GET'])
 @jwt_required()
 def get_calendar():
@@ -332,8 +654,21 @@ def get_calendar():
         except ValueError:
             return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
         
-        # Query base
-        query = Appointment.query.filter(
+        # Modos de streaming: memória constante independente do período
+        output_format = request.args.get('format', 'json')
+        if output_format in CALENDAR_STREAM_FORMATS:
+            stmt = _calendar_select(tenant.id, date_from_obj, date_to_obj, staff_id)
+            if output_format == 'ndjson':
+                return Response(stream_with_context(_stream_ndjson(stmt)), mimetype='application/x-ndjson')
+            return Response(stream_with_context(_stream_columnar(stmt)), mimetype='application/json')
+        
+        if output_format != 'json':
+            return jsonify({'error': 'Parâmetro format deve ser json, ndjson ou columnar'}), 400
+        
+        # Query base (nomes relacionados carregados no mesmo SELECT)
+        query = Appointment.query.options(
+            *appointment_options('calendar')
+        ).filter(
             and_(
                 Appointment.tenant_id == tenant.id,
                 Appointment.appointment_date >= date_from_obj,
@@ -386,10 +721,14 @@ def check_availability():
         staff_id = request.args.get('staff_id')
         date = request.args.get('date')
         service_id = request.args.get('service_id')
+        slot_minutes = int(request.args.get('slot_minutes', DEFAULT_SLOT_MINUTES))
         
         if not all([staff_id, date, service_id]):
             return jsonify({'error': 'Parâmetros staff_id, date e service_id são obrigatórios'}), 400
         
+        if slot_minutes <= 0:
+            return jsonify({'error': 'Parâmetro slot_minutes deve ser positivo'}), 400
+        
         # Validar funcionário e serviço
         staff = Staff.query.filter_by(id=int(staff_id), tenant_id=tenant.id).first()
         if not staff:
@@ -404,76 +743,37 @@ def check_availability():
         except ValueError:
             return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
         
-        # Obter horário de trabalho do funcionário
-        work_schedule = {}
-        if staff.work_schedule:
-            try:
-                work_schedule = json.loads(staff.work_schedule)
-            except json.JSONDecodeError:
-                work_schedule = {}
-        
-        # Obter dia da semana
-        weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        weekday = weekdays[target_date.weekday()]
+        # Expediente compilado do funcionário (pausas e exceções por data já aplicadas)
+        work_day = staff_schedule(staff).day(target_date)
         
-        if weekday not in work_schedule or not work_schedule[weekday]:
+        if not work_day:
             return jsonify({
                 'available_slots': [],
                 'message': 'Funcionário não trabalha neste dia'
             }), 200
         
-        # Horários de trabalho
-        work_start = work_schedule[weekday]['start']
-        work_end = work_schedule[weekday]['end']
-        
-        # Obter agendamentos existentes para o dia
+        # Obter agendamentos existentes para o dia (apenas as colunas necessárias)
         start_of_day = datetime.combine(target_date, datetime.min.time())
         end_of_day = start_of_day + timedelta(days=1)
         
-        existing_appointments = Appointment.query.filter(
+        existing_appointments = db.session.query(
+            Appointment.appointment_date,
+            Appointment.duration_minutes
+        ).filter(
             and_(
                 Appointment.staff_id == staff.id,
                 Appointment.appointment_date >= start_of_day,
                 Appointment.appointment_date < end_of_day,
-                Appointment.status.in_([
-                    AppointmentStatus.SCHEDULED,
-                    AppointmentStatus.CONFIRMED,
-                    AppointmentStatus.IN_PROGRESS
-                ])
+                Appointment.status.in_(BLOCKING_STATUSES)
             )
         ).all()
         
-        # Gerar slots disponíveis (intervalos de 30 minutos)
-        available_slots = []
-        current_time = datetime.strptime(work_start, '%H:%M').time()
-        end_time = datetime.strptime(work_end, '%H:%M').time()
-        
-        while current_time < end_time:
-            slot_datetime = datetime.combine(target_date, current_time)
-            slot_end = slot_datetime + timedelta(minutes=service.duration_minutes)
-            
-            # Verificar se o slot não conflita com agendamentos existentes
-            is_available = True
-            for appointment in existing_appointments:
-                apt_end = appointment.appointment_date + timedelta(minutes=appointment.duration_minutes)
-                
-                if (slot_datetime < apt_end and slot_end > appointment.appointment_date):
-                    is_available = False
-                    break
-            
-            # Verificar se o slot termina dentro do horário de trabalho
-            if slot_end.time() > end_time:
-                is_available = False
-            
-            if is_available:
-                available_slots.append({
-                    'time': current_time.strftime('%H:%M'),
-                    'datetime': slot_datetime.isoformat(),
-                    'duration': service.duration_minutes
-                })
-            
-            # Próximo slot (30 minutos depois)
-            current_time = (datetime.combine(target_date, current_time) + timedelta(minutes=30)).time()
+        # Fundir intervalos ocupados (e pausas) uma única vez e varrer as janelas livres
+        busy = merge_intervals(busy_intervals(existing_appointments, start_of_day) + work_day.gaps)
+        available_slots = build_slots(
+            target_date, work_day.start, work_day.end, busy,
+            service.duration_minutes, step=slot_minutes
+        )
         
         return jsonify({
             'date': date,
@@ -486,3 +786,118 @@ def check_availability():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+@appointments_bp.route('/availability/batch', methods=['GET'])
+@jwt_required()
+def check_availability_batch():
+    """Verificar disponibilidade de vários funcionários em um intervalo de datas"""
+    try:
+        tenant = get_current_tenant()
+        if not tenant:
+            return jsonify({'error': 'Tenant não encontrado'}), 404
+        
+        # Parâmetros obrigatórios
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+        service_id = request.args.get('service_id')
+        staff_ids = request.args.get('staff_ids', 'all').strip()
+        slot_minutes = int(request.args.get('slot_minutes', DEFAULT_SLOT_MINUTES))
+        
+        if not all([date_from, date_to, service_id]):
+            return jsonify({'error': 'Parâmetros date_from, date_to e service_id são obrigatórios'}), 400
+        
+        if slot_minutes <= 0:
+            return jsonify({'error': 'Parâmetro slot_minutes deve ser positivo'}), 400
+        
+        try:
+            start_date = datetime.strptime(date_from, '%Y-%m-%d').date()
+            end_date = datetime.strptime(date_to, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
+        
+        total_days = (end_date - start_date).days + 1
+        if total_days <= 0:
+            return jsonify({'error': 'date_to deve ser igual ou posterior a date_from'}), 400
+        
+        if total_days > MAX_BATCH_DAYS:
+            return jsonify({'error': f'Intervalo máximo de {MAX_BATCH_DAYS} dias'}), 400
+        
+        service = Service.query.filter_by(id=int(service_id), tenant_id=tenant.id).first()
+        if not service:
+            return jsonify({'error': 'Serviço não encontrado'}), 404
+        
+        # Funcionários: "all" ou lista separada por vírgulas
+        staff_query = Staff.query.filter_by(tenant_id=tenant.id)
+        if staff_ids == 'all':
+            staff_query = staff_query.filter_by(is_active=True)
+        else:
+            staff_query = staff_query.filter(
+                Staff.id.in_([int(value) for value in staff_ids.split(',') if value.strip()])
+            )
+        staff_members = staff_query.order_by(Staff.name).all()
+        
+        if not staff_members:
+            return jsonify({'error': 'Nenhum funcionário encontrado'}), 404
+        
+        # Uma única consulta para todos os agendamentos do intervalo
+        range_start = datetime.combine(start_date, datetime.min.time())
+        range_end = range_start + timedelta(days=total_days)
+        
+        rows = db.session.query(
+            Appointment.staff_id,
+            Appointment.appointment_date,
+            Appointment.duration_minutes
+        ).filter(
+            and_(
+                Appointment.tenant_id == tenant.id,
+                Appointment.staff_id.in_([staff.id for staff in staff_members]),
+                Appointment.appointment_date >= range_start,
+                Appointment.appointment_date < range_end,
+                Appointment.status.in_(BLOCKING_STATUSES)
+            )
+        ).all()
+        
+        appointments_by_day = {}
+        for staff_id, appointment_date, duration_minutes in rows:
+            key = (staff_id, appointment_date.date())
+            appointments_by_day.setdefault(key, []).append((appointment_date, duration_minutes))
+        
+        # Matriz compacta: dia -> funcionário -> horários livres ('HH:MM')
+        schedules = {staff.id: staff_schedule(staff) for staff in staff_members}
+        days = [start_date + timedelta(days=offset) for offset in range(total_days)]
+        matrix = {}
+        for day in days:
+            day_start = datetime.combine(day, datetime.min.time())
+            day_slots = {}
+            for staff in staff_members:
+                work_day = schedules[staff.id].day(day)
+                if not work_day:
+                    day_slots[str(staff.id)] = []
+                    continue
+                
+                busy = merge_intervals(
+                    busy_intervals(appointments_by_day.get((staff.id, day), []), day_start) + work_day.gaps
+                )
+                day_slots[str(staff.id)] = [
+                    minutes_to_time(start)
+                    for start in available_starts(work_day.start, work_day.end, busy, service.duration_minutes, slot_minutes)
+                ]
+            matrix[day.isoformat()] = day_slots
+        
+        return jsonify({
+            'date_from': date_from,
+            'date_to': date_to,
+            'service': {
+                'id': service.id,
+                'name': service.name,
+                'duration': service.duration_minutes
+            },
+            'staff': [{'id': staff.id, 'name': staff.name} for staff in staff_members],
+            'slot_minutes': slot_minutes,
+            'availability': matrix
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': 'Dados inválidos: ' + str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+# Granularidade padrão dos slots oferecidos (minutos)
+DEFAULT_SLOT_MINUTES = 30
+
+def time_to_minutes(value):
+    """Converter 'HH:MM' (ou time) em minutos desde a meia-noite"""
+    if hasattr(value, 'hour'):
+        return value.hour * 60 + value.minute
+    hours, minutes = value.split(':')
+    return int(hours) * 60 + int(minutes)
+
+def minutes_to_time(minutes):
+    """Converter minutos desde a meia-noite em 'HH:MM'"""
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+def merge_intervals(intervals):
+    """Ordenar e fundir intervalos [início, fim) sobrepostos ou adjacentes"""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+def free_windows(work_start, work_end, busy):
+    """Percorrer os intervalos ocupados (já fundidos) e gerar as janelas livres do expediente"""
+    cursor = work_start
+    for start, end in busy:
+        if end <= cursor:
+            continue
+        if start >= work_end:
+            break
+        if start > cursor:
+            yield cursor, start
+        cursor = max(cursor, end)
+    if cursor < work_end:
+        yield cursor, work_end
+
+def available_starts(work_start, work_end, busy, duration, step=DEFAULT_SLOT_MINUTES):
+    """Listar inícios de slot (minutos) em que cabe um serviço de `duration` minutos
+
+    Os slots ficam alinhados à grade work_start + k * step, como na listagem
+    original, e cada janela livre é percorrida uma única vez.
+    """
+    if duration <= 0 or step <= 0:
+        return []
+
+    starts = []
+    for window_start, window_end in free_windows(work_start, work_end, busy):
+        # Primeiro ponto da grade dentro da janela
+        offset = (window_start - work_start) % step
+        slot = window_start if offset == 0 else window_start + step - offset
+
+        while slot + duration <= window_end:
+            starts.append(slot)
+            slot += step
+    return starts
+
+def busy_intervals(appointments, day_start):
+    """Converter pares (início, duração) em intervalos fundidos em minutos relativos a day_start"""
+    intervals = []
+    for appointment_date, duration_minutes in appointments:
+        start = int((appointment_date - day_start).total_seconds() // 60)
+        intervals.append((start, start + duration_minutes))
+    return merge_intervals(intervals)
+
+def build_slots(target_date, work_start, work_end, busy, duration, step=DEFAULT_SLOT_MINUTES):
+    """Montar a lista de slots disponíveis no formato retornado pela API"""
+    day_start = datetime.combine(target_date, datetime.min.time())
+    return [
+        {
+            'time': minutes_to_time(start),
+            'datetime': (day_start + timedelta(minutes=start)).isoformat(),
+            'duration': duration
+        }
+        for start in available_starts(work_start, work_end, busy, duration, step)
+    ]
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+def interval_mask(start, end, block=5):
+    """Bitmap com os blocos que intersectam [start, end) minutos, limitado ao dia"""
+    first = max(start, 0) // block
+    last = min(-(-end // block), 24 * 60 // block)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+def busy_mask(intervals, block=5):
+    """Bitmap de ocupação a partir de intervalos em minutos"""
+    mask = 0
+    for start, end in intervals:
+        mask |= interval_mask(start, end, block)
+    return mask
+
+def grid_mask(start, step, block=5):
+    """Bitmap dos blocos da grade start + k * step minutos, como em available_starts"""
+    mask = 0
+    for index in range(-(-start // block), 24 * 60 // block, max(step // block, 1)):
+        mask |= 1 << index
+    return mask
+
+def fit_mask(free, duration, block=5):
+    """Bitmap dos blocos onde começa uma sequência livre de `duration` minutos"""
+    fit = free
+    for shift in range(1, -(-duration // block)):
+        fit &= free >> shift
+    return fit
+
+def overlapping_indices(intervals, busy):
+    """Índices dos intervalos (ordenados por início) que intersectam algum intervalo ocupado fundido
+
+    Varredura única com dois ponteiros: O(n + m).
+    """
+    conflicts = []
+    position = 0
+    for index, (start, end) in enumerate(intervals):
+        # Descartar ocupados que terminam antes deste intervalo
+        while position < len(busy) and busy[position][1] <= start:
+            position += 1
+        if position < len(busy) and busy[position][0] < end:
+            conflicts.append(index)
+    return conflicts
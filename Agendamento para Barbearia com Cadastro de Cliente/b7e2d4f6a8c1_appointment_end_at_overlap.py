@@ -0,0 +1,63 @@
+"""Coluna end_at, índice de sobreposição e restrição de exclusão em appointments
+
+Revision ID: b7e2d4f6a8c1
+Revises: a3f9c1d2e4b5
+Create Date: 2026-10-18 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d4f6a8c1'
+down_revision = 'a3f9c1d2e4b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    
+    # init_db pode já ter criado a coluna, o índice e a restrição em bancos novos
+    columns = {column['name'] for column in sa.inspect(bind).get_columns('appointments')}
+    if 'end_at' not in columns:
+        op.add_column('appointments', sa.Column('end_at', sa.DateTime(), nullable=True))
+        
+        # Preencher end_at dos agendamentos existentes
+        if bind.dialect.name == 'postgresql':
+            op.execute(
+                "UPDATE appointments SET end_at = appointment_date + duration_minutes * interval '1 minute'"
+            )
+        else:
+            op.execute(
+                "UPDATE appointments SET end_at = datetime(appointment_date, '+' || duration_minutes || ' minutes')"
+            )
+        
+        with op.batch_alter_table('appointments') as batch_op:
+            batch_op.alter_column('end_at', existing_type=sa.DateTime(), nullable=False)
+    
+    op.create_index('ix_appointments_staff_end', 'appointments', ['staff_id', 'end_at'], if_not_exists=True)
+    
+    if bind.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        exists = bind.execute(
+            sa.text("SELECT 1 FROM pg_constraint WHERE conname = 'ex_appointments_staff_overlap'")
+        ).scalar()
+        if not exists:
+            op.execute(
+                'ALTER TABLE appointments ADD CONSTRAINT ex_appointments_staff_overlap '
+                'EXCLUDE USING gist (staff_id WITH =, tsrange(appointment_date, end_at) WITH &&) '
+                "WHERE (status IN ('SCHEDULED', 'CONFIRMED', 'IN_PROGRESS'))"
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    
+    if bind.dialect.name == 'postgresql':
+        op.execute('ALTER TABLE appointments DROP CONSTRAINT IF EXISTS ex_appointments_staff_overlap')
+    
+    op.drop_index('ix_appointments_staff_end', table_name='appointments', if_exists=True)
+    
+    with op.batch_alter_table('appointments') as batch_op:
+        batch_op.drop_column('end_at')
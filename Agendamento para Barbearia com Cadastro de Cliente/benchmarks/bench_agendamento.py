@@ -0,0 +1,97 @@
+"""Concurrency benchmark for POST /api/agendamento (legacy single-shop site)
+
+Runs parallel clients against a fresh SQLite database through the Flask
+test client and reports throughput and latency percentiles, plus a
+same-slot contention round that must end with exactly one booking.
+
+Usage: python benchmarks/bench_agendamento.py [--clients 32] [--bookings 2000]
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as legacy
+
+
+def booking_payload(index, slot=None):
+    # Spread bookings over future weekdays and half-hour slots
+    day = datetime.date.today() + datetime.timedelta(days=1)
+    offset, minutes = divmod(index, 20 * 60)
+    date = day + datetime.timedelta(days=offset)
+    while date.weekday() == 6:
+        date += datetime.timedelta(days=1)
+    return {
+        'nome': f'Cliente {index}',
+        'email': f'cliente{index % 500}@example.com',
+        'telefone': '98999990000',
+        'data': date.isoformat(),
+        'horario': slot or f'{minutes // 60:02d}:{minutes % 60:02d}'
+    }
+
+
+def run(clients, payloads):
+    """Send the payloads from `clients` threads; returns (latencies, status codes, elapsed)"""
+    latencies, statuses = [], []
+    lock = threading.Lock()
+    cursor = iter(range(len(payloads)))
+
+    def worker():
+        client = legacy.app.test_client()
+        while True:
+            with lock:
+                index = next(cursor, None)
+            if index is None:
+                return
+            started = time.perf_counter()
+            response = client.post('/api/agendamento', json=payloads[index])
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - started
+
+
+def report(title, latencies, statuses, elapsed):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    codes = {code: statuses.count(code) for code in sorted(set(statuses))}
+    print(f'{title}: {len(latencies)} requests in {elapsed:.2f}s '
+          f'({len(latencies) / elapsed:.0f} req/s), p50 {p50:.1f} ms, p95 {p95:.1f} ms, status {codes}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--bookings', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        legacy.DATABASE = os.path.join(folder, 'bench.db')
+        legacy.init_db()
+
+        latencies, statuses, elapsed = run(args.clients, [booking_payload(index) for index in range(args.bookings)])
+        report('distinct slots', latencies, statuses, elapsed)
+
+        contended = [booking_payload(0, slot='23:59') for _ in range(args.clients * 4)]
+        latencies, statuses, elapsed = run(args.clients, contended)
+        report('same slot', latencies, statuses, elapsed)
+        assert statuses.count(201) == 1, 'same slot booked more than once'
+
+
+if __name__ == '__main__':
+    main()
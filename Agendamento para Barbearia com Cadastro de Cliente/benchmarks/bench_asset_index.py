@@ -0,0 +1,122 @@
+"""Startup and per-request benchmark of the static asset index
+
+Generates a synthetic Vite build (hashed JS/CSS chunks with .gz variants,
+images, nested folders) and measures:
+
+- build_asset_index at several build sizes, so the index never becomes a
+  noticeable part of a cold start;
+- GET latency through the indexed serve path against the original
+  os.path.exists + send_from_directory route, for a hashed chunk, the SPA
+  fallback and a 304 revalidation.
+
+Usage: python benchmarks/bench_asset_index.py [--files 500 2000 10000] [--requests 2000]
+"""
+import argparse
+import gzip
+import os
+import tempfile
+import time
+
+from flask import Flask, abort, send_from_directory
+
+from support import report_latencies
+
+from src.utils.static_assets import build_asset_index, serve_path
+
+CHUNK = b'export const a=1;' * 200
+
+
+def write_build(root, files):
+    """Write `files` originals: 60% JS/CSS chunks with .gz variants, the rest images in subfolders"""
+    os.makedirs(os.path.join(root, 'assets'), exist_ok=True)
+    with open(os.path.join(root, 'index.html'), 'wb') as target:
+        target.write(b'<!doctype html><div id="root"></div>')
+    compressed = gzip.compress(CHUNK)
+    for index in range(files - 1):
+        if index % 5 < 3:
+            name = os.path.join(root, 'assets', f'chunk{index}-{index:08x}.{"js" if index % 2 else "css"}')
+            with open(name, 'wb') as target:
+                target.write(CHUNK)
+            with open(name + '.gz', 'wb') as target:
+                target.write(compressed)
+        else:
+            folder = os.path.join(root, 'images', f'set{index % 20}')
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f'photo{index}.png'), 'wb') as target:
+                target.write(b'\x89PNG' + bytes(512))
+
+
+def indexed_app(root):
+    app = Flask('indexed', static_folder=None)
+    assets = build_asset_index(root)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        response = serve_path(assets, path)
+        if response is None:
+            abort(404)
+        return response
+
+    return app
+
+
+def legacy_app(root):
+    """The original catch-all route: os.path.exists per request, default headers"""
+    app = Flask('legacy', static_folder=None)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        if path != '' and os.path.exists(os.path.join(root, path)):
+            return send_from_directory(root, path)
+        return send_from_directory(root, 'index.html')
+
+    return app
+
+
+def measure(client, requests, path, headers=None):
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers or {})
+        latencies.append(time.perf_counter() - started)
+        response.close()
+    return latencies, response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, nargs='+', default=[500, 2000, 10000])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    for files in args.files:
+        with tempfile.TemporaryDirectory() as root:
+            write_build(root, files)
+            timings = []
+            for _ in range(5):
+                started = time.perf_counter()
+                index = build_asset_index(root)
+                timings.append(time.perf_counter() - started)
+            variants = sum(len(asset.variants) for asset in index.values())
+            print(f'build_asset_index: {len(index)} assets, {variants} variants '
+                  f'best {min(timings) * 1000:.1f} ms, first {timings[0] * 1000:.1f} ms')
+
+    with tempfile.TemporaryDirectory() as root:
+        write_build(root, 2000)
+        chunk = '/assets/chunk1-00000001.js'
+        for title, app in (('indexed', indexed_app(root)), ('legacy ', legacy_app(root))):
+            client = app.test_client()
+            latencies, response = measure(client, args.requests, chunk, {'Accept-Encoding': 'gzip'})
+            report_latencies(f'{title} hashed chunk ({response.headers.get("Content-Encoding") or "identity"}, '
+                             f'{response.content_length} bytes)', latencies)
+            latencies, _ = measure(client, args.requests, '/clientes/42')
+            report_latencies(f'{title} SPA fallback', latencies)
+            etag = response.headers.get('ETag')
+            latencies, revalidated = measure(client, args.requests, chunk, {'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+            report_latencies(f'{title} revalidation -> {revalidated.status_code}', latencies)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark of the availability engine on a busy day
+
+Seeds one day with N bookings per staff member (20 staff, 50 bookings each by
+default) and measures:
+
+- the engine alone (merge busy intervals once, sweep free windows) against
+  the original per-slot scan over every appointment, checking both offer the
+  same slots on the 30-minute grid;
+- GET /api/appointments/availability latency for every staff member, which
+  includes the indexed query and JSON serialization.
+
+Usage: python benchmarks/bench_availability.py [--staff 20] [--bookings 50] [--rounds 20]
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from support import api_client, create_bench_app, report_latencies, seed_tenant, timed
+
+from src.models import db, Appointment
+from src.routes.appointments import appointments_bp
+from src.utils.availability import available_starts, busy_intervals, merge_intervals, minutes_to_time
+
+DAY = date(2030, 1, 7)
+WORK_START, WORK_END = 8 * 60, 20 * 60
+CELL_MINUTES = 10
+
+
+def legacy_slots(day, appointments, work_start, work_end, duration, step=30):
+    """The original check_availability loop: every slot scans every appointment"""
+    slots = []
+    current_time = datetime.strptime(minutes_to_time(work_start), '%H:%M').time()
+    end_time = datetime.strptime(minutes_to_time(work_end), '%H:%M').time()
+    while current_time < end_time:
+        slot_datetime = datetime.combine(day, current_time)
+        slot_end = slot_datetime + timedelta(minutes=duration)
+        is_available = True
+        for appointment_date, duration_minutes in appointments:
+            if slot_datetime < appointment_date + timedelta(minutes=duration_minutes) and slot_end > appointment_date:
+                is_available = False
+                break
+        if slot_end.time() > end_time:
+            is_available = False
+        if is_available:
+            slots.append(current_time.strftime('%H:%M'))
+        current_time = (datetime.combine(day, current_time) + timedelta(minutes=step)).time()
+    return slots
+
+
+def engine_slots(day, appointments, work_start, work_end, duration, step=30):
+    day_start = datetime.combine(day, datetime.min.time())
+    busy = merge_intervals(busy_intervals(appointments, day_start))
+    return [minutes_to_time(start) for start in available_starts(work_start, work_end, busy, duration, step)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--staff', type=int, default=20)
+    parser.add_argument('--bookings', type=int, default=50, help='bookings per staff member on the day')
+    parser.add_argument('--rounds', type=int, default=20, help='HTTP requests per staff member')
+    args = parser.parse_args()
+
+    cells = (WORK_END - WORK_START) // CELL_MINUTES
+    if args.bookings > cells:
+        parser.error(f'at most {cells} bookings of {CELL_MINUTES} minutes fit in the work day')
+
+    random.seed(42)
+    app = create_bench_app(blueprints=[(appointments_bp, '/api/appointments')])
+    day_start = datetime.combine(DAY, datetime.min.time())
+
+    with app.app_context():
+        tenant_id, staff_ids, service_id = seed_tenant(staff_count=args.staff, service_minutes=30)
+        appointments_by_staff = {}
+        rows = []
+        for staff_id in staff_ids:
+            starts = sorted(random.sample(range(cells), args.bookings))
+            appointments_by_staff[staff_id] = [
+                (day_start + timedelta(minutes=WORK_START + cell * CELL_MINUTES), CELL_MINUTES) for cell in starts
+            ]
+            rows.extend(
+                Appointment(
+                    tenant_id=tenant_id, client_id=1, service_id=service_id, staff_id=staff_id,
+                    appointment_date=start, duration_minutes=minutes, price=40.0, final_price=40.0
+                )
+                for start, minutes in appointments_by_staff[staff_id]
+            )
+        db.session.add_all(rows)
+        db.session.commit()
+    print(f'seeded {len(rows)} bookings for {args.staff} staff on {DAY.isoformat()}')
+
+    # Engine only, same inputs for both implementations
+    for duration, step in ((30, 30), (60, 30), (30, 5)):
+        label = f'duration={duration} step={step}'
+        engine = timed(f'engine   {label}', args.staff, lambda: {
+            staff_id: engine_slots(DAY, appointments, WORK_START, WORK_END, duration, step)
+            for staff_id, appointments in appointments_by_staff.items()
+        })
+        legacy = timed(f'per-slot {label}', args.staff, lambda: {
+            staff_id: legacy_slots(DAY, appointments, WORK_START, WORK_END, duration, step)
+            for staff_id, appointments in appointments_by_staff.items()
+        })
+        assert engine == legacy, f'engine and per-slot scan disagree ({label})'
+
+    # Full request: query, merge, sweep and JSON
+    client = api_client(app, tenant_id)
+    latencies = []
+    for _ in range(args.rounds):
+        for staff_id in staff_ids:
+            started = time.perf_counter()
+            response = client.get('/api/appointments/availability', query_string={
+                'staff_id': staff_id, 'service_id': service_id, 'date': DAY.isoformat()
+            })
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.get_json()
+    report_latencies('GET /api/appointments/availability', latencies)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark of client type-ahead search on a large tenant
+
+Seeds N clients (100k by default) with generated names, emails and phones in
+one tenant, plus a second tenant of the same size so the tenant filter has
+work to do. For a set of type-ahead terms it times the ranked search path
+(FTS5 trigram index on SQLite) against the original ILIKE '%term%' scan,
+then reports GET /api/clients/search latency.
+
+Usage: python benchmarks/bench_client_search.py [--clients 100000] [--rounds 20]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from support import api_client, create_bench_app, report_latencies, seed_tenant
+
+from sqlalchemy import or_
+
+from src.models import db, Client
+from src.routes.clients import clients_bp
+from src.utils.client_search import apply_search
+
+FIRST_NAMES = [
+    'Ana', 'Antônio', 'Beatriz', 'Bruno', 'Carla', 'Carlos', 'Daniel', 'Débora', 'Eduardo', 'Fernanda',
+    'Francisco', 'Gabriel', 'Helena', 'Igor', 'Joana', 'João', 'José', 'Júlia', 'Lucas', 'Luana',
+    'Marcos', 'Maria', 'Mateus', 'Natália', 'Paulo', 'Pedro', 'Rafael', 'Raimundo', 'Sofia', 'Tiago'
+]
+LAST_NAMES = [
+    'Almeida', 'Alves', 'Araújo', 'Barbosa', 'Cardoso', 'Carvalho', 'Castro', 'Costa', 'Dias', 'Ferreira',
+    'Gomes', 'Lima', 'Martins', 'Melo', 'Moura', 'Nascimento', 'Oliveira', 'Pereira', 'Ribeiro', 'Rocha',
+    'Santos', 'Silva', 'Soares', 'Sousa', 'Teixeira', 'Vieira'
+]
+
+# (label, term): short prefix, full name, email fragment, phone fragment, 2-char term (ILIKE fallback)
+TERMS = [
+    ('name prefix', 'Rai'),
+    ('full name', 'Maria Oliveira'),
+    ('email', 'pedro.rocha'),
+    ('phone digits', '9876-5'),
+    ('short term', 'Jo'),
+]
+
+
+def client_rows(tenant_id, count, rng):
+    for index in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        phone = f'98{rng.randrange(10**8, 10**9)}'
+        yield {
+            'tenant_id': tenant_id,
+            'name': f'{first} {last}',
+            'email': f'{first.lower()}.{last.lower()}{index}@example.com',
+            'phone': f'({phone[:2]}) {phone[2:7]}-{phone[7:]}',
+            'phone_digits': phone,
+            'is_active': True,
+            'total_appointments': 0,
+            'total_spent': 0.0
+        }
+
+
+def ilike_query(tenant_id, term):
+    """The original search: ILIKE '%term%' on name, email and phone"""
+    return Client.query.filter_by(tenant_id=tenant_id, is_active=True).filter(or_(
+        Client.name.ilike(f'%{term}%'),
+        Client.email.ilike(f'%{term}%'),
+        Client.phone.ilike(f'%{term}%')
+    )).order_by(Client.name)
+
+
+def best_of(rounds, func):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=100000, help='clients per tenant')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # File database: the FTS5 index and page cache behave as in production
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_bench_app(
+            f"sqlite:///{os.path.join(directory, 'bench.db')}",
+            blueprints=[(clients_bp, '/api/clients')]
+        )
+        with app.app_context():
+            tenant_ids = [seed_tenant(slug=f'barbearia-{index}')[0] for index in range(2)]
+            started = time.perf_counter()
+            for tenant_id in tenant_ids:
+                db.session.execute(Client.__table__.insert(), list(client_rows(tenant_id, args.clients, rng)))
+            db.session.commit()
+            print(f'seeded {args.clients} clients x {len(tenant_ids)} tenants '
+                  f'in {time.perf_counter() - started:.1f} s (FTS index maintained by triggers)')
+
+            tenant_id = tenant_ids[0]
+            for label, term in TERMS:
+                search_time, hits = best_of(args.rounds, lambda: apply_search(
+                    Client.query.filter_by(tenant_id=tenant_id, is_active=True), term, ranked=True
+                ).limit(args.limit).all())
+                scan_time, _ = best_of(max(args.rounds // 4, 1), lambda: ilike_query(tenant_id, term).limit(args.limit).all())
+                print(f'{label:>12} {term!r:>17}: search {search_time * 1000:7.2f} ms  '
+                      f'ILIKE scan {scan_time * 1000:7.2f} ms  ({len(hits)} hits)')
+
+        client = api_client(app, tenant_ids[0])
+        latencies = []
+        for _ in range(args.rounds):
+            for _, term in TERMS:
+                started = time.perf_counter()
+                response = client.get('/api/clients/search', query_string={'q': term, 'limit': args.limit})
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.get_json()
+        report_latencies('GET /api/clients/search', latencies)
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Concurrency benchmark for client statistics under parallel bookings
+
+Every booking goes to the same popular client, which is the worst case for
+the per-client counters:
+
+- POST /api/appointments from parallel clients (distinct staff/slots, so no
+  overlap rejections) reporting throughput and latency, then checks the
+  client's totals equal the bookings that succeeded and that the
+  reconciliation job finds nothing to fix;
+- the counter update alone: atomic SQL deltas against the original ORM
+  read-modify-write, counting increments lost by the latter.
+
+Runs on a WAL-mode SQLite file; writers are serialized by the database.
+
+Usage: python benchmarks/bench_client_stats.py [--clients 16] [--bookings 2000]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from support import api_client, create_bench_app, report_latencies, seed_tenant
+
+from sqlalchemy import text
+
+from src.models import db, Appointment, Client
+from src.routes.appointments import appointments_bp
+from src.utils.client_stats import apply_transition, reconcile_client_stats, stats_state
+
+
+def booking_payload(index, staff_ids, service_id):
+    # One 30-minute slot per (staff, day, half hour), all in the future
+    staff_id = staff_ids[index % len(staff_ids)]
+    slot = index // len(staff_ids)
+    day, half_hour = divmod(slot, 20)
+    start = datetime(2030, 1, 7, 8, 0) + timedelta(days=day, minutes=30 * half_hour)
+    return {
+        'client_id': 1,
+        'service_id': service_id,
+        'staff_id': staff_id,
+        'appointment_date': start.isoformat()
+    }
+
+
+def run_parallel(threads, total, work):
+    """Call work(index) for every index from `threads` threads; returns (latencies, results, elapsed)"""
+    latencies, results = [], []
+    lock = threading.Lock()
+    cursor = iter(range(total))
+
+    def worker():
+        while True:
+            with lock:
+                index = next(cursor, None)
+            if index is None:
+                return
+            started = time.perf_counter()
+            result = work(index)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                results.append(result)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return latencies, results, time.perf_counter() - started
+
+
+def client_totals(app):
+    with app.app_context():
+        return db.session.execute(
+            text('SELECT total_appointments, total_spent FROM clients WHERE id = 1')
+        ).one()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16, help='parallel HTTP clients / threads')
+    parser.add_argument('--bookings', type=int, default=2000)
+    parser.add_argument('--staff', type=int, default=20)
+    parser.add_argument('--updates', type=int, default=2000, help='counter updates in the second round')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_bench_app(
+            f"sqlite:///{os.path.join(directory, 'bench.db')}",
+            blueprints=[(appointments_bp, '/api/appointments')],
+            engine_options={'connect_args': {'timeout': 30}}
+        )
+
+        with app.app_context():
+            db.session.execute(text('PRAGMA journal_mode=WAL'))
+            tenant_id, staff_ids, service_id = seed_tenant(staff_count=args.staff, client_count=1)
+
+        # Round 1: full booking requests through the route
+        http = api_client(app, tenant_id)
+        local = threading.local()
+
+        def book(index):
+            if not hasattr(local, 'client'):
+                local.client = app.test_client()
+                local.client.environ_base.update(http.environ_base)
+            response = local.client.post('/api/appointments/', json=booking_payload(index, staff_ids, service_id))
+            return response.status_code
+
+        latencies, statuses, elapsed = run_parallel(args.clients, args.bookings, book)
+        created = statuses.count(201)
+        print(f'POST /api/appointments: {args.bookings} bookings with {args.clients} clients '
+              f'in {elapsed:.2f} s ({args.bookings / elapsed:.0f} req/s), {created} created, '
+              f'other statuses: {sorted(set(statuses) - {201})}')
+        report_latencies('POST /api/appointments', latencies)
+
+        total_appointments, total_spent = client_totals(app)
+        print(f'client totals: {total_appointments} appointments, {total_spent:.2f} spent')
+        assert total_appointments == created, 'lost increments'
+        with app.app_context():
+            reconcile_client_stats(tenant_id)
+        assert client_totals(app) == (total_appointments, total_spent), 'reconciliation disagrees'
+
+        # Round 2: the counter update alone, atomic deltas vs read-modify-write
+        with app.app_context():
+            template = db.session.execute(text('SELECT id FROM appointments LIMIT 1')).scalar()
+            state = stats_state(db.session.get(Appointment, template))
+
+        def atomic(_):
+            with app.app_context():
+                apply_transition(None, state)
+                db.session.commit()
+
+        def read_modify_write(_):
+            with app.app_context():
+                client = db.session.get(Client, 1)
+                client.total_appointments = (client.total_appointments or 0) + 1
+                client.total_spent = (client.total_spent or 0) + state.final_price
+                db.session.commit()
+
+        for title, work in (('atomic delta', atomic), ('read-modify-write', read_modify_write)):
+            with app.app_context():
+                db.session.execute(text('UPDATE clients SET total_appointments = 0, total_spent = 0 WHERE id = 1'))
+                db.session.commit()
+            _, _, elapsed = run_parallel(args.clients, args.updates, work)
+            total_appointments, _ = client_totals(app)
+            print(f'{title:>17}: {args.updates} updates in {elapsed:.2f} s '
+                  f'({args.updates / elapsed:.0f}/s), {args.updates - total_appointments} increments lost')
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Peak-RSS benchmark of upload derivative generation
+
+Writes a synthetic phone photo (12 MP JPEG by default) and, for the logo
+and gallery size sets, runs each implementation in a fresh process so
+ru_maxrss measures only that run:
+
+- pyramid: generate_derivatives (draft-mode decode, successive downscaling),
+  with and without the WebP variants;
+- per-size: the original resize_image, which copies the full decoded image
+  once per target size.
+
+Reports peak RSS above the interpreter baseline and wall time for each.
+
+Usage: python benchmarks/bench_image_pyramid.py [--megapixels 12] [--repeat 3]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+# Same size sets as src/routes/upload.py (not imported: it pulls in Flask)
+LOGO_SIZES = [(200, 200), (100, 100), (50, 50)]
+GALLERY_SIZES = [(800, 600), (400, 300), (200, 150)]
+SIZE_SETS = {'logo': LOGO_SIZES, 'gallery': GALLERY_SIZES}
+
+MODES = ('pyramid', 'pyramid+webp', 'per-size')
+
+
+def max_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def legacy_resize(image_path, sizes):
+    """The original resize_image: one full-resolution copy per size"""
+    resized_paths = []
+    with Image.open(image_path) as img:
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+        base_name, extension = os.path.splitext(image_path)
+        for width, height in sizes:
+            img_resized = img.copy()
+            img_resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+            if img_resized.size != (width, height):
+                new_img = Image.new('RGB', (width, height), (255, 255, 255))
+                new_img.paste(img_resized, ((width - img_resized.width) // 2, (height - img_resized.height) // 2))
+                img_resized = new_img
+            resized_path = f'{base_name}_{width}x{height}{extension}'
+            img_resized.save(resized_path, quality=85, optimize=True)
+            resized_paths.append(resized_path)
+    return resized_paths
+
+
+def worker(mode, size_set, image_path, repeat):
+    """Run one implementation in this process and print 'baseline peak seconds'"""
+    from src.utils.image_derivatives import generate_derivatives
+
+    sizes = SIZE_SETS[size_set]
+    baseline = max_rss_mib()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        if mode == 'per-size':
+            legacy_resize(image_path, sizes)
+        else:
+            generate_derivatives(image_path, sizes, webp=mode == 'pyramid+webp')
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f'{baseline:.1f} {max_rss_mib():.1f} {elapsed:.4f}')
+
+
+def write_photo(path, megapixels):
+    # 4:3 frame; noise keeps the JPEG from compressing to almost nothing
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    noise = Image.effect_noise((width // 8, height // 8), 64).resize((width, height))
+    gradient = Image.linear_gradient('L').resize((width, height))
+    Image.merge('RGB', (noise, gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT))).save(path, quality=92)
+    return width, height
+
+
+def run_self(*arguments):
+    return subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *arguments],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megapixels', type=float, default=12)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per process (time is averaged)')
+    parser.add_argument('--worker', nargs=3, metavar=('MODE', 'SIZES', 'IMAGE'), help=argparse.SUPPRESS)
+    parser.add_argument('--write-photo', metavar='IMAGE', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker, args.repeat)
+        return
+    if args.write_photo:
+        print(*write_photo(args.write_photo, args.megapixels))
+        return
+
+    # Linux keeps ru_maxrss across fork/exec, so this process stays small:
+    # the photo is written and every run measured in child processes
+    with tempfile.TemporaryDirectory() as directory:
+        image_path = os.path.join(directory, 'photo.jpg')
+        width, height = map(int, run_self('--megapixels', str(args.megapixels), '--write-photo', image_path))
+        print(f'source: {width}x{height} JPEG, {os.path.getsize(image_path) / 1024 / 1024:.1f} MiB on disk, '
+              f'{width * height * 3 / 1024 / 1024:.0f} MiB decoded')
+
+        for size_set in SIZE_SETS:
+            for mode in MODES:
+                baseline, peak, elapsed = map(float, run_self(
+                    '--repeat', str(args.repeat), '--worker', mode, size_set, image_path
+                ))
+                print(f'{size_set:>7} {mode:>12}: peak RSS +{peak - baseline:6.1f} MiB '
+                      f'(total {peak:6.1f} MiB)  {elapsed * 1000:6.0f} ms per upload')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Benchmark of the dashboard rollups against a 2-year synthetic history
+
+Seeds two years of appointments for one tenant (120 per day across 10 staff
+by default, mixed statuses and prices) and measures:
+
+- the backfill that rebuilds daily_tenant_stats / daily_staff_stats;
+- the per-write cost of the incremental upserts;
+- dashboard reads for week/month/year from the rollups against aggregating
+  the same period live from appointments, checking both give equal totals.
+
+Usage: python benchmarks/bench_rollups.py [--per-day 120] [--staff 10] [--rounds 20]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from support import create_bench_app, seed_tenant, timed
+
+from sqlalchemy import func
+
+from src.models import db, Appointment
+from src.models.appointment import AppointmentStatus
+from src.models.daily_stats import COUNTER_COLUMNS
+from src.utils.rollups import (
+    RollupState, _accumulate, _counters, apply_rollup_transition, backfill_daily_stats,
+    load_dashboard_stats, period_range
+)
+
+TODAY = date(2030, 12, 31)
+HISTORY_DAYS = 2 * 365
+
+STATUS_WEIGHTS = [
+    (AppointmentStatus.COMPLETED, 70),
+    (AppointmentStatus.CANCELLED, 10),
+    (AppointmentStatus.NO_SHOW, 5),
+    (AppointmentStatus.CONFIRMED, 10),
+    (AppointmentStatus.SCHEDULED, 5),
+]
+
+
+def appointment_rows(tenant_id, staff_ids, service_id, per_day, rng):
+    statuses, weights = zip(*STATUS_WEIGHTS)
+    first_day = TODAY - timedelta(days=HISTORY_DAYS - 1)
+    for offset in range(HISTORY_DAYS):
+        day_start = datetime.combine(first_day + timedelta(days=offset), datetime.min.time())
+        for index in range(per_day):
+            start = day_start + timedelta(hours=8, minutes=5 * rng.randrange(144))
+            price = float(rng.choice((25, 30, 40, 50, 70)))
+            yield {
+                'tenant_id': tenant_id,
+                'client_id': 1,
+                'service_id': service_id,
+                'staff_id': staff_ids[index % len(staff_ids)],
+                'appointment_date': start,
+                'duration_minutes': 30,
+                'end_at': start + timedelta(minutes=30),
+                'status': rng.choices(statuses, weights)[0],
+                'price': price,
+                'discount': 0.0,
+                'final_price': price
+            }
+
+
+def live_totals(tenant_id, start, end):
+    """Aggregate the period straight from appointments (what the dashboard would do without rollups)"""
+    rows = db.session.query(
+        Appointment.status,
+        func.count(Appointment.id),
+        func.coalesce(func.sum(Appointment.final_price), 0.0)
+    ).filter(
+        Appointment.tenant_id == tenant_id,
+        Appointment.appointment_date >= datetime.combine(start, datetime.min.time()),
+        Appointment.appointment_date < datetime.combine(end + timedelta(days=1), datetime.min.time())
+    ).group_by(Appointment.status).all()
+
+    totals = {}
+    for status, count, total in rows:
+        counters = _counters(RollupState(tenant_id, None, None, status, float(total)), 1)
+        for name in ('appointments_count', 'completed_count', 'cancelled_count'):
+            counters[name] *= count
+        _accumulate(totals, 'all', counters)
+    totals = totals.get('all', dict.fromkeys(COUNTER_COLUMNS, 0))
+    totals['revenue'] = round(totals['revenue'], 2)
+    totals['completed_revenue'] = round(totals['completed_revenue'], 2)
+    return totals
+
+
+def best_of(rounds, func):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--per-day', type=int, default=120, help='appointments per day')
+    parser.add_argument('--staff', type=int, default=10)
+    parser.add_argument('--writes', type=int, default=1000, help='incremental upserts to time')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_bench_app(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        with app.app_context():
+            tenant_id, staff_ids, service_id = seed_tenant(staff_count=args.staff, client_count=1)
+            rows = list(appointment_rows(tenant_id, staff_ids, service_id, args.per_day, rng))
+            started = time.perf_counter()
+            db.session.execute(Appointment.__table__.insert(), rows)
+            db.session.commit()
+            print(f'seeded {len(rows)} appointments over {HISTORY_DAYS} days in {time.perf_counter() - started:.1f} s')
+
+            days = timed('backfill_daily_stats', len(rows), lambda: backfill_daily_stats(tenant_id))
+            print(f'rollup rows: {days} tenant days, {days * args.staff} staff days (at most)')
+
+            # Incremental maintenance: one upsert pair per booking, committed like a request
+            states = [
+                RollupState(tenant_id, row['staff_id'], TODAY + timedelta(days=1 + index % 30), row['status'], row['final_price'])
+                for index, row in enumerate(rows[:args.writes])
+            ]
+
+            def incremental():
+                for state in states:
+                    apply_rollup_transition(None, state)
+                    db.session.commit()
+
+            timed('incremental upsert + commit', len(states), incremental)
+
+            for period in ('week', 'month', 'year'):
+                start, end = period_range(period, today=TODAY)
+                rollup_time, summary = best_of(args.rounds, lambda: load_dashboard_stats(tenant_id, start, end))
+                live_time, totals = best_of(max(args.rounds // 4, 1), lambda: live_totals(tenant_id, start, end))
+                assert summary['totals'] == totals, f'rollups and live aggregate disagree ({period})'
+                print(f'{period:>5}: rollups {rollup_time * 1000:7.2f} ms  live scan {live_time * 1000:8.2f} ms  '
+                      f'({summary["totals"]["appointments_count"]} appointments counted)')
+
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
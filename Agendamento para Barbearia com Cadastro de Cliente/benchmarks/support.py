@@ -0,0 +1,102 @@
+"""Shared setup for the multi-tenant benchmarks
+
+Builds a minimal Flask app on a throwaway database (all models registered,
+no background workers), seeds a tenant with staff, one service and clients,
+and provides an authenticated test client bound to that tenant.
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, g
+from flask_jwt_extended import JWTManager, create_access_token
+
+from src.models import db, Tenant, Staff, Service, Client
+# Models not re-exported by src.models must be registered before create_all
+import src.models.daily_stats, src.models.media, src.models.notification, src.models.slot_bitmap  # noqa: F401,E401
+
+WORK_WEEK = {
+    day: {'start': '08:00', 'end': '20:00'}
+    for day in ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday')
+}
+
+
+def create_bench_app(database_uri='sqlite://', blueprints=(), engine_options=None):
+    """Flask app with the schema created; `blueprints` is a list of (blueprint, url_prefix)"""
+    app = Flask('bench')
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_uri,
+        SQLALCHEMY_ENGINE_OPTIONS=engine_options or {},
+        JWT_SECRET_KEY='benchmark-secret-key-with-32-bytes-or-more'
+    )
+    db.init_app(app)
+    JWTManager(app)
+    for blueprint, url_prefix in blueprints:
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed_tenant(staff_count=1, client_count=1, slug='barbearia-bench', service_minutes=30, price=40.0):
+    """Create a tenant, its staff, one service and clients (call inside an app context)"""
+    tenant = Tenant(name='Barbearia Bench', slug=slug)
+    db.session.add(tenant)
+    db.session.flush()
+
+    staff = [
+        Staff(tenant_id=tenant.id, name=f'Barbeiro {index}', work_schedule=WORK_WEEK)
+        for index in range(staff_count)
+    ]
+    service = Service(tenant_id=tenant.id, name='Corte', price=price, duration_minutes=service_minutes)
+    db.session.add_all(staff + [service])
+    db.session.flush()
+
+    if client_count:
+        db.session.execute(Client.__table__.insert(), [
+            {
+                'tenant_id': tenant.id,
+                'name': f'Cliente {index}',
+                'phone': f'9899{index:07d}',
+                'phone_digits': f'9899{index:07d}',
+                'is_active': True,
+                'total_appointments': 0,
+                'total_spent': 0.0
+            }
+            for index in range(client_count)
+        ])
+    db.session.commit()
+    return tenant.id, [member.id for member in staff], service.id
+
+
+def api_client(app, tenant_id):
+    """Test client sending a valid JWT, with g.current_tenant set as TenantMiddleware would"""
+    @app.before_request
+    def set_tenant():
+        g.current_tenant = db.session.get(Tenant, tenant_id)
+
+    with app.app_context():
+        token = create_access_token(identity='1')
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
+
+
+def timed(title, count, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f'{title}: {count} ops in {elapsed * 1000:.0f} ms ({elapsed / max(count, 1) * 1e6:.2f} us/op)')
+    return result
+
+
+def report_latencies(title, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f'{title}: n={len(ordered)} p50={statistics.median(ordered) * 1000:.2f} ms '
+        f'p95={p95 * 1000:.2f} ms max={ordered[-1] * 1000:.2f} ms'
+    )
@@ -0,0 +1,96 @@
+"""Busca de clientes: phone_digits, trigramas (PostgreSQL) e FTS5 (SQLite)
+
+Revision ID: c4d8e2f1a6b3
+Revises: b7e2d4f6a8c1
+Create Date: 2026-10-18 11:00:00
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e2f1a6b3'
+down_revision = 'b7e2d4f6a8c1'
+branch_labels = None
+depends_on = None
+
+POSTGRES_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS ix_clients_name_trgm ON clients USING gin (name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_clients_email_trgm ON clients USING gin (email gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_clients_phone_digits_trgm ON clients USING gin (phone_digits gin_trgm_ops)',
+]
+
+SQLITE_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5("
+    "name, email, phone_digits, content='clients', content_rowid='id', tokenize='trigram')"
+)
+
+SQLITE_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS clients_fts_ai AFTER INSERT ON clients BEGIN "
+    "INSERT INTO clients_fts(rowid, name, email, phone_digits) "
+    "VALUES (new.id, new.name, new.email, new.phone_digits); END",
+    "CREATE TRIGGER IF NOT EXISTS clients_fts_ad AFTER DELETE ON clients BEGIN "
+    "INSERT INTO clients_fts(clients_fts, rowid, name, email, phone_digits) "
+    "VALUES ('delete', old.id, old.name, old.email, old.phone_digits); END",
+    "CREATE TRIGGER IF NOT EXISTS clients_fts_au AFTER UPDATE ON clients BEGIN "
+    "INSERT INTO clients_fts(clients_fts, rowid, name, email, phone_digits) "
+    "VALUES ('delete', old.id, old.name, old.email, old.phone_digits); "
+    "INSERT INTO clients_fts(rowid, name, email, phone_digits) "
+    "VALUES (new.id, new.name, new.email, new.phone_digits); END",
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    
+    # init_db pode já ter criado a coluna, os índices e a tabela FTS em bancos novos
+    columns = {column['name'] for column in inspector.get_columns('clients')}
+    if 'phone_digits' not in columns:
+        op.add_column('clients', sa.Column('phone_digits', sa.String(length=20), nullable=True))
+    
+    # Normalizar telefones existentes
+    clients = sa.table('clients', sa.column('id', sa.Integer), sa.column('phone', sa.String),
+                       sa.column('phone_digits', sa.String))
+    rows = bind.execute(
+        sa.select(clients.c.id, clients.c.phone).where(clients.c.phone_digits.is_(None))
+    ).fetchall()
+    if rows:
+        bind.execute(
+            clients.update().where(clients.c.id == sa.bindparam('client_id')).values(
+                phone_digits=sa.bindparam('digits')
+            ),
+            [{'client_id': row.id, 'digits': re.sub(r'\D', '', row.phone or '')} for row in rows]
+        )
+    
+    op.create_index('ix_clients_tenant_phone_digits', 'clients', ['tenant_id', 'phone_digits'], if_not_exists=True)
+    
+    if bind.dialect.name == 'postgresql':
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+    elif bind.dialect.name == 'sqlite':
+        if 'clients_fts' not in inspector.get_table_names():
+            op.execute(SQLITE_FTS_TABLE)
+            # Indexar as linhas já existentes
+            op.execute("INSERT INTO clients_fts(clients_fts) VALUES ('rebuild')")
+        for statement in SQLITE_TRIGGERS:
+            op.execute(statement)
+
+
+def downgrade():
+    bind = op.get_bind()
+    
+    if bind.dialect.name == 'postgresql':
+        for name in ('ix_clients_name_trgm', 'ix_clients_email_trgm', 'ix_clients_phone_digits_trgm'):
+            op.execute(f'DROP INDEX IF EXISTS {name}')
+    elif bind.dialect.name == 'sqlite':
+        for name in ('clients_fts_ai', 'clients_fts_ad', 'clients_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {name}')
+        op.execute('DROP TABLE IF EXISTS clients_fts')
+    
+    op.drop_index('ix_clients_tenant_phone_digits', table_name='clients', if_exists=True)
+    
+    with op.batch_alter_table('clients') as batch_op:
+        batch_op.drop_column('phone_digits')
@@ -0,0 +1,39 @@
+"""Bitmaps diários de ocupação por funcionário (staff_day_slots)
+
+Revision ID: c6e8a0b2d4f7
+Revises: a8c2e4f6b1d3
+Create Date: 2026-10-18 19:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c6e8a0b2d4f7'
+down_revision = 'a8c2e4f6b1d3'
+branch_labels = None
+depends_on = None
+
+# 288 blocos de 5 minutos, um bit cada
+MASK_BYTES = 36
+
+
+def upgrade():
+    # init_db pode já ter criado a tabela em bancos novos
+    if 'staff_day_slots' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'staff_day_slots',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id'), nullable=False),
+            sa.Column('staff_id', sa.Integer(), sa.ForeignKey('staff.id'), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('busy_mask', sa.LargeBinary(length=MASK_BYTES), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.UniqueConstraint('staff_id', 'date', name='uq_staff_day_slots_staff_date')
+        )
+    op.create_index('ix_staff_day_slots_tenant_date', 'staff_day_slots', ['tenant_id', 'date'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_staff_day_slots_tenant_date', table_name='staff_day_slots', if_exists=True)
+    op.drop_table('staff_day_slots')
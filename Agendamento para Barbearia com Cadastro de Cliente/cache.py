@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Marcador para diferenciar "não encontrado" de valores None armazenados
+MISSING = object()
+
+class LRUTTLCache:
+    """Cache em memória com despejo LRU, expiração por item e contadores de acerto/erro"""
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """Obter valor válido ou `default`"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Armazenar valor, despejando o item menos usado se necessário"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remover item se existir"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remover todos os itens"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Contadores para monitoramento"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'size': len(self._data),
+                'max_size': self.max_size
+            }
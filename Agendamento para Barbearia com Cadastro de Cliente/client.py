@@ -1,11 +1,20 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Date, Float
+import re
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Date, Float, Index, event
 from sqlalchemy.orm import relationship
 from . import db
 
 class Client(db.Model):
     """Modelo para clientes das barbearias"""
     __tablename__ = 'clients'
+    __table_args__ = (
+        # Verificação de duplicidade por telefone/email
+        Index('ix_clients_tenant_phone', 'tenant_id', 'phone'),
+        Index('ix_clients_tenant_phone_digits', 'tenant_id', 'phone_digits'),
+        Index('ix_clients_tenant_email', 'tenant_id', 'email'),
+        # Listagem ordenada por nome
+        Index('ix_clients_tenant_active_name', 'tenant_id', 'is_active', 'name'),
+    )
     
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey('tenants.id'), nullable=False)
@@ -14,6 +23,7 @@ class Client(db.Model):
     name = Column(String(100), nullable=False)
     email = Column(String(120))
     phone = Column(String(20), nullable=False)
+    phone_digits = Column(String(20))  # Telefone normalizado (apenas dígitos) para busca
     birth_date = Column(Date)
     
     # Informações adicionais
@@ -56,3 +66,12 @@ class Client(db.Model):
     def __repr__(self):
         return f'<Client {self.name} - {self.phone}>'
 
+def normalize_phone(phone):
+    """Manter apenas os dígitos do telefone"""
+    return re.sub(r'\D', '', phone or '')
+
+@event.listens_for(Client, 'before_insert')
+@event.listens_for(Client, 'before_update')
+def sync_phone_digits(mapper, connection, target):
+    """Manter phone_digits coerente com phone"""
+    target.phone_digits = normalize_phone(target.phone)
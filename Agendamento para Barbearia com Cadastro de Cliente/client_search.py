@@ -0,0 +1,125 @@
+import re
+from sqlalchemy import event, or_, select, func, text, table, column, literal_column
+from src.models import db, Client
+from src.models.client import normalize_phone
+
+# Termos menores que um trigrama não conseguem usar os índices de busca
+MIN_INDEXED_TERM = 3
+
+FTS_TABLE = 'clients_fts'
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, email, phone_digits, content='clients', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS clients_fts_ai AFTER INSERT ON clients BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, email, phone_digits) "
+    "VALUES (new.id, new.name, new.email, new.phone_digits); END",
+    f"CREATE TRIGGER IF NOT EXISTS clients_fts_ad AFTER DELETE ON clients BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, email, phone_digits) "
+    "VALUES ('delete', old.id, old.name, old.email, old.phone_digits); END",
+    f"CREATE TRIGGER IF NOT EXISTS clients_fts_au AFTER UPDATE ON clients BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, email, phone_digits) "
+    "VALUES ('delete', old.id, old.name, old.email, old.phone_digits); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, email, phone_digits) "
+    "VALUES (new.id, new.name, new.email, new.phone_digits); END",
+]
+
+POSTGRES_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS ix_clients_name_trgm ON clients USING gin (name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_clients_email_trgm ON clients USING gin (email gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS ix_clients_phone_digits_trgm ON clients USING gin (phone_digits gin_trgm_ops)',
+]
+
+_fts_available = {}
+
+@event.listens_for(Client.__table__, 'after_create')
+def create_search_structures(target, connection, **kw):
+    """Criar índices de busca conforme o banco (FTS5 no SQLite, pg_trgm no PostgreSQL)"""
+    if connection.dialect.name == 'postgresql':
+        for statement in POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+    elif connection.dialect.name == 'sqlite':
+        try:
+            for statement in SQLITE_DDL:
+                connection.exec_driver_sql(statement)
+        except Exception:
+            # SQLite sem FTS5/trigram: a busca usa o caminho ILIKE
+            pass
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+def _has_fts():
+    """Verificar (uma vez por banco) se a tabela FTS5 existe"""
+    bind = db.session.get_bind()
+    key = str(bind.url)
+    if key not in _fts_available:
+        _fts_available[key] = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first() is not None
+    return _fts_available[key]
+
+def _looks_like_phone(term, digits):
+    return len(digits) >= MIN_INDEXED_TERM and re.fullmatch(r'[\d\s()+.\-]+', term) is not None
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+def _ilike_filter(term, digits, phone_only):
+    conditions = []
+    if not phone_only:
+        conditions += [
+            Client.name.ilike(f'%{term}%'),
+            Client.email.ilike(f'%{term}%'),
+            Client.phone.ilike(f'%{term}%')
+        ]
+    if digits:
+        conditions.append(Client.phone_digits.like(f'%{digits}%'))
+    return or_(*conditions)
+
+def apply_search(query, term, ranked=False):
+    """Aplicar busca por nome, email ou telefone a uma query de Client
+
+    Telefones são comparados apenas pelos dígitos. Com ranked=True os
+    resultados vêm ordenados por relevância (e depois por nome).
+    """
+    term = term.strip()
+    digits = normalize_phone(term)
+    phone_only = _looks_like_phone(term, digits)
+    dialect = _dialect()
+
+    if len(term) >= MIN_INDEXED_TERM and dialect == 'sqlite' and _has_fts():
+        fts = table(FTS_TABLE, column('rowid'))
+        if phone_only:
+            match = f'phone_digits : {_fts_phrase(digits)}'
+        else:
+            match = _fts_phrase(term)
+        hits = select(
+            fts.c.rowid.label('client_id'),
+            func.bm25(literal_column(FTS_TABLE)).label('rank')
+        ).where(
+            text(f'{FTS_TABLE} MATCH :fts_match').bindparams(fts_match=match)
+        ).subquery()
+
+        query = query.join(hits, Client.id == hits.c.client_id)
+        if ranked:
+            query = query.order_by(hits.c.rank, Client.name)
+        return query
+
+    # PostgreSQL: ILIKE/LIKE usam os índices GIN de trigramas
+    query = query.filter(_ilike_filter(term, digits, phone_only))
+    if ranked:
+        if dialect == 'postgresql':
+            if phone_only:
+                relevance = func.similarity(Client.phone_digits, digits)
+            else:
+                relevance = func.greatest(
+                    func.similarity(Client.name, term),
+                    func.similarity(func.coalesce(Client.email, ''), term)
+                )
+            query = query.order_by(relevance.desc(), Client.name)
+        else:
+            query = query.order_by(Client.name)
+    return query
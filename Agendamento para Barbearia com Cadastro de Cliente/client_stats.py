@@ -0,0 +1,101 @@
+from collections import namedtuple
+from sqlalchemy import update, case, func
+from src.models import db, Appointment, Client
+from src.models.appointment import AppointmentStatus
+
+# Agendamentos que não entram nas estatísticas do cliente
+UNCOUNTED_STATUSES = (AppointmentStatus.CANCELLED, AppointmentStatus.NO_SHOW)
+
+# Contribuição de um agendamento para as estatísticas do cliente
+StatsState = namedtuple('StatsState', ['client_id', 'final_price', 'appointment_date'])
+
+def stats_state(appointment):
+    """Capturar a contribuição atual do agendamento (None se não conta)"""
+    if appointment is None or appointment.status in UNCOUNTED_STATUSES:
+        return None
+    return StatsState(appointment.client_id, appointment.final_price or 0.0, appointment.appointment_date)
+
+def _apply_delta(client_id, count, spent, visit=None):
+    """UPDATE atômico no banco, sem ler-modificar-escrever no ORM"""
+    values = {
+        'total_appointments': func.coalesce(Client.total_appointments, 0) + count,
+        'total_spent': func.coalesce(Client.total_spent, 0.0) + spent
+    }
+    if visit is not None:
+        values['last_visit'] = case(
+            (Client.last_visit.is_(None), visit),
+            (Client.last_visit < visit, visit),
+            else_=Client.last_visit
+        )
+
+    db.session.execute(
+        update(Client).where(Client.id == client_id).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+def apply_transition(before, after):
+    """Aplicar a diferença entre dois estados (create: before=None, delete: after=None)
+
+    last_visit só avança; recuos após cancelamentos são corrigidos pela
+    reconciliação.
+    """
+    if before == after:
+        return
+
+    deltas = {}
+    if before:
+        count, spent = deltas.get(before.client_id, (0, 0.0))
+        deltas[before.client_id] = (count - 1, spent - before.final_price)
+    if after:
+        count, spent = deltas.get(after.client_id, (0, 0.0))
+        deltas[after.client_id] = (count + 1, spent + after.final_price)
+
+    for client_id, (count, spent) in deltas.items():
+        visit = after.appointment_date if after and after.client_id == client_id else None
+        if count or spent or visit:
+            _apply_delta(client_id, count, spent, visit)
+
+def apply_created(states):
+    """Somar vários agendamentos novos com um UPDATE por cliente (criação em lote)"""
+    totals = {}
+    for state in states:
+        if state is None:
+            continue
+        count, spent, visit = totals.get(state.client_id, (0, 0.0, None))
+        visit = state.appointment_date if visit is None else max(visit, state.appointment_date)
+        totals[state.client_id] = (count + 1, spent + state.final_price, visit)
+
+    for client_id, (count, spent, visit) in totals.items():
+        _apply_delta(client_id, count, spent, visit)
+
+def reconcile_client_stats(tenant_id):
+    """Recalcular as estatísticas de todos os clientes do tenant com uma consulta agrupada"""
+    rows = db.session.query(
+        Appointment.client_id,
+        func.count(Appointment.id),
+        func.coalesce(func.sum(Appointment.final_price), 0.0),
+        func.max(Appointment.appointment_date)
+    ).filter(
+        Appointment.tenant_id == tenant_id,
+        Appointment.status.notin_(UNCOUNTED_STATUSES)
+    ).group_by(Appointment.client_id).all()
+
+    totals = {
+        client_id: (count, spent, last_visit)
+        for client_id, count, spent, last_visit in rows
+    }
+
+    client_ids = [client_id for (client_id,) in db.session.query(Client.id).filter_by(tenant_id=tenant_id)]
+    mappings = []
+    for client_id in client_ids:
+        count, spent, last_visit = totals.get(client_id, (0, 0.0, None))
+        mappings.append({
+            'id': client_id,
+            'total_appointments': count,
+            'total_spent': float(spent),
+            'last_visit': last_visit
+        })
+
+    db.session.bulk_update_mappings(Client, mappings)
+    db.session.commit()
+    return len(mappings)
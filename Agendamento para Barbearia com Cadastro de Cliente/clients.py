@@ -1,11 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_
-from src.models import db, Client
+from src.models import db, Client, Appointment
+from src.models.appointment import AppointmentStatus
+from src.utils.query_options import get_view, appointment_options, VIEW_EXPANDED
+from src.utils.pagination import paginate_keyset
+from src.utils.client_search import apply_search
+from src.utils.client_stats import reconcile_client_stats
 from src.middleware.tenant import get_current_tenant
 from datetime import datetime
 import json
+import click
 
 clients_bp = Blueprint('clients', __name__)
 
@@ -31,15 +36,26 @@ def list_clients():
         if is_active is not None:
             query = query.filter_by(is_active=is_active)
         
-        # Busca por nome, email ou telefone
+        # Busca por nome, email ou telefone (índices FTS5/trigramas)
         if search:
-            query = query.filter(
-                or_(
-                    Client.name.ilike(f'%{search}%'),
-                    Client.email.ilike(f'%{search}%'),
-                    Client.phone.ilike(f'%{search}%')
-                )
+            query = apply_search(query, search)
+        
+        # Paginação por cursor (opt-in): chave (name, id)
+        if 'cursor' in request.args:
+            clients, next_cursor, total = paginate_keyset(
+                query,
+                [Client.name, Client.id],
+                cursor=request.args.get('cursor'),
+                per_page=per_page,
+                include_total=request.args.get('include_total', 'true').lower() == 'true'
             )
+            
+            return jsonify({
+                'clients': [client.to_dict() for client in clients],
+                'next_cursor': next_cursor,
+                'total': total,
+                'per_page': per_page
+            }), 200
         
         # Ordenar por nome
         query = query.order_by(Client.name)
@@ -59,6 +75,8 @@ def list_clients():
             'per_page': per_page
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': 'Parâmetros inválidos: ' + str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -166,7 +184,12 @@ def get_client(client_id):
                 'status': apt.status.value if apt.status else None,
                 'final_price': apt.final_price
             }
-            for apt in sorted(client.appointments, key=lambda x: x.appointment_date, reverse=True)
+            for apt in Appointment.query.options(
+                *appointment_options('history')
+            ).filter_by(
+                client_id=client.id,
+                tenant_id=tenant.id
+            ).order_by(Appointment.appointment_date.desc()).all()
         ]
         
         return jsonify({'client': client_data}), 200
@@ -304,24 +327,32 @@ def get_client_appointments(client_id):
         # Parâmetros de filtro
         status = request.args.get('status')
         limit = int(request.args.get('limit', 50))
+        view = get_view(request.args)
         
-        # Query de agendamentos
-        appointments = client.appointments
+        # Query de agendamentos com relacionamentos carregados em lote
+        query = Appointment.query.options(
+            *appointment_options('list', view)
+        ).filter_by(
+            client_id=client.id,
+            tenant_id=tenant.id
+        )
         
         # Filtrar por status se especificado
         if status:
-            appointments = [apt for apt in appointments if apt.status.value == status]
+            query = query.filter_by(status=AppointmentStatus(status))
         
         # Ordenar por data (mais recentes primeiro) e limitar
-        appointments = sorted(appointments, key=lambda x: x.appointment_date, reverse=True)[:limit]
+        appointments = query.order_by(Appointment.appointment_date.desc()).limit(limit).all()
         
         return jsonify({
             'client_id': client_id,
             'client_name': client.name,
-            'appointments': [apt.to_dict() for apt in appointments],
+            'appointments': [apt.to_dict(expand=view == VIEW_EXPANDED) for apt in appointments],
             'total': len(appointments)
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': 'Parâmetros inválidos: ' + str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -340,17 +371,12 @@ def search_clients():
         if not search_term:
             return jsonify({'clients': []}), 200
         
-        # Buscar por nome, email ou telefone
-        clients = Client.query.filter_by(
+        # Buscar por nome, email ou telefone, ordenado por relevância
+        query = Client.query.filter_by(
             tenant_id=tenant.id,
             is_active=True
-        ).filter(
-            or_(
-                Client.name.ilike(f'%{search_term}%'),
-                Client.email.ilike(f'%{search_term}%'),
-                Client.phone.ilike(f'%{search_term}%')
-            )
-        ).order_by(Client.name).limit(limit).all()
+        )
+        clients = apply_search(query, search_term, ranked=True).limit(limit).all()
         
         return jsonify({
             'clients': [client.to_dict() for client in clients],
@@ -360,3 +386,15 @@ def search_clients():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@clients_bp.cli.command('reconcile-stats')
+@click.option('--tenant-id', type=int, default=None, help='Reconciliar apenas um tenant')
+def reconcile_stats_command(tenant_id):
+    """Recalcular total_appointments, total_spent e last_visit dos clientes"""
+    if tenant_id is not None:
+        tenant_ids = [tenant_id]
+    else:
+        tenant_ids = [row[0] for row in db.session.query(Client.tenant_id).distinct()]
+    
+    for current_tenant_id in tenant_ids:
+        updated = reconcile_client_stats(current_tenant_id)
+        click.echo(f'Tenant {current_tenant_id}: {updated} clientes reconciliados')
@@ -32,6 +32,20 @@ class Config:
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'True').lower() == 'true'
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_USE_SSL = os.environ.get('MAIL_USE_SSL', 'False').lower() == 'true'
+    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')
+    MAIL_TIMEOUT = int(os.environ.get('MAIL_TIMEOUT', 10))
+    
+    # Fila de notificações: worker em segundo plano que envia em lotes com novas tentativas
+    NOTIFICATION_WORKER_ENABLED = os.environ.get('NOTIFICATION_WORKER_ENABLED', 'True').lower() == 'true'
+    NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 50))
+    NOTIFICATION_POLL_INTERVAL = int(os.environ.get('NOTIFICATION_POLL_INTERVAL', 15))
+    NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', 8))
+    
+    # Lembretes: antecedência do aviso e janela carregada em memória pelo agendador
+    REMINDER_ENABLED = os.environ.get('REMINDER_ENABLED', 'True').lower() == 'true'
+    REMINDER_LEAD_MINUTES = int(os.environ.get('REMINDER_LEAD_MINUTES', 120))
+    REMINDER_WINDOW_HOURS = int(os.environ.get('REMINDER_WINDOW_HOURS', 6))
     
     # Configurações de Upload
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
@@ -45,6 +59,24 @@ class Config:
     DEFAULT_TENANT_PLAN = os.environ.get('DEFAULT_TENANT_PLAN', 'basic')
     TENANT_SUBDOMAIN_ENABLED = os.environ.get('TENANT_SUBDOMAIN_ENABLED', 'True').lower() == 'true'
     
+    # Cache de resolução de tenant (LRU local + Redis opcional)
+    TENANT_CACHE_TTL = int(os.environ.get('TENANT_CACHE_TTL', 60))
+    TENANT_CACHE_MAX_SIZE = int(os.environ.get('TENANT_CACHE_MAX_SIZE', 1024))
+    TENANT_CACHE_REDIS_ENABLED = os.environ.get('TENANT_CACHE_REDIS_ENABLED', 'False').lower() == 'true'
+    
+    # Idade máxima (segundos) do snapshot do diretório público antes de reconstruir
+    DIRECTORY_CACHE_TTL = int(os.environ.get('DIRECTORY_CACHE_TTL', 300))
+    
+    # Validade (segundos) dos resultados de analytics por tenant e período
+    ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', 300))
+    
+    # Validade máxima (segundos) do bundle do site; escritas de configuração o descartam antes
+    SITE_BUNDLE_TTL = int(os.environ.get('SITE_BUNDLE_TTL', 600))
+    
+    # Pool de processos que gera as versões redimensionadas dos uploads
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+    IMAGE_MAX_PENDING = int(os.environ.get('IMAGE_MAX_PENDING', 16))
+    
     # Configurações de CORS
     CORS_ORIGINS = ['http://localhost:3000', 'http://localhost:5000', 'http://localhost:5173']
 
@@ -68,6 +100,8 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    NOTIFICATION_WORKER_ENABLED = False
+    REMINDER_ENABLED = False
 
 # Dicionário de configurações
 config = {
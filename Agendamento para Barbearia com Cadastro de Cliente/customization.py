@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError
 from src.models import db, TenantConfig
 from src.middleware.tenant import get_current_tenant
+from src.middleware.tenant_cache import invalidate_tenant
+from src.utils.site_bundle import bundle_response
 import json
 import re
 
@@ -61,27 +63,7 @@ def get_theme():
         if not tenant:
             return jsonify({'error': 'Tenant não encontrado'}), 404
         
-        config = TenantConfig.query.filter_by(tenant_id=tenant.id).first()
-        
-        if not config:
-            # Retornar configurações padrão
-            return jsonify({
-                'theme': {
-                    'primary_color': '#1A1A1A',
-                    'secondary_color': '#B8860B',
-                    'accent_color': '#8B0000',
-                    'logo_url': None
-                }
-            }), 200
-        
-        return jsonify({
-            'theme': {
-                'primary_color': config.primary_color,
-                'secondary_color': config.secondary_color,
-                'accent_color': config.accent_color,
-                'logo_url': config.logo_url
-            }
-        }), 200
+        return bundle_response(tenant, 'theme')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -124,6 +106,7 @@ def update_theme():
             config.accent_color = f"#{data['accent_color'].lstrip('#')}"
         
         db.session.commit()
+        invalidate_tenant(tenant)
         
         return jsonify({
             'message': 'Tema atualizado com sucesso',
@@ -148,24 +131,7 @@ def get_business_info():
         if not tenant:
             return jsonify({'error': 'Tenant não encontrado'}), 404
         
-        config = TenantConfig.query.filter_by(tenant_id=tenant.id).first()
-        
-        business_info = {
-            'business_name': config.business_name if config else None,
-            'description': config.description if config else None,
-            'address': config.address if config else None,
-            'city': config.city if config else 'Brejo',
-            'state': config.state if config else 'MA',
-            'zip_code': config.zip_code if config else None,
-            'phone': config.phone if config else None,
-            'email': config.email if config else None,
-            'website': config.website if config else None,
-            'instagram': config.instagram if config else None,
-            'facebook': config.facebook if config else None,
-            'whatsapp': config.whatsapp if config else None
-        }
-        
-        return jsonify({'business_info': business_info}), 200
+        return bundle_response(tenant, 'business_info')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -214,6 +180,7 @@ def update_business_info():
                 setattr(config, field, data[field])
         
         db.session.commit()
+        invalidate_tenant(tenant)
         
         return jsonify({
             'message': 'Informações atualizadas com sucesso',
@@ -246,28 +213,7 @@ def get_opening_hours():
         if not tenant:
             return jsonify({'error': 'Tenant não encontrado'}), 404
         
-        config = TenantConfig.query.filter_by(tenant_id=tenant.id).first()
-        
-        # Horários padrão
-        default_hours = {
-            'monday': {'open': '08:00', 'close': '18:00', 'closed': False},
-            'tuesday': {'open': '08:00', 'close': '18:00', 'closed': False},
-            'wednesday': {'open': '08:00', 'close': '18:00', 'closed': False},
-            'thursday': {'open': '08:00', 'close': '18:00', 'closed': False},
-            'friday': {'open': '08:00', 'close': '18:00', 'closed': False},
-            'saturday': {'open': '08:00', 'close': '16:00', 'closed': False},
-            'sunday': {'open': '08:00', 'close': '16:00', 'closed': True}
-        }
-        
-        opening_hours = default_hours
-        if config and config.opening_hours:
-            try:
-                saved_hours = json.loads(config.opening_hours)
-                opening_hours.update(saved_hours)
-            except json.JSONDecodeError:
-                pass  # Usar horários padrão se JSON inválido
-        
-        return jsonify({'opening_hours': opening_hours}), 200
+        return bundle_response(tenant, 'opening_hours')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -319,6 +265,7 @@ def update_opening_hours():
         
         config.opening_hours = json.dumps(opening_hours)
         db.session.commit()
+        invalidate_tenant(tenant)
         
         return jsonify({
             'message': 'Horários atualizados com sucesso',
@@ -338,16 +285,7 @@ def get_policies():
         if not tenant:
             return jsonify({'error': 'Tenant não encontrado'}), 404
         
-        config = TenantConfig.query.filter_by(tenant_id=tenant.id).first()
-        
-        policies = {}
-        if config and config.policies:
-            try:
-                policies = json.loads(config.policies)
-            except json.JSONDecodeError:
-                policies = {}
-        
-        return jsonify({'policies': policies}), 200
+        return bundle_response(tenant, 'policies')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -376,6 +314,7 @@ def update_policies():
         
         config.policies = json.dumps(policies)
         db.session.commit()
+        invalidate_tenant(tenant)
         
         return jsonify({
             'message': 'Políticas atualizadas com sucesso',
@@ -395,76 +334,7 @@ def get_preview_config():
         if not tenant:
             return jsonify({'error': 'Tenant não encontrado'}), 404
         
-        config = TenantConfig.query.filter_by(tenant_id=tenant.id).first()
-        
-        if not config:
-            return jsonify({
-                'tenant_name': tenant.name,
-                'theme': {
-                    'primary_color': '#1A1A1A',
-                    'secondary_color': '#B8860B',
-                    'accent_color': '#8B0000',
-                    'logo_url': None
-                },
-                'business_info': {
-                    'business_name': None,
-                    'description': None,
-                    'address': None,
-                    'city': 'Brejo',
-                    'state': 'MA',
-                    'phone': None,
-                    'email': None,
-                    'website': None,
-                    'instagram': None,
-                    'facebook': None,
-                    'whatsapp': None
-                },
-                'opening_hours': {},
-                'policies': {}
-            }), 200
-        
-        # Processar horários de funcionamento
-        opening_hours = {}
-        if config.opening_hours:
-            try:
-                opening_hours = json.loads(config.opening_hours)
-            except json.JSONDecodeError:
-                pass
-        
-        # Processar políticas
-        policies = {}
-        if config.policies:
-            try:
-                policies = json.loads(config.policies)
-            except json.JSONDecodeError:
-                pass
-        
-        return jsonify({
-            'tenant_name': tenant.name,
-            'theme': {
-                'primary_color': config.primary_color,
-                'secondary_color': config.secondary_color,
-                'accent_color': config.accent_color,
-                'logo_url': config.logo_url
-            },
-            'business_info': {
-                'business_name': config.business_name,
-                'description': config.description,
-                'address': config.address,
-                'city': config.city,
-                'state': config.state,
-                'zip_code': config.zip_code,
-                'phone': config.phone,
-                'email': config.email,
-                'website': config.website,
-                'instagram': config.instagram,
-                'facebook': config.facebook,
-                'whatsapp': config.whatsapp
-            },
-            'opening_hours': opening_hours,
-            'policies': policies
-        }), 200
+        return bundle_response(tenant, 'preview')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-
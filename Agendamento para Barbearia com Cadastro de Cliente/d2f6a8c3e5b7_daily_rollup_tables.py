@@ -0,0 +1,61 @@
+"""Tabelas de agregados diários do dashboard (daily_tenant_stats, daily_staff_stats)
+
+Revision ID: d2f6a8c3e5b7
+Revises: c4d8e2f1a6b3
+Create Date: 2026-10-18 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6a8c3e5b7'
+down_revision = 'c4d8e2f1a6b3'
+branch_labels = None
+depends_on = None
+
+
+def _counter_columns():
+    return [
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('appointments_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cancelled_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('completed_revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ]
+
+
+def upgrade():
+    # init_db pode já ter criado as tabelas em bancos novos
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if 'daily_tenant_stats' not in tables:
+        op.create_table(
+            'daily_tenant_stats',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id'), nullable=False),
+            *_counter_columns(),
+            sa.UniqueConstraint('tenant_id', 'date', name='uq_daily_tenant_stats_tenant_date')
+        )
+    
+    if 'daily_staff_stats' not in tables:
+        op.create_table(
+            'daily_staff_stats',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id'), nullable=False),
+            sa.Column('staff_id', sa.Integer(), sa.ForeignKey('staff.id'), nullable=False),
+            *_counter_columns(),
+            sa.UniqueConstraint('staff_id', 'date', name='uq_daily_staff_stats_staff_date')
+        )
+    op.create_index(
+        'ix_daily_staff_stats_tenant_date', 'daily_staff_stats', ['tenant_id', 'date'], if_not_exists=True
+    )
+    
+    # Preencher com `flask tenant backfill-daily-stats` após o upgrade
+
+
+def downgrade():
+    op.drop_index('ix_daily_staff_stats_tenant_date', table_name='daily_staff_stats', if_exists=True)
+    op.drop_table('daily_staff_stats')
+    op.drop_table('daily_tenant_stats')
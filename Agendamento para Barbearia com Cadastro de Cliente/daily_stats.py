@@ -0,0 +1,72 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Index, UniqueConstraint
+from . import db
+
+# Colunas acumuladas pelas duas tabelas de agregados
+COUNTER_COLUMNS = (
+    'appointments_count',
+    'completed_count',
+    'cancelled_count',
+    'revenue',
+    'completed_revenue'
+)
+
+class DailyCountersMixin:
+    """Contadores diários mantidos de forma incremental a cada escrita de agendamento"""
+
+    date = Column(Date, nullable=False)
+
+    # Agendamentos que contam (exclui cancelados e faltas)
+    appointments_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    # Cancelados e faltas
+    cancelled_count = Column(Integer, nullable=False, default=0)
+
+    # Receita prevista (agendamentos que contam) e realizada (concluídos)
+    revenue = Column(Float, nullable=False, default=0.0)
+    completed_revenue = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat() if self.date else None,
+            'appointments_count': self.appointments_count or 0,
+            'completed_count': self.completed_count or 0,
+            'cancelled_count': self.cancelled_count or 0,
+            'revenue': round(self.revenue or 0.0, 2),
+            'completed_revenue': round(self.completed_revenue or 0.0, 2)
+        }
+
+class DailyTenantStats(DailyCountersMixin, db.Model):
+    """Agregado diário de agendamentos e receita do tenant"""
+    __tablename__ = 'daily_tenant_stats'
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'date', name='uq_daily_tenant_stats_tenant_date'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey('tenants.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<DailyTenantStats tenant={self.tenant_id} - {self.date}>'
+
+class DailyStaffStats(DailyCountersMixin, db.Model):
+    """Agregado diário de agendamentos e receita por funcionário"""
+    __tablename__ = 'daily_staff_stats'
+    __table_args__ = (
+        UniqueConstraint('staff_id', 'date', name='uq_daily_staff_stats_staff_date'),
+        Index('ix_daily_staff_stats_tenant_date', 'tenant_id', 'date'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey('tenants.id'), nullable=False)
+    staff_id = Column(Integer, ForeignKey('staff.id'), nullable=False)
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['staff_id'] = self.staff_id
+        return data
+
+    def __repr__(self):
+        return f'<DailyStaffStats staff={self.staff_id} - {self.date}>'
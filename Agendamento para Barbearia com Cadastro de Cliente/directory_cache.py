@@ -0,0 +1,144 @@
+import hashlib
+import json
+import threading
+import time
+from flask import current_app
+from sqlalchemy import or_
+from src.models import db, Tenant, TenantConfig
+from src.middleware.tenant_cache import on_tenant_invalidated
+from src.utils.cache import LRUTTLCache, MISSING
+
+# Idade a partir da qual o snapshot é reconstruído em segundo plano
+DIRECTORY_TTL = 300
+
+# Cidades mantidas em memória (a chave vem do parâmetro ?city=) e tempo máximo
+# que um snapshot não acessado é guardado para servir enquanto reconstrói
+DIRECTORY_MAX_CITIES = 256
+DIRECTORY_RETENTION = 24 * 60 * 60
+
+class DirectorySnapshot:
+    """Lista materializada das barbearias ativas de uma cidade"""
+
+    def __init__(self, city, barbershops, generation=0):
+        self.city = city
+        self.generation = generation
+        self.barbershops = barbershops
+        # Texto pesquisável pré-calculado (equivalente aos ILIKE da consulta original)
+        self.search_text = [
+            ' '.join(filter(None, [shop['name'], shop['business_name'], shop['description']])).lower()
+            for shop in barbershops
+        ]
+        payload = json.dumps(barbershops, sort_keys=True, default=str).encode('utf-8')
+        self.version = hashlib.sha1(payload).hexdigest()
+        self.built_at = time.monotonic()
+
+    def is_stale(self, ttl):
+        # Qualquer escrita de tenant após a montagem desatualiza o snapshot
+        return self.generation != _generation or time.monotonic() - self.built_at > ttl
+
+    def etag(self, *params):
+        """ETag forte: mesmo conteúdo e mesmos parâmetros produzem o mesmo corpo"""
+        key = '|'.join([self.version] + [str(param) for param in params])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def search(self, term):
+        """Filtrar por nome, nome comercial ou descrição"""
+        if not term:
+            return self.barbershops
+        term = term.lower()
+        return [
+            shop for shop, text in zip(self.barbershops, self.search_text)
+            if term in text
+        ]
+
+_snapshots = LRUTTLCache(max_size=DIRECTORY_MAX_CITIES, ttl=DIRECTORY_RETENTION)
+_rebuilding = set()
+_lock = threading.Lock()
+_generation = 0
+
+def _key(city):
+    return city.strip().lower()
+
+def _serialize(tenant, config):
+    return {
+        'id': tenant.id,
+        'name': tenant.name,
+        'slug': tenant.slug,
+        'business_name': config.business_name if config else tenant.name,
+        'description': config.description if config else None,
+        'address': config.address if config else None,
+        'city': config.city if config else 'Brejo',
+        'state': config.state if config else 'MA',
+        'phone': config.phone if config else None,
+        'email': config.email if config else None,
+        'website': config.website if config else None,
+        'instagram': config.instagram if config else None,
+        'facebook': config.facebook if config else None,
+        'whatsapp': config.whatsapp if config else None,
+        'logo_url': config.logo_url if config else None,
+        'primary_color': config.primary_color if config else '#1A1A1A',
+        'secondary_color': config.secondary_color if config else '#B8860B',
+        'opening_hours': config.opening_hours if config else None,
+        'status': 'open',  # Implementar lógica de horário de funcionamento
+        'rating': 4.5,  # Implementar sistema de avaliações
+        'total_reviews': 0  # Implementar sistema de avaliações
+    }
+
+def build_snapshot(city):
+    """Consultar as barbearias ativas da cidade uma única vez"""
+    query = db.session.query(Tenant, TenantConfig).join(
+        TenantConfig, Tenant.id == TenantConfig.tenant_id, isouter=True
+    ).filter(Tenant.status == 'active')
+
+    if city:
+        query = query.filter(
+            or_(
+                TenantConfig.city.ilike(f'%{city}%'),
+                TenantConfig.city.is_(None)  # Incluir sem cidade definida
+            )
+        )
+
+    # Geração lida antes da consulta: uma escrita durante a montagem deixa o resultado desatualizado
+    generation = _generation
+    results = query.order_by(Tenant.name).all()
+    snapshot = DirectorySnapshot(city, [_serialize(tenant, config) for tenant, config in results], generation)
+
+    _snapshots.set(_key(city), snapshot)
+    return snapshot
+
+def _rebuild_in_background(app, city):
+    try:
+        with app.app_context():
+            build_snapshot(city)
+    finally:
+        with _lock:
+            _rebuilding.discard(_key(city))
+
+def get_directory(city):
+    """Obter o snapshot da cidade, servindo versões antigas enquanto reconstrói (stale-while-revalidate)"""
+    key = _key(city)
+    snapshot = _snapshots.get(key)
+
+    if snapshot is MISSING:
+        return build_snapshot(city)
+
+    ttl = current_app.config.get('DIRECTORY_CACHE_TTL', DIRECTORY_TTL)
+    if snapshot.is_stale(ttl):
+        with _lock:
+            start = key not in _rebuilding
+            _rebuilding.add(key)
+        if start:
+            app = current_app._get_current_object()
+            threading.Thread(target=_rebuild_in_background, args=(app, city), daemon=True).start()
+
+    return snapshot
+
+@on_tenant_invalidated
+def invalidate_directory(tenant=None):
+    """Marcar todos os snapshots como desatualizados (a cidade do tenant pode ter mudado)"""
+    global _generation
+    with _lock:
+        _generation += 1
+
+def directory_cache_stats():
+    return _snapshots.stats()
@@ -0,0 +1,49 @@
+"""Manifesto de arquivos enviados (media_files)
+
+Revision ID: e5a7c9b1d3f6
+Revises: d2f6a8c3e5b7
+Create Date: 2026-10-18 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c9b1d3f6'
+down_revision = 'd2f6a8c3e5b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # init_db pode já ter criado a tabela em bancos novos
+    if 'media_files' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'media_files',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id'), nullable=False),
+            sa.Column('kind', sa.String(length=20), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('path', sa.String(length=255), nullable=False),
+            sa.Column('url', sa.String(length=255), nullable=False),
+            sa.Column('size', sa.Integer(), nullable=False),
+            sa.Column('mime_type', sa.String(length=100), nullable=True),
+            sa.Column('width', sa.Integer(), nullable=True),
+            sa.Column('height', sa.Integer(), nullable=True),
+            sa.Column('content_hash', sa.String(length=64), nullable=False),
+            sa.Column('derivatives', sa.Text(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=False, server_default='processing'),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.UniqueConstraint('tenant_id', 'kind', 'content_hash', name='uq_media_files_tenant_kind_hash'),
+            sa.UniqueConstraint('tenant_id', 'filename', name='uq_media_files_tenant_filename')
+        )
+    op.create_index(
+        'ix_media_files_tenant_created', 'media_files', ['tenant_id', 'created_at', 'id'], if_not_exists=True
+    )
+    
+    # Registrar os arquivos já enviados com `flask upload index-media` após o upgrade
+
+
+def downgrade():
+    op.drop_index('ix_media_files_tenant_created', table_name='media_files', if_exists=True)
+    op.drop_table('media_files')
@@ -0,0 +1,46 @@
+"""Fila de notificações (notification_outbox)
+
+Revision ID: f1b3d5e7a9c2
+Revises: e5a7c9b1d3f6
+Create Date: 2026-10-18 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f1b3d5e7a9c2'
+down_revision = 'e5a7c9b1d3f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # init_db pode já ter criado a tabela em bancos novos
+    if 'notification_outbox' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'notification_outbox',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('tenants.id'), nullable=False),
+            sa.Column('appointment_id', sa.Integer(), nullable=True),
+            sa.Column('kind', sa.String(length=30), nullable=False),
+            sa.Column('dedupe_key', sa.String(length=120), nullable=False),
+            sa.Column('recipient', sa.String(length=120), nullable=False),
+            sa.Column('subject', sa.String(length=200), nullable=False),
+            sa.Column('body', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('sent_at', sa.DateTime(), nullable=True),
+            sa.UniqueConstraint('dedupe_key', name='uq_notification_outbox_dedupe_key')
+        )
+    op.create_index(
+        'ix_notification_outbox_status_next', 'notification_outbox', ['status', 'next_attempt_at'], if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_notification_outbox_status_next', table_name='notification_outbox', if_exists=True)
+    op.drop_table('notification_outbox')
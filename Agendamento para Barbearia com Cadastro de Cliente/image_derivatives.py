@@ -0,0 +1,88 @@
+import os
+import signal
+from PIL import Image
+
+# Limite de pixels decodificados (após o modo draft); protege contra bombas de descompressão
+MAX_DECODE_PIXELS = 40 * 1000 * 1000
+
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+def init_worker():
+    """Inicializador dos processos do pool de imagens
+
+    Fica neste módulo, que só depende do PIL, para que o worker nunca precise
+    importar a aplicação. Ctrl+C é tratado pelo processo principal, que encerra o pool.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def fit_size(size, box):
+    """Tamanho que cabe na caixa mantendo a proporção, sem ampliar (como thumbnail)"""
+    width, height = size
+    box_width, box_height = box
+    scale = min(box_width / width, box_height / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def _pad(image, box):
+    """Centralizar sobre fundo branco no tamanho exato da caixa"""
+    if image.size == tuple(box):
+        return image
+    canvas = Image.new('RGB', box, (255, 255, 255))
+    canvas.paste(image, ((box[0] - image.width) // 2, (box[1] - image.height) // 2))
+    return canvas
+
+def generate_derivatives(image_path, sizes, webp=True, max_pixels=MAX_DECODE_PIXELS):
+    """Gerar as versões redimensionadas em uma única decodificação
+
+    JPEGs são decodificados em modo draft já reduzidos para o maior tamanho
+    pedido; cada nível da pirâmide é obtido do nível anterior, então só o
+    nível atual e o seguinte ficam em memória. Retorna, na ordem de `sizes`,
+    tuplas (caminho, caminho_webp ou None).
+    """
+    base_name, extension = os.path.splitext(image_path)
+    results = [None] * len(sizes)
+
+    img = Image.open(image_path)
+    try:
+        fitted = [fit_size(img.size, box) for box in sizes]
+        order = sorted(range(len(sizes)), key=lambda index: fitted[index], reverse=True)
+
+        if img.format == 'JPEG' and order:
+            img.draft('RGB', fitted[order[0]])
+
+        if img.width * img.height > max_pixels:
+            raise ValueError(f'Imagem muito grande para processar ({img.width}x{img.height})')
+
+        level = img.convert('RGB') if img.mode != 'RGB' else img
+        level.load()
+
+        for index in order:
+            width, height = sizes[index]
+            if level.size != fitted[index]:
+                level = level.resize(fitted[index], Image.Resampling.LANCZOS, reducing_gap=3.0)
+                # O raster decodificado não é mais necessário após o primeiro nível
+                img.close()
+
+            output = _pad(level, (width, height))
+            resized_path = f"{base_name}_{width}x{height}{extension}"
+            output.save(resized_path, quality=JPEG_QUALITY, optimize=True)
+
+            # Original já em WebP: o próprio redimensionado é a variante
+            webp_path = None
+            if webp and extension.lower() != '.webp':
+                webp_path = f"{base_name}_{width}x{height}.webp"
+                output.save(webp_path, 'WEBP', quality=WEBP_QUALITY, method=4)
+
+            results[index] = (resized_path, webp_path)
+    finally:
+        img.close()
+
+    return results
+
+def resize_image(image_path, sizes):
+    """Redimensionar imagem para diferentes tamanhos (caminhos no formato original)"""
+    try:
+        return [resized_path for resized_path, _ in generate_derivatives(image_path, sizes, webp=False)]
+    except Exception as e:
+        print(f"Erro ao redimensionar imagem: {e}")
+        return []
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from src.utils.image_derivatives import generate_derivatives, init_worker
+
+# Status possíveis de um job
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+# Jobs concluídos ficam consultáveis por este tempo (segundos)
+JOB_RETENTION = 60 * 60
+
+class QueueFullError(Exception):
+    """Fila de processamento de imagens cheia"""
+
+class ImageJob:
+    """Geração assíncrona das versões redimensionadas de um upload"""
+
+    def __init__(self, tenant_id, kind, image_path, sizes, size_names, url_prefix,
+                 on_complete=None, on_failed=None, media_id=None):
+        self.id = uuid.uuid4().hex
+        self.tenant_id = tenant_id
+        self.kind = kind
+        self.media_id = media_id
+        self.image_path = image_path
+        self.sizes = sizes
+        self.size_names = size_names
+        self.url_prefix = url_prefix
+        self.on_complete = on_complete
+        self.on_failed = on_failed
+        self.status = PENDING
+        self.error = None
+        self.urls = {'original': f'{url_prefix}/{os.path.basename(image_path)}'}
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'media_id': self.media_id,
+            'status': self.status,
+            'urls': self.urls,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+_executor = None
+_slots = None
+_jobs = {}
+_lock = threading.Lock()
+
+def _pool():
+    """Pool de processos e semáforo de capacidade, criados no primeiro uso"""
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            workers = current_app.config.get('IMAGE_WORKERS', 2)
+            # spawn: processos filhos não herdam a conexão do banco nem as threads do servidor
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker
+            )
+            _slots = threading.BoundedSemaphore(current_app.config.get('IMAGE_MAX_PENDING', 16))
+    return _executor, _slots
+
+def _prune():
+    limit = time.time() - JOB_RETENTION
+    for job_id in [job_id for job_id, job in _jobs.items() if job.finished_at and job.finished_at < limit]:
+        del _jobs[job_id]
+
+def reserve_slot():
+    """Reservar capacidade antes de gravar o original; QueueFullError se o pool estiver saturado"""
+    _, slots = _pool()
+    if not slots.acquire(blocking=False):
+        raise QueueFullError('Fila de processamento de imagens cheia')
+
+def release_slot():
+    # Também chamado pela thread de callbacks do pool, fora do contexto da aplicação
+    _slots.release()
+
+def _finish(app, job, future):
+    try:
+        derivatives = future.result()
+        webp_urls = {}
+        for name, (resized_path, webp_path) in zip(job.size_names, derivatives):
+            job.urls[name] = f'{job.url_prefix}/{os.path.basename(resized_path)}'
+            if webp_path:
+                webp_urls[name] = f'{job.url_prefix}/{os.path.basename(webp_path)}'
+        if webp_urls:
+            job.urls['webp'] = webp_urls
+        if job.on_complete:
+            with app.app_context():
+                job.on_complete(job)
+        job.status = DONE
+    except Exception as e:
+        job.status = FAILED
+        job.error = str(e)
+        if job.on_failed:
+            try:
+                with app.app_context():
+                    job.on_failed(job)
+            except Exception:
+                pass
+    finally:
+        job.finished_at = time.time()
+        release_slot()
+
+def submit_job(job):
+    """Enfileirar o job (chamar após reserve_slot); o callback roda no contexto da aplicação"""
+    executor, _ = _pool()
+    app = current_app._get_current_object()
+
+    with _lock:
+        _prune()
+        _jobs[job.id] = job
+
+    try:
+        future = executor.submit(generate_derivatives, job.image_path, job.sizes)
+    except Exception:
+        with _lock:
+            _jobs.pop(job.id, None)
+        release_slot()
+        raise
+    future.add_done_callback(lambda done: _finish(app, job, done))
+    return job
+
+def get_job(job_id, tenant_id):
+    """Job do tenant, ou None (status mantido em memória neste processo)"""
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None or job.tenant_id != tenant_id:
+        return None
+    return job
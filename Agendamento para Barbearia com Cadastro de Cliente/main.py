@@ -1,9 +1,11 @@
 import os
 import sys
+import time
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+import click
+from flask import Flask, abort
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
@@ -14,6 +16,9 @@ from src.config import config
 # Importar modelos e middleware
 from src.models import db, init_db
 from src.middleware import TenantMiddleware
+from src.utils.static_assets import build_asset_index, serve_path, compress_assets, is_spa_route
+from src.utils.outbox import start_outbox_worker
+from src.utils.reminders import start_reminder_scheduler
 
 # Importar blueprints
 from src.routes.user import user_bp
@@ -26,6 +31,7 @@ from src.routes.clients import clients_bp
 from src.routes.appointments import appointments_bp
 from src.routes.upload import upload_bp
 from src.routes.customization import customization_bp
+from src.routes.analytics import analytics_bp
 
 def create_app(config_name=None):
     """Factory function para criar a aplicação Flask"""
@@ -61,27 +67,51 @@ def create_app(config_name=None):
     app.register_blueprint(appointments_bp, url_prefix='/api/appointments')
     app.register_blueprint(upload_bp, url_prefix='/api/upload')
     app.register_blueprint(customization_bp, url_prefix='/api/customization')
+    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
     
     # Inicializar banco de dados
     with app.app_context():
         init_db(app)
     
+    # Envio das notificações fora do ciclo das requisições
+    start_outbox_worker(app)
+    start_reminder_scheduler(app)
+    
+    # Índice dos arquivos estáticos montado uma vez; evita os.path.exists por requisição
+    started = time.perf_counter()
+    assets = build_asset_index(app.static_folder)
+    app.logger.info(
+        'Índice de estáticos: %d arquivos em %.1f ms', len(assets), (time.perf_counter() - started) * 1000
+    )
+    
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve(path):
         """Servir arquivos estáticos e SPA"""
-        static_folder_path = app.static_folder
-        if static_folder_path is None:
+        nonlocal assets
+        if app.static_folder is None:
             return "Static folder not configured", 404
-
-        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-            return send_from_directory(static_folder_path, path)
-        else:
-            index_path = os.path.join(static_folder_path, 'index.html')
-            if os.path.exists(index_path):
-                return send_from_directory(static_folder_path, 'index.html')
-            else:
+        
+        index = assets
+        if app.debug and path not in index:
+            # Em desenvolvimento o build pode mudar com o servidor no ar; o novo
+            # índice substitui o anterior sem alterar o que outras requisições leem
+            index = assets = build_asset_index(app.static_folder)
+        
+        # Caminhos ausentes (ou apagados após a indexação) respondem 404;
+        # rotas da SPA recebem o index.html
+        response = serve_path(index, path)
+        if response is None:
+            if is_spa_route(path):
                 return "index.html not found", 404
+            abort(404)
+        return response
+    
+    @app.cli.command('compress-static')
+    def compress_static_command():
+        """Gerar variantes .gz/.br dos arquivos estáticos (executar após o build)"""
+        written = compress_assets(app.static_folder)
+        click.echo(f'{written} variantes comprimidas geradas')
     
     @app.errorhandler(404)
     def not_found(error):
@@ -97,8 +127,9 @@ def create_app(config_name=None):
     
     return app
 
-# Criar instância da aplicação
-app = create_app()
-
 if __name__ == '__main__':
+    # Criar a instância só aqui: os workers de imagem (spawn) reimportam este
+    # arquivo como __mp_main__ e não podem subir outra aplicação com banco,
+    # outbox e lembretes. Servidores WSGI usam a factory: src.main:create_app()
+    app = create_app()
     app.run(host='0.0.0.0', port=5000, debug=True)
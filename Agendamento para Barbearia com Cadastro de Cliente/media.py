@@ -0,0 +1,69 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint
+from . import db
+import json
+
+class MediaFile(db.Model):
+    """Manifesto dos arquivos enviados pelo tenant (original e versões redimensionadas)"""
+    __tablename__ = 'media_files'
+    __table_args__ = (
+        # Deduplicação: o mesmo conteúdo é armazenado uma vez por tenant e tipo
+        UniqueConstraint('tenant_id', 'kind', 'content_hash', name='uq_media_files_tenant_kind_hash'),
+        UniqueConstraint('tenant_id', 'filename', name='uq_media_files_tenant_filename'),
+        Index('ix_media_files_tenant_created', 'tenant_id', 'created_at', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey('tenants.id'), nullable=False)
+
+    kind = Column(String(20), nullable=False)  # logo, gallery
+    filename = Column(String(255), nullable=False)
+    path = Column(String(255), nullable=False)  # Relativo à pasta do tenant
+    url = Column(String(255), nullable=False)
+
+    size = Column(Integer, nullable=False)
+    mime_type = Column(String(100))
+    width = Column(Integer)
+    height = Column(Integer)
+    content_hash = Column(String(64), nullable=False)  # SHA-256 do original
+
+    # Versões geradas: {"200x200": "/static/...", "webp": {"200x200": "/static/..."}}
+    derivatives = Column(Text)
+    status = Column(String(20), nullable=False, default='processing')  # processing, ready, failed
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def derivative_urls(self):
+        if not self.derivatives:
+            return {}
+        try:
+            return json.loads(self.derivatives)
+        except json.JSONDecodeError:
+            return {}
+
+    @property
+    def urls(self):
+        """URLs do original e das versões, no formato retornado pelos uploads"""
+        return dict(self.derivative_urls, original=self.url)
+
+    def to_dict(self):
+        """Converter para dicionário"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'filename': self.filename,
+            'path': self.path,
+            'url': self.url,
+            'urls': self.urls,
+            'size': self.size,
+            'type': self.mime_type,
+            'width': self.width,
+            'height': self.height,
+            'content_hash': self.content_hash,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<MediaFile {self.filename} - {self.kind}>'
@@ -0,0 +1,58 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint
+from . import db
+
+# Status das mensagens na fila de envio
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
+class NotificationOutbox(db.Model):
+    """Mensagens a enviar, gravadas na mesma transação do agendamento"""
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        UniqueConstraint('dedupe_key', name='uq_notification_outbox_dedupe_key'),
+        # Coleta do worker: pendentes cujo próximo envio já venceu
+        Index('ix_notification_outbox_status_next', 'status', 'next_attempt_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey('tenants.id'), nullable=False)
+    # Sem chave estrangeira: a mensagem sobrevive à exclusão do agendamento
+    appointment_id = Column(Integer)
+
+    kind = Column(String(30), nullable=False)  # confirmation, cancellation, reminder
+    # Evita mensagens duplicadas para o mesmo evento (ex.: appointment:42:confirmation)
+    dedupe_key = Column(String(120), nullable=False)
+
+    recipient = Column(String(120), nullable=False)
+    subject = Column(String(200), nullable=False)
+    body = Column(Text, nullable=False)
+
+    status = Column(String(20), nullable=False, default=PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+
+    def to_dict(self):
+        """Converter para dicionário"""
+        return {
+            'id': self.id,
+            'tenant_id': self.tenant_id,
+            'appointment_id': self.appointment_id,
+            'kind': self.kind,
+            'recipient': self.recipient,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
+
+    def __repr__(self):
+        return f'<NotificationOutbox {self.kind} - {self.recipient}>'
@@ -0,0 +1,272 @@
+import os
+import random
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from src.models import db
+from src.models.notification import NotificationOutbox, PENDING, SENT, FAILED
+
+# Espera entre tentativas: RETRY_BASE * 2^(tentativas - 1), limitada a RETRY_MAX (segundos)
+RETRY_BASE = 30
+RETRY_MAX = 6 * 60 * 60
+
+_wakeup = threading.Event()
+_worker = None
+
+def _insert_for_dialect():
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def enqueue_notification(tenant_id, kind, recipient, subject, body, dedupe_key, appointment_id=None, send_at=None):
+    """Adicionar mensagem à fila na transação atual (ignorada se a chave já existe)
+
+    O commit fica com quem chama, junto com a escrita que originou a mensagem.
+    """
+    row = {
+        'tenant_id': tenant_id,
+        'appointment_id': appointment_id,
+        'kind': kind,
+        'dedupe_key': dedupe_key,
+        'recipient': recipient,
+        'subject': subject,
+        'body': body,
+        'status': PENDING,
+        'attempts': 0,
+        'next_attempt_at': send_at or datetime.utcnow(),
+        'created_at': datetime.utcnow()
+    }
+
+    insert = _insert_for_dialect()
+    if insert is None:
+        if not NotificationOutbox.query.filter_by(dedupe_key=dedupe_key).first():
+            db.session.add(NotificationOutbox(**row))
+        return
+    db.session.execute(insert(NotificationOutbox).values(**row).on_conflict_do_nothing(index_elements=['dedupe_key']))
+
+def _format_when(value):
+    return value.strftime('%d/%m/%Y às %H:%M')
+
+def enqueue_confirmation(appointments):
+    """Confirmação de um agendamento ou de uma série (chamar após o flush, antes do commit)"""
+    first = appointments[0]
+    client = first.client
+    if not client or not client.email:
+        return
+
+    shop = first.tenant.name
+    lines = [f'- {_format_when(appointment.appointment_date)}' for appointment in appointments]
+    body = '\n'.join([
+        f'Olá {client.name},',
+        '',
+        'Seu agendamento foi confirmado com sucesso!' if len(appointments) == 1 else
+        f'Seus {len(appointments)} agendamentos foram confirmados com sucesso!',
+        '',
+        f'Serviço: {first.service.name}',
+        f'Profissional: {first.staff_member.name}',
+        *lines,
+        '',
+        f'Aguardamos você na {shop}!'
+    ])
+    enqueue_notification(
+        first.tenant_id, 'confirmation', client.email, f'Agendamento confirmado - {shop}', body,
+        dedupe_key=f'appointment:{first.id}:confirmation', appointment_id=first.id
+    )
+
+def enqueue_cancellation(appointment):
+    """Aviso de cancelamento do agendamento (uma vez por data marcada; chamar antes do commit)"""
+    client = appointment.client
+    if not client or not client.email:
+        return
+
+    shop = appointment.tenant.name
+    body = '\n'.join([
+        f'Olá {client.name},',
+        '',
+        f'Seu agendamento de {_format_when(appointment.appointment_date)} foi cancelado.',
+        '',
+        f'Para remarcar, entre em contato com a {shop}.'
+    ])
+    enqueue_notification(
+        appointment.tenant_id, 'cancellation', client.email, f'Agendamento cancelado - {shop}', body,
+        dedupe_key=f'appointment:{appointment.id}:cancellation:{appointment.appointment_date.isoformat()}',
+        appointment_id=appointment.id
+    )
+
+def enqueue_reminder(appointment):
+    """Lembrete do horário próximo (uma vez por data marcada, mesmo após reinícios)"""
+    client = appointment.client
+    if not client or not client.email:
+        return
+
+    shop = appointment.tenant.name
+    body = '\n'.join([
+        f'Olá {client.name},',
+        '',
+        f'Lembrete: seu horário na {shop} está marcado para {_format_when(appointment.appointment_date)}.',
+        f'Serviço: {appointment.service.name}',
+        f'Profissional: {appointment.staff_member.name}',
+        '',
+        'Se não puder comparecer, avise-nos com antecedência.'
+    ])
+    enqueue_notification(
+        appointment.tenant_id, 'reminder', client.email, f'Lembrete de agendamento - {shop}', body,
+        dedupe_key=f'appointment:{appointment.id}:reminder:{appointment.appointment_date.isoformat()}',
+        appointment_id=appointment.id
+    )
+
+def notify_outbox():
+    """Acordar o worker após o commit de novas mensagens"""
+    _wakeup.set()
+
+def retry_delay(attempts):
+    """Espera até a próxima tentativa, com variação para não sincronizar reenvios"""
+    delay = min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+def _connect(config):
+    if config.get('MAIL_USE_SSL'):
+        connection = smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=config['MAIL_TIMEOUT'])
+    else:
+        connection = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=config['MAIL_TIMEOUT'])
+        if config.get('MAIL_USE_TLS'):
+            connection.starttls()
+    if config.get('MAIL_USERNAME'):
+        connection.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+    return connection
+
+def _build_email(message, sender):
+    email = EmailMessage()
+    email['From'] = sender
+    email['To'] = message.recipient
+    email['Subject'] = message.subject
+    email.set_content(message.body)
+    return email
+
+def _is_permanent(error):
+    # Respostas 5xx e destinatários recusados não melhoram com novas tentativas
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+def deliver_batch(messages, config):
+    """Enviar as mensagens por uma única conexão SMTP
+
+    Retorna {id: (erro, permanente)} das mensagens que falharam.
+    """
+    try:
+        connection = _connect(config)
+    except (smtplib.SMTPException, OSError) as e:
+        return {message.id: (f'Falha na conexão SMTP: {e}', False) for message in messages}
+
+    sender = config.get('MAIL_DEFAULT_SENDER') or config.get('MAIL_USERNAME')
+    errors = {}
+    try:
+        for index, message in enumerate(messages):
+            try:
+                connection.send_message(_build_email(message, sender))
+            except smtplib.SMTPServerDisconnected as e:
+                # Conexão perdida: o restante do lote volta para a fila
+                for pending in messages[index:]:
+                    errors[pending.id] = (f'Conexão SMTP encerrada: {e}', False)
+                break
+            except (smtplib.SMTPException, OSError) as e:
+                errors[message.id] = (str(e), _is_permanent(e))
+    finally:
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+    return errors
+
+def drain_outbox(config, batch_size):
+    """Enviar um lote de mensagens vencidas; retorna quantas foram processadas
+
+    No PostgreSQL as linhas são travadas com SKIP LOCKED, então vários
+    processos podem drenar a fila sem enviar a mesma mensagem duas vezes.
+    """
+    now = datetime.utcnow()
+    query = NotificationOutbox.query.filter(
+        NotificationOutbox.status == PENDING,
+        NotificationOutbox.next_attempt_at <= now
+    ).order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id).limit(batch_size)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        query = query.with_for_update(skip_locked=True)
+
+    messages = query.all()
+    if not messages:
+        db.session.commit()
+        return 0
+
+    errors = deliver_batch(messages, config)
+    for message in messages:
+        message.attempts += 1
+        if message.id not in errors:
+            message.status = SENT
+            message.sent_at = datetime.utcnow()
+            message.last_error = None
+            continue
+
+        error, permanent = errors[message.id]
+        message.last_error = error
+        if permanent or message.attempts >= config['NOTIFICATION_MAX_ATTEMPTS']:
+            message.status = FAILED
+        else:
+            message.next_attempt_at = datetime.utcnow() + retry_delay(message.attempts)
+
+    db.session.commit()
+    return len(messages)
+
+class OutboxWorker(threading.Thread):
+    """Thread que drena a fila em lotes, aguardando o intervalo ou um notify_outbox()"""
+
+    def __init__(self, app):
+        super().__init__(name='notification-outbox', daemon=True)
+        self.app = app
+        self.stopping = threading.Event()
+
+    def run(self):
+        config = self.app.config
+        while not self.stopping.is_set():
+            processed = 0
+            with self.app.app_context():
+                try:
+                    processed = drain_outbox(config, config['NOTIFICATION_BATCH_SIZE'])
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('Erro ao processar a fila de notificações')
+                finally:
+                    db.session.remove()
+
+            # Lote cheio: pode haver mais mensagens vencidas
+            if processed < config['NOTIFICATION_BATCH_SIZE']:
+                _wakeup.wait(config['NOTIFICATION_POLL_INTERVAL'])
+                _wakeup.clear()
+
+    def stop(self):
+        self.stopping.set()
+        _wakeup.set()
+
+def start_outbox_worker(app):
+    """Iniciar o worker da fila de notificações (um por processo)"""
+    global _worker
+    if _worker is not None or not app.config.get('NOTIFICATION_WORKER_ENABLED'):
+        return _worker
+
+    # Com o reloader do modo debug, só o processo filho atende requisições
+    if app.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return None
+
+    if not app.config.get('MAIL_SERVER'):
+        app.logger.warning('MAIL_SERVER não configurado; notificações permanecem na fila')
+        return None
+
+    _worker = OutboxWorker(app)
+    _worker.start()
+    return _worker
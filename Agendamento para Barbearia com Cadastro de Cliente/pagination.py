@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_, DateTime
+
+def encode_cursor(values):
+    """Gerar token opaco a partir dos valores da chave de ordenação"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token, columns):
+    """Recuperar os valores da chave a partir do token, convertendo pelo tipo da coluna"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido')
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Cursor inválido')
+
+    return [
+        datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+        for column, value in zip(columns, values)
+    ]
+
+def _after(columns, values, descending):
+    """Condição 'depois da chave' expandida em OR/AND para aproveitar índices compostos"""
+    conditions = []
+    for position, (column, value) in enumerate(zip(columns, values)):
+        equal_prefix = [columns[i] == values[i] for i in range(position)]
+        step = column < value if descending else column > value
+        conditions.append(and_(*equal_prefix, step))
+    return or_(*conditions)
+
+def paginate_keyset(query, columns, cursor=None, per_page=20, descending=False, include_total=True):
+    """Paginar por chave (keyset) em vez de OFFSET
+
+    `columns` é a chave de ordenação, que deve terminar em uma coluna única
+    (ex.: id). Retorna (itens, próximo cursor ou None, total ou None).
+    """
+    total = query.order_by(None).count() if include_total else None
+
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, columns), descending))
+
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    items = query.order_by(*ordering).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+
+    return items, next_cursor, total
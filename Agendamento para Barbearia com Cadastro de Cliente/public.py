@@ -1,7 +1,14 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy import or_
+from flask import Blueprint, request, jsonify, make_response
 
-from src.models import db, Tenant, TenantConfig
+from src.models import Tenant, Service, Staff
+from src.middleware.tenant_cache import resolve_active_tenant
+from src.utils.directory_cache import get_directory
+from src.utils.site_bundle import bundle_response
+from src.models.slot_bitmap import BLOCK_MINUTES, BLOCKS_PER_DAY
+from src.utils.availability import DEFAULT_SLOT_MINUTES, minutes_to_time, fit_mask, grid_mask
+from src.utils.slot_index import load_day_masks
+from src.utils.schedule import staff_schedule
+from datetime import datetime
 
 public_bp = Blueprint('public', __name__)
 
@@ -15,78 +22,35 @@ def list_barbershops():
         page = int(request.args.get('page', 1))
         per_page = min(int(request.args.get('per_page', 10)), 50)  # Máximo 50 por página
         
-        # Query base - apenas tenants ativos
-        query = db.session.query(Tenant, TenantConfig).join(
-            TenantConfig, Tenant.id == TenantConfig.tenant_id, isouter=True
-        ).filter(Tenant.status == 'active')
-        
-        # Filtrar por cidade
-        if city:
-            query = query.filter(
-                or_(
-                    TenantConfig.city.ilike(f'%{city}%'),
-                    TenantConfig.city.is_(None)  # Incluir sem cidade definida
-                )
-            )
-        
-        # Filtrar por busca (nome da barbearia ou descrição)
-        if search:
-            query = query.filter(
-                or_(
-                    Tenant.name.ilike(f'%{search}%'),
-                    TenantConfig.business_name.ilike(f'%{search}%'),
-                    TenantConfig.description.ilike(f'%{search}%')
-                )
-            )
-        
-        # Ordenar por nome
-        query = query.order_by(Tenant.name)
-        
-        # Paginação
-        total = query.count()
-        results = query.offset((page - 1) * per_page).limit(per_page).all()
-        
-        # Formatar resultados
-        barbershops = []
-        for tenant, config in results:
-            barbershop_data = {
-                'id': tenant.id,
-                'name': tenant.name,
-                'slug': tenant.slug,
-                'business_name': config.business_name if config else tenant.name,
-                'description': config.description if config else None,
-                'address': config.address if config else None,
-                'city': config.city if config else 'Brejo',
-                'state': config.state if config else 'MA',
-                'phone': config.phone if config else None,
-                'email': config.email if config else None,
-                'website': config.website if config else None,
-                'instagram': config.instagram if config else None,
-                'facebook': config.facebook if config else None,
-                'whatsapp': config.whatsapp if config else None,
-                'logo_url': config.logo_url if config else None,
-                'primary_color': config.primary_color if config else '#1A1A1A',
-                'secondary_color': config.secondary_color if config else '#B8860B',
-                'opening_hours': config.opening_hours if config else None,
-                'status': 'open',  # Implementar lógica de horário de funcionamento
-                'rating': 4.5,  # Implementar sistema de avaliações
-                'total_reviews': 0  # Implementar sistema de avaliações
-            }
-            barbershops.append(barbershop_data)
+        # Snapshot materializado da cidade (sem consulta ao banco no caminho quente)
+        directory = get_directory(city)
+        # O ETag cobre exatamente os valores ecoados no corpo
+        etag = directory.etag(search, city, page, per_page)
         
-        return jsonify({
-            'barbershops': barbershops,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'pages': (total + per_page - 1) // per_page
-            },
-            'filters': {
-                'search': search,
-                'city': city
-            }
-        }), 200
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            matches = directory.search(search)
+            total = len(matches)
+            barbershops = matches[(page - 1) * per_page:page * per_page]
+            
+            response = make_response(jsonify({
+                'barbershops': barbershops,
+                'pagination': {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': total,
+                    'pages': (total + per_page - 1) // per_page
+                },
+                'filters': {
+                    'search': search,
+                    'city': city
+                }
+            }), 200)
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=0, stale-while-revalidate=60'
+        return response
         
     except Exception as e:
         return jsonify({'error': 'Erro interno do servidor'}), 500
@@ -95,55 +59,14 @@ def list_barbershops():
 def get_barbershop_details(slug):
     """Obter detalhes de uma barbearia específica"""
     try:
-        # Buscar tenant pelo slug
-        tenant = Tenant.query.filter_by(slug=slug, status='active').first()
+        # Buscar tenant pelo slug (cache de resolução)
+        tenant = resolve_active_tenant(slug)
         
         if not tenant:
             return jsonify({'error': 'Barbearia não encontrada'}), 404
         
-        # Obter configuração
-        config = tenant.config
-        
-        # Dados da barbearia
-        barbershop_data = {
-            'id': tenant.id,
-            'name': tenant.name,
-            'slug': tenant.slug,
-            'business_name': config.business_name if config else tenant.name,
-            'description': config.description if config else None,
-            'address': config.address if config else None,
-            'city': config.city if config else 'Brejo',
-            'state': config.state if config else 'MA',
-            'zip_code': config.zip_code if config else None,
-            'phone': config.phone if config else None,
-            'email': config.email if config else None,
-            'website': config.website if config else None,
-            'instagram': config.instagram if config else None,
-            'facebook': config.facebook if config else None,
-            'whatsapp': config.whatsapp if config else None,
-            'logo_url': config.logo_url if config else None,
-            'primary_color': config.primary_color if config else '#1A1A1A',
-            'secondary_color': config.secondary_color if config else '#B8860B',
-            'accent_color': config.accent_color if config else '#8B0000',
-            'opening_hours': config.opening_hours if config else {
-                'monday': {'open': '08:00', 'close': '18:00'},
-                'tuesday': {'open': '08:00', 'close': '18:00'},
-                'wednesday': {'open': '08:00', 'close': '18:00'},
-                'thursday': {'open': '08:00', 'close': '18:00'},
-                'friday': {'open': '08:00', 'close': '18:00'},
-                'saturday': {'open': '08:00', 'close': '17:00'},
-                'sunday': {'closed': True}
-            },
-            'policies': config.policies if config else None,
-            'status': 'open',  # Implementar lógica de horário de funcionamento
-            'rating': 4.5,  # Implementar sistema de avaliações
-            'total_reviews': 0,  # Implementar sistema de avaliações
-            'services': [],  # Implementar quando tiver modelo de serviços
-            'staff': [],  # Implementar quando tiver modelo de funcionários
-            'gallery': []  # Implementar galeria de fotos
-        }
-        
-        return jsonify({'barbershop': barbershop_data}), 200
+        # Bundle pré-montado do site (tema, contato, horários, políticas, serviços e equipe)
+        return bundle_response(tenant, 'details', public=True)
         
     except Exception as e:
         return jsonify({'error': 'Erro interno do servidor'}), 500
@@ -152,7 +75,7 @@ def get_barbershop_details(slug):
 def get_barbershop_services(slug):
     """Obter serviços de uma barbearia"""
     try:
-        tenant = Tenant.query.filter_by(slug=slug, status='active').first()
+        tenant = resolve_active_tenant(slug)
         
         if not tenant:
             return jsonify({'error': 'Barbearia não encontrada'}), 404
@@ -194,7 +117,7 @@ def get_barbershop_services(slug):
 def get_barbershop_staff(slug):
     """Obter funcionários de uma barbearia"""
     try:
-        tenant = Tenant.query.filter_by(slug=slug, status='active').first()
+        tenant = resolve_active_tenant(slug)
         
         if not tenant:
             return jsonify({'error': 'Barbearia não encontrada'}), 404
@@ -230,7 +153,7 @@ def get_barbershop_staff(slug):
 def get_available_slots(slug):
     """Obter horários disponíveis para agendamento"""
     try:
-        tenant = Tenant.query.filter_by(slug=slug, status='active').first()
+        tenant = resolve_active_tenant(slug)
         
         if not tenant:
             return jsonify({'error': 'Barbearia não encontrada'}), 404
@@ -242,26 +165,67 @@ def get_available_slots(slug):
         if not date:
             return jsonify({'error': 'Data é obrigatória'}), 400
         
-        # Implementar lógica de horários disponíveis
-        # Por enquanto, retornar horários fixos
-        available_slots = [
-            {'time': '08:00', 'available': True},
-            {'time': '08:30', 'available': True},
-            {'time': '09:00', 'available': False},
-            {'time': '09:30', 'available': True},
-            {'time': '10:00', 'available': True},
-            {'time': '10:30', 'available': True},
-            {'time': '11:00', 'available': True},
-            {'time': '11:30', 'available': False},
-            {'time': '14:00', 'available': True},
-            {'time': '14:30', 'available': True},
-            {'time': '15:00', 'available': True},
-            {'time': '15:30', 'available': True},
-            {'time': '16:00', 'available': True},
-            {'time': '16:30', 'available': True},
-            {'time': '17:00', 'available': True},
-            {'time': '17:30', 'available': True}
-        ]
+        try:
+            target_date = datetime.strptime(date, '%Y-%m-%d').date()
+            slot_minutes = int(request.args.get('slot_minutes', DEFAULT_SLOT_MINUTES))
+        except ValueError:
+            return jsonify({'error': 'Parâmetros inválidos'}), 400
+        
+        if slot_minutes <= 0 or slot_minutes % BLOCK_MINUTES:
+            return jsonify({'error': f'slot_minutes deve ser múltiplo de {BLOCK_MINUTES}'}), 400
+        
+        # Duração do serviço escolhido (padrão: um slot)
+        duration = slot_minutes
+        if service_id:
+            service = Service.query.filter_by(id=int(service_id), tenant_id=tenant.id, is_active=True).first()
+            if not service:
+                return jsonify({'error': 'Serviço não encontrado'}), 404
+            duration = service.duration_minutes
+        
+        # Funcionários considerados
+        staff_query = Staff.query.filter_by(tenant_id=tenant.id, is_active=True)
+        if staff_id:
+            staff_query = staff_query.filter_by(id=int(staff_id))
+        staff_members = staff_query.all()
+        
+        # Expediente de cada funcionário no dia (horário compilado, já sem as pausas)
+        # e a grade de horários a partir do início do expediente, como em check_availability
+        work_masks = {}
+        grid_masks = {}
+        for staff in staff_members:
+            work_day = staff_schedule(staff).day(target_date)
+            if work_day:
+                work_masks[staff.id] = work_day.mask(BLOCK_MINUTES)
+                grid_masks[staff.id] = grid_mask(work_day.start, slot_minutes, BLOCK_MINUTES)
+        
+        if not work_masks:
+            return jsonify({'date': date, 'slots': []}), 200
+        
+        # Disponibilidade = expediente AND NOT ocupado, por funcionário
+        busy_masks = load_day_masks(tenant.id, target_date, list(work_masks))
+        fit_by_staff = {
+            staff_id: fit_mask(mask & ~busy_masks.get(staff_id, 0), duration, BLOCK_MINUTES) & grid_masks[staff_id]
+            for staff_id, mask in work_masks.items()
+        }
+        
+        offered = 0
+        for staff_id, mask in work_masks.items():
+            offered |= mask & grid_masks[staff_id]
+        
+        # Listar os horários da grade de algum funcionário dentro do seu expediente
+        available_slots = []
+        for block in range(BLOCKS_PER_DAY):
+            if not (offered >> block) & 1:
+                continue
+            staff_ids = [
+                staff_id for staff_id, fit in fit_by_staff.items()
+                if (fit >> block) & 1
+            ]
+            available_slots.append({
+                'time': minutes_to_time(block * BLOCK_MINUTES),
+                'available': bool(staff_ids),
+                'staff_ids': staff_ids
+            })
         
         return jsonify({
             'date': date,
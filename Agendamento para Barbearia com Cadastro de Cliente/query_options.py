@@ -0,0 +1,55 @@
+from sqlalchemy.orm import joinedload, selectinload
+from src.models import Appointment, Client, Service, Staff
+
+# Modos de serialização aceitos no parâmetro ?view=
+VIEW_SHALLOW = 'shallow'
+VIEW_EXPANDED = 'expanded'
+
+def _expanded_list():
+    # Listas paginadas: uma consulta IN por relacionamento, sem multiplicar linhas
+    return (
+        selectinload(Appointment.client),
+        selectinload(Appointment.service),
+        selectinload(Appointment.staff_member)
+    )
+
+def _expanded_detail():
+    # Um único registro: tudo na mesma consulta
+    return (
+        joinedload(Appointment.client),
+        joinedload(Appointment.service),
+        joinedload(Appointment.staff_member)
+    )
+
+def _names_only():
+    # Calendário e históricos só precisam dos nomes relacionados
+    return (
+        joinedload(Appointment.client).load_only(Client.name),
+        joinedload(Appointment.service).load_only(Service.name),
+        joinedload(Appointment.staff_member).load_only(Staff.name)
+    )
+
+# Perfis de carregamento por endpoint
+APPOINTMENT_LOAD_PROFILES = {
+    'list': _expanded_list,
+    'detail': _expanded_detail,
+    'calendar': _names_only,
+    'history': _names_only
+}
+
+def get_view(args):
+    """Obter o modo de serialização a partir dos parâmetros da requisição"""
+    view = args.get('view', VIEW_EXPANDED).lower()
+    if view not in (VIEW_SHALLOW, VIEW_EXPANDED):
+        raise ValueError(f'view deve ser {VIEW_SHALLOW} ou {VIEW_EXPANDED}')
+    return view
+
+def appointment_options(profile, view=VIEW_EXPANDED):
+    """Opções de carregamento para consultas de agendamentos
+
+    No modo shallow os relacionamentos não são serializados e nada é
+    carregado; perfis de nomes ('calendar', 'history') sempre carregam.
+    """
+    if view == VIEW_SHALLOW and profile in ('list', 'detail'):
+        return ()
+    return APPOINTMENT_LOAD_PROFILES[profile]()
@@ -0,0 +1,56 @@
+import calendar
+from datetime import timedelta
+
+# Frequências aceitas e o passo em dias (mensal é tratado à parte)
+FREQUENCIES = {
+    'weekly': 7,
+    'biweekly': 14,
+    'monthly': None
+}
+
+MAX_OCCURRENCES = 104
+
+def _add_months(value, months):
+    """Somar meses mantendo o dia; retorna None se o dia não existe no mês (ex.: 31/04)"""
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    if value.day > calendar.monthrange(year, month)[1]:
+        return None
+    return value.replace(year=year, month=month)
+
+def expand_occurrences(start, frequency, interval=1, count=None, until=None):
+    """Expandir uma regra de recorrência (estilo RRULE) em datas/horas de início
+
+    Exige `count` ou `until` (data limite, inclusiva). Meses sem o dia de
+    início são pulados, como BYMONTHDAY no RFC 5545.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f'Frequência inválida: {frequency}')
+    if interval < 1:
+        raise ValueError('interval deve ser maior que zero')
+    if count is None and until is None:
+        raise ValueError('Informe count ou until')
+    if count is not None and not 1 <= count <= MAX_OCCURRENCES:
+        raise ValueError(f'count deve estar entre 1 e {MAX_OCCURRENCES}')
+
+    occurrences = []
+    step = 0
+    while True:
+        if FREQUENCIES[frequency]:
+            current = start + timedelta(days=FREQUENCIES[frequency] * interval * step)
+        else:
+            current = _add_months(start, interval * step)
+        step += 1
+
+        if current is not None:
+            if until is not None and current.date() > until:
+                break
+            occurrences.append(current)
+            if count is not None and len(occurrences) >= count:
+                break
+
+        if len(occurrences) > MAX_OCCURRENCES or step > MAX_OCCURRENCES * 2:
+            raise ValueError(f'Recorrência excede {MAX_OCCURRENCES} ocorrências')
+
+    return occurrences
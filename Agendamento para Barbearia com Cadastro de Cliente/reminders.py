@@ -0,0 +1,207 @@
+import heapq
+import os
+import threading
+from datetime import datetime, timedelta
+from src.models import db, Appointment
+from src.models.appointment import AppointmentStatus
+from src.utils.outbox import enqueue_reminder, notify_outbox
+
+# Status que ainda recebem lembrete
+REMINDER_STATUSES = (AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED)
+
+# Nova tentativa de um disparo que falhou (segundos)
+FIRE_RETRY_SECONDS = 60
+
+# Espera máxima do loop, para tolerar ajustes no relógio do sistema (segundos)
+MAX_IDLE_SECONDS = 60
+
+_scheduler = None
+
+class ReminderScheduler:
+    """Heap dos lembretes que disparam dentro da janela de antecedência
+
+    Só ficam em memória os agendamentos cujo lembrete dispara até o
+    horizonte (agora + janela); os demais entram na próxima recarga.
+    Remarcações e cancelamentos invalidam a entrada antiga de forma
+    preguiçosa: o heap guarda a versão e o dicionário a versão atual.
+    """
+
+    def __init__(self, lead, window):
+        self.lead = lead
+        self.window = window
+        self.horizon = datetime.min
+        self._heap = []  # (dispara_em, versão, appointment_id)
+        self._entries = {}  # appointment_id -> versão atual
+        self._version = 0
+        self._lock = threading.Lock()
+        self.wakeup = threading.Event()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def schedule(self, appointment_id, appointment_date, now=None):
+        """Agendar (ou reagendar) o lembrete; ignorado se estiver além do horizonte ou no passado"""
+        now = now or datetime.utcnow()
+        fire_at = appointment_date - self.lead
+
+        with self._lock:
+            if appointment_date <= now or fire_at > self.horizon:
+                self._entries.pop(appointment_id, None)
+                return False
+
+            self._version += 1
+            self._entries[appointment_id] = self._version
+            heapq.heappush(self._heap, (fire_at, self._version, appointment_id))
+            self._compact()
+            earliest = self._heap[0][2] == appointment_id and self._heap[0][1] == self._version
+
+        if earliest:
+            self.wakeup.set()
+        return True
+
+    def retry(self, appointment_ids, fire_at):
+        """Recolocar no heap lembretes cujo disparo falhou"""
+        with self._lock:
+            for appointment_id in appointment_ids:
+                self._version += 1
+                self._entries[appointment_id] = self._version
+                heapq.heappush(self._heap, (fire_at, self._version, appointment_id))
+
+    def cancel(self, appointment_id):
+        with self._lock:
+            self._entries.pop(appointment_id, None)
+
+    def _compact(self):
+        # Entradas obsoletas acumuladas por remarcações: reconstruir o heap
+        if len(self._heap) > 2 * len(self._entries) + 1024:
+            self._heap = [entry for entry in self._heap if self._entries.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def pop_due(self, now):
+        """Remover e retornar os ids cujo lembrete já venceu"""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, version, appointment_id = heapq.heappop(self._heap)
+                if self._entries.get(appointment_id) == version:
+                    del self._entries[appointment_id]
+                    due.append(appointment_id)
+        return due
+
+    def next_fire_at(self):
+        with self._lock:
+            while self._heap and self._entries.get(self._heap[0][2]) != self._heap[0][1]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def refill(self, now):
+        """Avançar o horizonte e carregar os lembretes da nova janela com uma consulta"""
+        horizon = now + self.window
+        rows = db.session.query(Appointment.id, Appointment.appointment_date).filter(
+            Appointment.status.in_(REMINDER_STATUSES),
+            Appointment.appointment_date > now,
+            Appointment.appointment_date <= horizon + self.lead
+        ).all()
+
+        with self._lock:
+            self.horizon = horizon
+        for appointment_id, appointment_date in rows:
+            with self._lock:
+                known = appointment_id in self._entries
+            if not known:
+                self.schedule(appointment_id, appointment_date, now)
+        return len(rows)
+
+    def fire(self, appointment_ids, now):
+        """Gravar na fila os lembretes vencidos que ainda valem"""
+        appointments = Appointment.query.filter(
+            Appointment.id.in_(appointment_ids),
+            Appointment.status.in_(REMINDER_STATUSES)
+        ).all()
+
+        queued = 0
+        for appointment in appointments:
+            # Remarcado para mais tarde desde que entrou no heap
+            if appointment.appointment_date - self.lead > now:
+                self.schedule(appointment.id, appointment.appointment_date, now)
+                continue
+            if appointment.appointment_date > now:
+                enqueue_reminder(appointment)
+                queued += 1
+
+        db.session.commit()
+        if queued:
+            notify_outbox()
+        return queued
+
+class ReminderWorker(threading.Thread):
+    """Thread que dorme até o próximo lembrete ou a próxima recarga da janela"""
+
+    def __init__(self, app, scheduler, refill_interval):
+        super().__init__(name='appointment-reminders', daemon=True)
+        self.app = app
+        self.scheduler = scheduler
+        self.refill_interval = refill_interval
+        self.next_refill = datetime.min
+        self.stopping = threading.Event()
+
+    def run(self):
+        scheduler = self.scheduler
+        while not self.stopping.is_set():
+            now = datetime.utcnow()
+            with self.app.app_context():
+                try:
+                    if now >= self.next_refill:
+                        scheduler.refill(now)
+                        self.next_refill = now + self.refill_interval
+
+                    due = scheduler.pop_due(now)
+                    if due:
+                        try:
+                            scheduler.fire(due, now)
+                        except Exception:
+                            db.session.rollback()
+                            scheduler.retry(due, now + timedelta(seconds=FIRE_RETRY_SECONDS))
+                            raise
+                except Exception:
+                    self.app.logger.exception('Erro ao processar lembretes de agendamento')
+                finally:
+                    db.session.remove()
+
+            wake_at = min(filter(None, (scheduler.next_fire_at(), self.next_refill)))
+            timeout = min(max((wake_at - datetime.utcnow()).total_seconds(), 0), MAX_IDLE_SECONDS)
+            scheduler.wakeup.wait(timeout)
+            scheduler.wakeup.clear()
+
+    def stop(self):
+        self.stopping.set()
+        self.scheduler.wakeup.set()
+
+def reminder_saved(appointment):
+    """Atualizar o lembrete após o commit de uma criação ou alteração"""
+    if _scheduler is None:
+        return
+    if appointment.status in REMINDER_STATUSES:
+        _scheduler.schedule(appointment.id, appointment.appointment_date)
+    else:
+        _scheduler.cancel(appointment.id)
+
+def reminder_removed(appointment_id):
+    """Descartar o lembrete de um agendamento excluído"""
+    if _scheduler is not None:
+        _scheduler.cancel(appointment_id)
+
+def start_reminder_scheduler(app):
+    """Iniciar o agendador de lembretes (um por processo)"""
+    global _scheduler
+    if _scheduler is not None or not app.config.get('REMINDER_ENABLED'):
+        return _scheduler
+
+    # Com o reloader do modo debug, só o processo filho atende requisições
+    if app.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return None
+
+    window = timedelta(hours=app.config['REMINDER_WINDOW_HOURS'])
+    _scheduler = ReminderScheduler(timedelta(minutes=app.config['REMINDER_LEAD_MINUTES']), window)
+    ReminderWorker(app, _scheduler, refill_interval=window / 2).start()
+    return _scheduler
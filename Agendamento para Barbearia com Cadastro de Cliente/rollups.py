@@ -0,0 +1,208 @@
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, update
+from src.models import db, Appointment
+from src.models.appointment import AppointmentStatus
+from src.models.daily_stats import DailyTenantStats, DailyStaffStats, COUNTER_COLUMNS
+from src.utils.client_stats import UNCOUNTED_STATUSES
+
+# Contribuição de um agendamento para os agregados diários
+RollupState = namedtuple('RollupState', ['tenant_id', 'staff_id', 'date', 'status', 'final_price'])
+
+# Intervalos aceitos pelo dashboard (dias, incluindo hoje)
+PERIOD_DAYS = {
+    'week': 7,
+    'month': 30,
+    'year': 365
+}
+
+def rollup_state(appointment):
+    """Capturar a contribuição atual do agendamento (None se não existe)"""
+    if appointment is None:
+        return None
+    return RollupState(
+        appointment.tenant_id,
+        appointment.staff_id,
+        appointment.appointment_date.date(),
+        appointment.status,
+        appointment.final_price or 0.0
+    )
+
+def _counters(state, sign):
+    """Contadores de um estado, com sinal (+1 para entrada, -1 para saída)"""
+    counted = state.status not in UNCOUNTED_STATUSES
+    completed = state.status == AppointmentStatus.COMPLETED
+    return {
+        'appointments_count': sign if counted else 0,
+        'completed_count': sign if completed else 0,
+        'cancelled_count': 0 if counted else sign,
+        'revenue': sign * state.final_price if counted else 0.0,
+        'completed_revenue': sign * state.final_price if completed else 0.0
+    }
+
+def _accumulate(deltas, key, counters):
+    current = deltas.setdefault(key, dict.fromkeys(COUNTER_COLUMNS, 0))
+    for name, value in counters.items():
+        current[name] += value
+
+def _collect(changes):
+    """Somar as diferenças por (tenant, dia) e (funcionário, dia)"""
+    tenant_deltas = {}
+    staff_deltas = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            counters = _counters(state, sign)
+            _accumulate(tenant_deltas, (state.tenant_id, state.date), counters)
+            _accumulate(staff_deltas, (state.tenant_id, state.staff_id, state.date), counters)
+    return tenant_deltas, staff_deltas
+
+def _insert_for_dialect():
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def _upsert(model, conflict_columns, rows):
+    """Somar deltas com um único INSERT ... ON CONFLICT DO UPDATE por tabela"""
+    rows = [row for row in rows if any(row[name] for name in COUNTER_COLUMNS)]
+    if not rows:
+        return
+
+    insert = _insert_for_dialect()
+    if insert is None:
+        # Outros bancos: UPDATE incremental e INSERT quando a linha não existe
+        for row in rows:
+            keys = {name: row[name] for name in conflict_columns}
+            result = db.session.execute(
+                update(model).filter_by(**keys).values(**{
+                    name: getattr(model, name) + row[name] for name in COUNTER_COLUMNS
+                }).execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                db.session.add(model(**row))
+        return
+
+    now = datetime.utcnow()
+    statement = insert(model).values([dict(row, updated_at=now) for row in rows])
+    statement = statement.on_conflict_do_update(
+        index_elements=list(conflict_columns),
+        set_=dict(
+            {name: getattr(model, name) + getattr(statement.excluded, name) for name in COUNTER_COLUMNS},
+            updated_at=statement.excluded.updated_at
+        )
+    )
+    db.session.execute(statement)
+
+def apply_rollup_changes(changes):
+    """Aplicar uma lista de transições (before, after) aos agregados diários"""
+    tenant_deltas, staff_deltas = _collect(changes)
+
+    _upsert(DailyTenantStats, ('tenant_id', 'date'), [
+        dict(counters, tenant_id=tenant_id, date=day)
+        for (tenant_id, day), counters in tenant_deltas.items()
+    ])
+    _upsert(DailyStaffStats, ('staff_id', 'date'), [
+        dict(counters, tenant_id=tenant_id, staff_id=staff_id, date=day)
+        for (tenant_id, staff_id, day), counters in staff_deltas.items()
+    ])
+
+def apply_rollup_transition(before, after):
+    """Aplicar a diferença entre dois estados (create: before=None, delete: after=None)"""
+    apply_rollup_changes([(before, after)])
+
+def _as_date(value):
+    # func.date() devolve texto no SQLite
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+def backfill_daily_stats(tenant_id):
+    """Reconstruir os agregados do tenant a partir de uma consulta agrupada"""
+    day = func.date(Appointment.appointment_date)
+    rows = db.session.query(
+        day,
+        Appointment.staff_id,
+        Appointment.status,
+        func.count(Appointment.id),
+        func.coalesce(func.sum(Appointment.final_price), 0.0)
+    ).filter(
+        Appointment.tenant_id == tenant_id
+    ).group_by(day, Appointment.staff_id, Appointment.status).all()
+
+    tenant_totals = {}
+    staff_totals = {}
+    for row_day, staff_id, status, count, total in rows:
+        row_day = _as_date(row_day)
+        counters = _counters(RollupState(tenant_id, staff_id, row_day, status, float(total)), 1)
+        # _counters conta um agendamento; escalar as contagens pelo grupo
+        for name in ('appointments_count', 'completed_count', 'cancelled_count'):
+            counters[name] *= count
+        _accumulate(tenant_totals, row_day, counters)
+        _accumulate(staff_totals, (staff_id, row_day), counters)
+
+    DailyStaffStats.query.filter_by(tenant_id=tenant_id).delete(synchronize_session=False)
+    DailyTenantStats.query.filter_by(tenant_id=tenant_id).delete(synchronize_session=False)
+
+    db.session.bulk_insert_mappings(DailyTenantStats, [
+        dict(counters, tenant_id=tenant_id, date=row_day)
+        for row_day, counters in tenant_totals.items()
+    ])
+    db.session.bulk_insert_mappings(DailyStaffStats, [
+        dict(counters, tenant_id=tenant_id, staff_id=staff_id, date=row_day)
+        for (staff_id, row_day), counters in staff_totals.items()
+    ])
+    db.session.commit()
+    return len(tenant_totals)
+
+def period_range(period, today=None):
+    """Converter 'week', 'month' ou 'year' em (início, fim) inclusivos"""
+    if period not in PERIOD_DAYS:
+        raise ValueError(f'Período inválido: {period}')
+    today = today or date.today()
+    return today - timedelta(days=PERIOD_DAYS[period] - 1), today
+
+def load_dashboard_stats(tenant_id, start, end):
+    """Ler os agregados do período: O(dias) linhas, sem varrer appointments"""
+    daily = DailyTenantStats.query.filter(
+        DailyTenantStats.tenant_id == tenant_id,
+        DailyTenantStats.date >= start,
+        DailyTenantStats.date <= end
+    ).order_by(DailyTenantStats.date).all()
+
+    by_staff = db.session.query(
+        DailyStaffStats.staff_id,
+        *[func.coalesce(func.sum(getattr(DailyStaffStats, name)), 0) for name in COUNTER_COLUMNS]
+    ).filter(
+        DailyStaffStats.tenant_id == tenant_id,
+        DailyStaffStats.date >= start,
+        DailyStaffStats.date <= end
+    ).group_by(DailyStaffStats.staff_id).all()
+
+    totals = dict.fromkeys(COUNTER_COLUMNS, 0)
+    series = []
+    for row in daily:
+        data = row.to_dict()
+        series.append(data)
+        for name in COUNTER_COLUMNS:
+            totals[name] += data[name]
+    totals['revenue'] = round(totals['revenue'], 2)
+    totals['completed_revenue'] = round(totals['completed_revenue'], 2)
+
+    staff = [
+        dict(zip(('staff_id',) + COUNTER_COLUMNS, row))
+        for row in by_staff
+    ]
+
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'totals': totals,
+        'daily': series,
+        'staff': staff
+    }
@@ -0,0 +1,176 @@
+import json
+import re
+from datetime import date
+from src.utils.availability import WEEKDAYS, interval_mask, merge_intervals
+from src.utils.cache import LRUTTLCache, MISSING
+
+MINUTES_PER_DAY = 24 * 60
+
+_TIME_PATTERN = re.compile(r'^(\d{1,2}):(\d{2})$')
+
+class ScheduleError(ValueError):
+    """Horário de trabalho inválido"""
+
+def _parse_time(value, field):
+    match = _TIME_PATTERN.match(str(value).strip()) if value is not None else None
+    if not match:
+        raise ScheduleError(f'Horário inválido em {field}: {value!r}')
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if minutes >= 60 or hours * 60 + minutes > MINUTES_PER_DAY:
+        raise ScheduleError(f'Horário inválido em {field}: {value!r}')
+    return hours * 60 + minutes
+
+def _parse_day(spec, field):
+    """Converter {"start", "end", "breaks": [...]} em intervalos [início, fim) do dia"""
+    if not spec:
+        return ()
+    if not isinstance(spec, dict):
+        raise ScheduleError(f'Formato inválido em {field}')
+
+    start = _parse_time(spec.get('start'), f'{field}.start')
+    end = _parse_time(spec.get('end'), f'{field}.end')
+    if end <= start:
+        raise ScheduleError(f'{field}: fim deve ser posterior ao início')
+
+    intervals = [(start, end)]
+    for index, pause in enumerate(spec.get('breaks') or []):
+        if not isinstance(pause, dict):
+            raise ScheduleError(f'Formato inválido em {field}.breaks[{index}]')
+        pause_start = _parse_time(pause.get('start'), f'{field}.breaks[{index}].start')
+        pause_end = _parse_time(pause.get('end'), f'{field}.breaks[{index}].end')
+        if pause_end <= pause_start:
+            raise ScheduleError(f'{field}.breaks[{index}]: fim deve ser posterior ao início')
+        intervals = [
+            piece
+            for interval_start, interval_end in intervals
+            for piece in ((interval_start, min(interval_end, pause_start)), (max(interval_start, pause_end), interval_end))
+            if piece[1] > piece[0]
+        ]
+    return tuple(merge_intervals(intervals))
+
+class WorkDay:
+    """Expediente compilado de um dia: intervalos em minutos desde a meia-noite"""
+
+    __slots__ = ('intervals',)
+
+    def __init__(self, intervals):
+        self.intervals = intervals
+
+    def __bool__(self):
+        return bool(self.intervals)
+
+    @property
+    def start(self):
+        return self.intervals[0][0]
+
+    @property
+    def end(self):
+        return self.intervals[-1][1]
+
+    @property
+    def gaps(self):
+        """Pausas entre os intervalos (tratadas como ocupadas na busca de slots)"""
+        return [
+            (previous_end, next_start)
+            for (_, previous_end), (next_start, _) in zip(self.intervals, self.intervals[1:])
+        ]
+
+    @property
+    def minutes(self):
+        return sum(end - start for start, end in self.intervals)
+
+    def mask(self, block):
+        """Bitmap dos blocos inteiramente dentro do expediente"""
+        mask = 0
+        for start, end in self.intervals:
+            first = -(-start // block) * block
+            last = end // block * block
+            mask |= interval_mask(first, last, block)
+        return mask
+
+class WorkSchedule:
+    """Horário semanal compilado em intervalos de minuto-da-semana, com exceções por data"""
+
+    def __init__(self, weekly=(), overrides=None):
+        # Intervalos [início, fim) em minutos desde segunda-feira 00:00
+        self.weekly = tuple(weekly)
+        self.overrides = {day: WorkDay(intervals) for day, intervals in (overrides or {}).items()}
+
+        by_weekday = [[] for _ in WEEKDAYS]
+        for start, end in self.weekly:
+            weekday, offset = divmod(start, MINUTES_PER_DAY)
+            by_weekday[weekday].append((offset, offset + end - start))
+        self._days = tuple(WorkDay(tuple(intervals)) for intervals in by_weekday)
+
+    def day(self, target_date):
+        """Expediente da data (exceções têm prioridade sobre o horário semanal)"""
+        override = self.overrides.get(target_date)
+        if override is not None:
+            return override
+        return self._days[target_date.weekday()]
+
+    def to_dict(self):
+        return {
+            'weekly': [list(interval) for interval in self.weekly],
+            'overrides': {
+                day.isoformat(): [list(interval) for interval in work_day.intervals]
+                for day, work_day in sorted(self.overrides.items())
+            }
+        }
+
+EMPTY_SCHEDULE = WorkSchedule()
+
+def compile_schedule(raw):
+    """Validar e compilar o JSON de Staff.work_schedule
+
+    Formato: {"monday": {"start": "08:00", "end": "18:00",
+    "breaks": [{"start": "12:00", "end": "14:00"}]}, ...,
+    "overrides": {"2026-12-25": null, "2026-12-24": {"start": "08:00", "end": "12:00"}}}.
+    Uma exceção nula ou vazia indica folga na data.
+    """
+    if not raw:
+        return EMPTY_SCHEDULE
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            raise ScheduleError('JSON de horário inválido')
+    if not isinstance(raw, dict):
+        raise ScheduleError('Horário deve ser um objeto')
+
+    weekly = []
+    for weekday, name in enumerate(WEEKDAYS):
+        base = weekday * MINUTES_PER_DAY
+        weekly.extend((base + start, base + end) for start, end in _parse_day(raw.get(name), name))
+
+    overrides = {}
+    for key, spec in (raw.get('overrides') or {}).items():
+        try:
+            day = date.fromisoformat(key)
+        except ValueError:
+            raise ScheduleError(f'Data inválida em overrides: {key!r}')
+        overrides[day] = _parse_day(spec, f'overrides.{key}')
+
+    return WorkSchedule(weekly, overrides)
+
+_compiled = LRUTTLCache(max_size=4096, ttl=24 * 60 * 60)
+
+def cached_schedule(staff_id, version, raw):
+    """Horário compilado de um funcionário, reutilizado enquanto a versão da linha não mudar
+
+    Horários inválidos são tratados como vazios (funcionário sem expediente).
+    """
+    entry = _compiled.get(staff_id)
+    if entry is not MISSING and entry[0] == version:
+        return entry[1]
+
+    try:
+        schedule = compile_schedule(raw)
+    except ScheduleError:
+        schedule = EMPTY_SCHEDULE
+    _compiled.set(staff_id, (version, schedule))
+    return schedule
+
+def staff_schedule(staff):
+    """Horário compilado de um Staff, versionado por updated_at"""
+    return cached_schedule(staff.id, staff.updated_at or staff.work_schedule, staff.work_schedule)
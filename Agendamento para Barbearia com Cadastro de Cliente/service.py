@@ -1,11 +1,14 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from . import db
 
 class Service(db.Model):
     """Modelo para serviços oferecidos pelas barbearias"""
     __tablename__ = 'services'
+    __table_args__ = (
+        Index('ix_services_tenant_active_name', 'tenant_id', 'is_active', 'name'),
+    )
     
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey('tenants.id'), nullable=False)
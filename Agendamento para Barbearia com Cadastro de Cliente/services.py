@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError
 from src.models import db, Service
 from src.middleware.tenant import get_current_tenant
+from src.utils.site_bundle import invalidate_site_bundle
 
 services_bp = Blueprint('services', __name__)
 
@@ -71,6 +72,7 @@ def create_service():
         
         db.session.add(service)
         db.session.commit()
+        invalidate_site_bundle(tenant)
         
         return jsonify({
             'message': 'Serviço criado com sucesso',
@@ -144,6 +146,7 @@ def update_service(service_id):
             service.is_active = data['is_active']
         
         db.session.commit()
+        invalidate_site_bundle(tenant)
         
         return jsonify({
             'message': 'Serviço atualizado com sucesso',
@@ -181,6 +184,7 @@ def delete_service(service_id):
         
         db.session.delete(service)
         db.session.commit()
+        invalidate_site_bundle(tenant)
         
         return jsonify({'message': 'Serviço excluído com sucesso'}), 200
         
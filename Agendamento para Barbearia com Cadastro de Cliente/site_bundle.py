@@ -0,0 +1,186 @@
+import hashlib
+import json
+from flask import current_app, request, make_response
+from src.models import TenantConfig, Service, Staff
+from src.middleware.tenant_cache import on_tenant_invalidated
+from src.utils.cache import LRUTTLCache, MISSING
+
+# Rede de segurança para escritas que não passam por invalidate_tenant (serviços, funcionários)
+SITE_BUNDLE_TTL = 600
+
+DEFAULT_THEME = {
+    'primary_color': '#1A1A1A',
+    'secondary_color': '#B8860B',
+    'accent_color': '#8B0000',
+    'logo_url': None
+}
+
+DEFAULT_OPENING_HOURS = {
+    'monday': {'open': '08:00', 'close': '18:00', 'closed': False},
+    'tuesday': {'open': '08:00', 'close': '18:00', 'closed': False},
+    'wednesday': {'open': '08:00', 'close': '18:00', 'closed': False},
+    'thursday': {'open': '08:00', 'close': '18:00', 'closed': False},
+    'friday': {'open': '08:00', 'close': '18:00', 'closed': False},
+    'saturday': {'open': '08:00', 'close': '16:00', 'closed': False},
+    'sunday': {'open': '08:00', 'close': '16:00', 'closed': True}
+}
+
+_bundles = LRUTTLCache(max_size=1024, ttl=SITE_BUNDLE_TTL)
+
+def _load_json(value, default):
+    if not value:
+        return default
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return default
+
+def _dumps(data):
+    return json.dumps(data, sort_keys=True, default=str, separators=(',', ':')).encode('utf-8')
+
+class SiteBundle:
+    """Dados do site de um tenant montados uma vez e serializados por seção"""
+
+    def __init__(self, tenant_id, data, sections):
+        self.tenant_id = tenant_id
+        self.data = data
+        self.body = _dumps(data)
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        # Corpo JSON pronto de cada endpoint servido a partir do bundle
+        self._sections = {name: _dumps(payload) for name, payload in sections.items()}
+
+    def section(self, name):
+        return self._sections[name]
+
+    def section_etag(self, name):
+        return f'{self.etag}-{name}'
+
+def build_bundle(tenant):
+    """Montar o bundle do tenant: tema, negócio, horários, políticas, serviços e equipe"""
+    config = TenantConfig.query.filter_by(tenant_id=tenant.id).first()
+
+    theme = dict(DEFAULT_THEME)
+    if config:
+        theme.update({
+            'primary_color': config.primary_color,
+            'secondary_color': config.secondary_color,
+            'accent_color': config.accent_color,
+            'logo_url': config.logo_url
+        })
+
+    business_info = {
+        'business_name': config.business_name if config else None,
+        'description': config.description if config else None,
+        'address': config.address if config else None,
+        'city': config.city if config else 'Brejo',
+        'state': config.state if config else 'MA',
+        'zip_code': config.zip_code if config else None,
+        'phone': config.phone if config else None,
+        'email': config.email if config else None,
+        'website': config.website if config else None,
+        'instagram': config.instagram if config else None,
+        'facebook': config.facebook if config else None,
+        'whatsapp': config.whatsapp if config else None
+    }
+
+    opening_hours = {day: dict(hours) for day, hours in DEFAULT_OPENING_HOURS.items()}
+    saved_hours = _load_json(config.opening_hours if config else None, {})
+    if isinstance(saved_hours, dict):
+        opening_hours.update(saved_hours)
+
+    policies = _load_json(config.policies if config else None, {})
+
+    services = [
+        {
+            'id': service.id,
+            'name': service.name,
+            'description': service.description,
+            'duration': service.duration_minutes,
+            'price': service.price,
+            'category': service.category,
+            'image_url': service.image_url
+        }
+        for service in Service.query.filter_by(tenant_id=tenant.id, is_active=True).order_by(Service.name)
+    ]
+
+    staff = [
+        {
+            'id': member.id,
+            'name': member.name,
+            'position': member.position,
+            'photo_url': member.photo_url,
+            'bio': member.bio
+        }
+        for member in Staff.query.filter_by(tenant_id=tenant.id, is_active=True).order_by(Staff.name)
+    ]
+
+    data = {
+        'tenant': {'id': tenant.id, 'name': tenant.name, 'slug': tenant.slug},
+        'theme': theme,
+        'business_info': business_info,
+        'opening_hours': opening_hours,
+        'policies': policies,
+        'services': services,
+        'staff': staff
+    }
+
+    barbershop = dict(
+        business_info,
+        id=tenant.id,
+        name=tenant.name,
+        slug=tenant.slug,
+        business_name=business_info['business_name'] or tenant.name,
+        opening_hours=opening_hours,
+        policies=policies,
+        services=services,
+        staff=staff,
+        status='open',  # Implementar lógica de horário de funcionamento
+        rating=4.5,  # Implementar sistema de avaliações
+        total_reviews=0,  # Implementar sistema de avaliações
+        gallery=[]  # Implementar galeria de fotos
+    )
+    barbershop.update(theme)
+
+    sections = {
+        'preview': {
+            'tenant_name': tenant.name,
+            'theme': theme,
+            'business_info': business_info,
+            'opening_hours': opening_hours,
+            'policies': policies
+        },
+        'theme': {'theme': theme},
+        'business_info': {'business_info': business_info},
+        'opening_hours': {'opening_hours': opening_hours},
+        'policies': {'policies': policies},
+        'details': {'barbershop': barbershop}
+    }
+    return SiteBundle(tenant.id, data, sections)
+
+def get_site_bundle(tenant):
+    """Bundle do tenant, montado apenas após uma escrita ou expiração"""
+    bundle = _bundles.get(tenant.id)
+    if bundle is MISSING:
+        bundle = build_bundle(tenant)
+        _bundles.set(tenant.id, bundle, ttl=current_app.config.get('SITE_BUNDLE_TTL', SITE_BUNDLE_TTL))
+    return bundle
+
+def bundle_response(tenant, section, public=False):
+    """Responder com a seção serializada do bundle, ou 304 se o ETag não mudou"""
+    bundle = get_site_bundle(tenant)
+    etag = bundle.section_etag(section)
+
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(bundle.section(section))
+        response.mimetype = 'application/json'
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = ('public' if public else 'private') + ', max-age=0, must-revalidate'
+    return response
+
+@on_tenant_invalidated
+def invalidate_site_bundle(tenant):
+    """Descartar o bundle do tenant; o próximo acesso monta uma nova versão"""
+    _bundles.delete(tenant.id)
@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, LargeBinary, Index, UniqueConstraint
+from . import db
+
+# Um bit por bloco de 5 minutos: 288 blocos por dia
+BLOCK_MINUTES = 5
+BLOCKS_PER_DAY = 24 * 60 // BLOCK_MINUTES
+MASK_BYTES = BLOCKS_PER_DAY // 8
+
+class StaffDaySlots(db.Model):
+    """Bitmap pré-calculado de blocos ocupados de um funcionário em um dia"""
+    __tablename__ = 'staff_day_slots'
+    __table_args__ = (
+        UniqueConstraint('staff_id', 'date', name='uq_staff_day_slots_staff_date'),
+        Index('ix_staff_day_slots_tenant_date', 'tenant_id', 'date'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey('tenants.id'), nullable=False)
+    staff_id = Column(Integer, ForeignKey('staff.id'), nullable=False)
+    date = Column(Date, nullable=False)
+
+    # Bit i ligado = bloco [5i, 5i + 5) minutos ocupado
+    busy_mask = Column(LargeBinary(MASK_BYTES), nullable=False, default=bytes(MASK_BYTES))
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def busy_bits(self):
+        """Bitmap de ocupação como inteiro"""
+        return int.from_bytes(self.busy_mask or bytes(MASK_BYTES), 'little')
+
+    @busy_bits.setter
+    def busy_bits(self, value):
+        self.busy_mask = value.to_bytes(MASK_BYTES, 'little')
+
+    def __repr__(self):
+        return f'<StaffDaySlots staff={self.staff_id} - {self.date}>'
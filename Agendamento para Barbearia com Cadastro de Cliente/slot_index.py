@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+from src.models import db, Appointment
+from src.models.appointment import BLOCKING_STATUSES
+from src.models.slot_bitmap import StaffDaySlots, BLOCK_MINUTES
+from src.utils.availability import busy_intervals, busy_mask
+
+# Agendamentos não passam de 24h: basta olhar o dia anterior para achar os que cruzam a meia-noite
+MAX_SPILL = timedelta(days=1)
+
+def _day_bounds(day):
+    start_of_day = datetime.combine(day, datetime.min.time())
+    return start_of_day, start_of_day + timedelta(days=1)
+
+def spanned_days(start, duration_minutes):
+    """Dias ocupados por [start, start + duração); quem passa da meia-noite ocupa o dia seguinte"""
+    end = start + timedelta(minutes=duration_minutes)
+    last = max(end - timedelta(microseconds=1), start).date()
+    return [start.date() + timedelta(days=offset) for offset in range((last - start.date()).days + 1)]
+
+def _compute_masks(staff_ids, days):
+    """Calcular os bitmaps {(staff_id, dia): bits} de vários funcionários e dias com uma única consulta"""
+    days = sorted(set(days))
+    range_start, _ = _day_bounds(days[0])
+    _, range_end = _day_bounds(days[-1])
+
+    rows = db.session.query(
+        Appointment.staff_id,
+        Appointment.appointment_date,
+        Appointment.duration_minutes
+    ).filter(
+        and_(
+            Appointment.staff_id.in_(staff_ids),
+            Appointment.appointment_date >= range_start - MAX_SPILL,
+            Appointment.appointment_date < range_end,
+            Appointment.end_at > range_start,
+            Appointment.status.in_(BLOCKING_STATUSES)
+        )
+    ).all()
+
+    appointments = {(staff_id, day): [] for staff_id in staff_ids for day in days}
+    for staff_id, appointment_date, duration_minutes in rows:
+        for day in spanned_days(appointment_date, duration_minutes):
+            if (staff_id, day) in appointments:
+                appointments[(staff_id, day)].append((appointment_date, duration_minutes))
+
+    # Intervalos fora do dia (início na véspera) são cortados pelo bitmap
+    return {
+        (staff_id, day): busy_mask(busy_intervals(items, _day_bounds(day)[0]), BLOCK_MINUTES)
+        for (staff_id, day), items in appointments.items()
+    }
+
+def _insert_for_dialect():
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def _lock_staff_days(tenant_id, staff_id, days):
+    """Garantir as linhas de bitmap dos dias e travá-las até o commit
+
+    A linha travada serializa as escritas do mesmo funcionário/dia: o bitmap é
+    recalculado depois do lock e já enxerga o que a transação concorrente
+    gravou. A primeira reserva do dia cria a linha com ON CONFLICT DO NOTHING,
+    então duas reservas simultâneas não esbarram na restrição única.
+    """
+    insert = _insert_for_dialect()
+    if insert is not None:
+        db.session.execute(
+            insert(StaffDaySlots).values([
+                {'tenant_id': tenant_id, 'staff_id': staff_id, 'date': day} for day in days
+            ]).on_conflict_do_nothing(index_elements=['staff_id', 'date'])
+        )
+    else:
+        existing = {
+            day for (day,) in db.session.query(StaffDaySlots.date).filter(
+                StaffDaySlots.staff_id == staff_id,
+                StaffDaySlots.date.in_(days)
+            )
+        }
+        for day in days:
+            if day in existing:
+                continue
+            try:
+                with db.session.begin_nested():
+                    db.session.add(StaffDaySlots(tenant_id=tenant_id, staff_id=staff_id, date=day))
+            except IntegrityError:
+                # Criada por outra transação; a consulta abaixo trava a linha dela
+                pass
+
+    return {
+        slots.date: slots
+        for slots in StaffDaySlots.query.filter(
+            StaffDaySlots.staff_id == staff_id,
+            StaffDaySlots.date.in_(days)
+        ).with_for_update().populate_existing().all()
+    }
+
+def refresh_staff_days(tenant_id, staff_id, days):
+    """Recalcular os bitmaps de vários dias de um funcionário (chamar antes do commit)
+
+    Usado também por operações em lote (séries recorrentes): um lock e uma
+    consulta de agendamentos para todos os dias.
+    """
+    days = sorted(set(days))
+    if not days:
+        return []
+
+    rows = _lock_staff_days(tenant_id, staff_id, days)
+    masks = _compute_masks([staff_id], days)
+    for day in days:
+        rows[day].busy_bits = masks[(staff_id, day)]
+    return [rows[day] for day in days]
+
+def refresh_staff_day(tenant_id, staff_id, day):
+    """Recalcular o bitmap de um funcionário/dia na sessão atual (chamar antes do commit)"""
+    return refresh_staff_days(tenant_id, staff_id, [day])[0]
+
+def refresh_appointment_days(appointment, previous=None):
+    """Atualizar os bitmaps afetados por um agendamento e, se houver, pelo seu estado anterior
+
+    `previous` é uma tupla (staff_id, appointment_date, duration_minutes)
+    capturada antes da alteração. Funcionários são travados em ordem de id
+    para que duas remarcações cruzadas não entrem em deadlock.
+    """
+    affected = {}
+    current = (appointment.staff_id, appointment.appointment_date, appointment.duration_minutes)
+    for staff_id, start, duration_minutes in filter(None, (current, previous)):
+        affected.setdefault(staff_id, set()).update(spanned_days(start, duration_minutes))
+
+    for staff_id in sorted(affected):
+        refresh_staff_days(appointment.tenant_id, staff_id, affected[staff_id])
+
+def load_day_masks(tenant_id, day, staff_ids):
+    """Obter {staff_id: bitmap ocupado} do dia, somente leitura
+
+    Os bitmaps são gravados pelas escritas de agendamentos; os que faltam
+    (dias sem agendamentos desde a migração) são calculados sem persistir,
+    para que consultas públicas não façam commit.
+    """
+    masks = {
+        slots.staff_id: slots.busy_bits
+        for slots in StaffDaySlots.query.filter(
+            StaffDaySlots.tenant_id == tenant_id,
+            StaffDaySlots.date == day,
+            StaffDaySlots.staff_id.in_(staff_ids)
+        ).all()
+    }
+
+    missing = [staff_id for staff_id in staff_ids if staff_id not in masks]
+    if missing:
+        masks.update({staff_id: bits for (staff_id, _), bits in _compute_masks(missing, [day]).items()})
+
+    return masks
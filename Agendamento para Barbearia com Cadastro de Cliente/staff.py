@@ -1,11 +1,16 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Time
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Time, Index
+from sqlalchemy.orm import relationship, validates
+from src.utils.schedule import compile_schedule
 from . import db
+import json
 
 class Staff(db.Model):
     """Modelo para funcionários das barbearias"""
     __tablename__ = 'staff'
+    __table_args__ = (
+        Index('ix_staff_tenant_active_name', 'tenant_id', 'is_active', 'name'),
+    )
     
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey('tenants.id'), nullable=False)
@@ -25,6 +30,7 @@ class Staff(db.Model):
     is_active = Column(Boolean, default=True)
     
     # Horários de trabalho (JSON string)
+    # Pausas em "breaks" e exceções por data em "overrides" (ver compile_schedule)
     work_schedule = Column(Text)  # {"monday": {"start": "08:00", "end": "18:00"}, ...}
     
     # Timestamps
@@ -36,6 +42,14 @@ class Staff(db.Model):
     user = relationship('PlatformUser', backref='staff_profile')
     appointments = relationship('Appointment', back_populates='staff_member')
     
+    @validates('work_schedule')
+    def validate_work_schedule(self, key, value):
+        """Rejeitar horários inválidos na escrita (ScheduleError é um ValueError)"""
+        if isinstance(value, dict):
+            value = json.dumps(value)
+        compile_schedule(value)
+        return value
+    
     def to_dict(self):
         """Converter para dicionário"""
         return {
@@ -0,0 +1,163 @@
+import gzip
+import mimetypes
+import os
+import re
+import shutil
+from flask import request, send_file, make_response
+
+# Variantes pré-comprimidas, em ordem de preferência
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Nomes com hash de conteúdo gerados pelo build do Vite (ex.: assets/index-4f2a1b3c.js)
+HASHED_NAME = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+
+# Prefixos que nunca caem no index.html da SPA
+NON_SPA_PREFIXES = ('api/', 'assets/')
+
+# Gerados em tempo de execução; servidos pela rota /static padrão
+EXCLUDED_DIRS = {'uploads'}
+
+# Tipos que valem a pena comprimir
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt', '.xml', '.map', '.ico', '.wasm'}
+MIN_COMPRESS_SIZE = 1024
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'public, no-cache'
+
+class StaticAsset:
+    """Arquivo estático indexado na inicialização"""
+
+    __slots__ = ('path', 'size', 'etag', 'mimetype', 'immutable', 'variants')
+
+    def __init__(self, path, stat, mimetype, immutable):
+        self.path = path
+        self.size = stat.st_size
+        # Derivado de mtime e tamanho: não exige ler o arquivo na inicialização
+        self.etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+        self.mimetype = mimetype
+        self.immutable = immutable
+        self.variants = {}  # encoding -> (caminho, tamanho)
+
+    def select(self, accept_encoding):
+        """Caminho e encoding da melhor variante aceita pelo cliente"""
+        for encoding, _ in ENCODINGS:
+            variant = self.variants.get(encoding)
+            if variant and accept_encoding[encoding]:
+                return variant[0], encoding
+        return self.path, None
+
+def _scan(root, prefix=''):
+    """Percorrer a pasta com os.scandir, reaproveitando o stat de cada entrada"""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            name = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not prefix and entry.name in EXCLUDED_DIRS:
+                    continue
+                yield from _scan(entry.path, name + '/')
+            elif entry.is_file():
+                yield name, entry.path, entry.stat()
+
+def build_asset_index(root):
+    """Montar o índice caminho -> StaticAsset da pasta de estáticos"""
+    if not root or not os.path.isdir(root):
+        return {}
+
+    files = {name: (path, stat) for name, path, stat in _scan(root)}
+    index = {}
+    for name, (path, stat) in files.items():
+        if name.endswith(('.br', '.gz')) and name[:-3] in files:
+            continue
+
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        asset = StaticAsset(path, stat, mimetype, bool(HASHED_NAME.search(name)))
+
+        for encoding, suffix in ENCODINGS:
+            variant = files.get(name + suffix)
+            # Variante mais antiga que o original ficou desatualizada
+            if variant and variant[1].st_mtime_ns >= stat.st_mtime_ns:
+                asset.variants[encoding] = (variant[0], variant[1].st_size)
+
+        index[name] = asset
+    return index
+
+def is_spa_route(path):
+    """Caminho de rota da SPA (sem extensão, fora de api/ e assets/) que recebe o index.html
+
+    Arquivos ausentes respondem 404 em vez do HTML, que o navegador
+    tentaria interpretar como script ou folha de estilo.
+    """
+    if path.startswith(NON_SPA_PREFIXES):
+        return False
+    return '.' not in path.rsplit('/', 1)[-1]
+
+def serve_asset(asset):
+    """Responder com o asset (ou 304), escolhendo a variante pelo Accept-Encoding
+
+    Retorna None se o arquivo foi apagado depois da indexação; sem a variante
+    comprimida, o original ainda é servido.
+    """
+    candidates = [asset.select(request.accept_encodings)]
+    if candidates[0][1]:
+        candidates.append((asset.path, None))
+
+    for path, encoding in candidates:
+        etag = f'{asset.etag}-{encoding}' if encoding else asset.etag
+
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            try:
+                # send_file usa wsgi.file_wrapper (sendfile quando o servidor suporta)
+                response = send_file(path, mimetype=asset.mimetype, conditional=False, etag=False)
+            except FileNotFoundError:
+                continue
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE if asset.immutable else REVALIDATE_CACHE
+        if asset.variants:
+            response.vary.add('Accept-Encoding')
+        return response
+    return None
+
+def serve_path(index, path):
+    """Responder a um caminho: o arquivo indexado, o index.html para rotas da SPA, ou None"""
+    asset = index.get(path) if path else None
+    response = serve_asset(asset) if asset else None
+    if response is None and is_spa_route(path):
+        shell = index.get('index.html')
+        response = serve_asset(shell) if shell else None
+    return response
+
+def compress_assets(root):
+    """Gerar as variantes .gz (e .br, se o pacote brotli estiver instalado) dos estáticos
+
+    Retorna a quantidade de arquivos gravados.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    written = 0
+    for name, path, stat in _scan(root):
+        extension = os.path.splitext(name)[1].lower()
+        if extension not in COMPRESSIBLE_EXTENSIONS or stat.st_size < MIN_COMPRESS_SIZE:
+            continue
+
+        gz_path = path + '.gz'
+        if not os.path.exists(gz_path) or os.stat(gz_path).st_mtime_ns < stat.st_mtime_ns:
+            with open(path, 'rb') as source, gzip.GzipFile(gz_path, 'wb', compresslevel=9, mtime=0) as target:
+                shutil.copyfileobj(source, target)
+            written += 1
+
+        br_path = path + '.br'
+        if brotli and (not os.path.exists(br_path) or os.stat(br_path).st_mtime_ns < stat.st_mtime_ns):
+            with open(path, 'rb') as source:
+                data = brotli.compress(source.read(), quality=11)
+            with open(br_path, 'wb') as target:
+                target.write(data)
+            written += 1
+    return written
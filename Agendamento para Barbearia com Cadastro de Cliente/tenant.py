@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from src.models import db, Tenant, TenantConfig, PlatformUser
-from src.middleware import get_current_tenant, require_tenant
+from src.models import db, Tenant, TenantConfig, PlatformUser, Client
+from src.middleware import get_current_tenant, require_tenant, invalidate_tenant
+from src.utils.rollups import backfill_daily_stats, period_range, load_dashboard_stats
+from datetime import date
+import click
 
 tenant_bp = Blueprint('tenant', __name__)
 
@@ -87,6 +90,7 @@ def update_tenant_config():
             tenant.name = data['business_name']
         
         db.session.commit()
+        invalidate_tenant(tenant)
         
         return jsonify({
             'message': 'Configurações atualizadas com sucesso',
@@ -140,6 +144,7 @@ def upload_logo():
         
         config.logo_url = f'/static/uploads/{filename}'
         db.session.commit()
+        invalidate_tenant(tenant)
         
         return jsonify({
             'message': 'Logo atualizado com sucesso',
@@ -285,21 +290,38 @@ def get_dashboard():
     try:
         tenant = get_current_tenant()
         
-        # Estatísticas básicas (implementação simplificada)
+        # Estatísticas básicas
         total_staff = PlatformUser.query.filter_by(
             tenant_id=tenant.id,
             role='tenant_user',
             status='active'
         ).count()
         
+        total_clients = Client.query.filter_by(tenant_id=tenant.id, is_active=True).count()
+        
+        # Período do dashboard (week, month ou year) lido dos agregados diários
+        period = request.args.get('period', 'week')
+        try:
+            start, end = period_range(period)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        today = date.today()
+        summary = load_dashboard_stats(tenant.id, start, end)
+        today_stats = next(
+            (day for day in summary['daily'] if day['date'] == today.isoformat()),
+            None
+        )
+        
         dashboard_data = {
             'tenant': tenant.to_dict(),
             'stats': {
                 'total_staff': total_staff,
-                'total_appointments_today': 0,  # Implementar quando tiver modelo de agendamentos
-                'total_clients': 0,  # Implementar quando tiver modelo de clientes
-                'revenue_today': 0.0  # Implementar quando tiver modelo de pagamentos
-            }
+                'total_appointments_today': today_stats['appointments_count'] if today_stats else 0,
+                'total_clients': total_clients,
+                'revenue_today': today_stats['revenue'] if today_stats else 0.0
+            },
+            'period': dict(summary, period=period)
         }
         
         return jsonify(dashboard_data), 200
@@ -307,3 +329,15 @@ def get_dashboard():
     except Exception as e:
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
+@tenant_bp.cli.command('backfill-daily-stats')
+@click.option('--tenant-id', type=int, default=None, help='Reconstruir apenas um tenant')
+def backfill_daily_stats_command(tenant_id):
+    """Reconstruir daily_tenant_stats e daily_staff_stats a partir dos agendamentos"""
+    if tenant_id is not None:
+        tenant_ids = [tenant_id]
+    else:
+        tenant_ids = [row[0] for row in db.session.query(Tenant.id)]
+    
+    for current_tenant_id in tenant_ids:
+        days = backfill_daily_stats(current_tenant_id)
+        click.echo(f'Tenant {current_tenant_id}: {days} dias reconstruídos')
@@ -0,0 +1,129 @@
+import json
+from collections import namedtuple
+from flask import current_app
+from src.models import Tenant
+from src.utils.cache import LRUTTLCache, MISSING
+
+# Dados mínimos do tenant necessários para resolver uma requisição
+TenantSnapshot = namedtuple('TenantSnapshot', ['id', 'slug', 'name', 'status', 'plan', 'config'])
+
+# Slugs inexistentes também são memorizados, por menos tempo
+NOT_FOUND = 'not_found'
+NOT_FOUND_TTL = 10
+
+REDIS_KEY_PREFIX = 'tenant:slug:'
+
+_local = LRUTTLCache(max_size=1024, ttl=60)
+_listeners = []
+_redis_client = None
+_redis_stats = {'hits': 0, 'misses': 0, 'errors': 0}
+
+def _configure():
+    """Aplicar limites do config da aplicação ao cache local"""
+    _local.max_size = current_app.config.get('TENANT_CACHE_MAX_SIZE', _local.max_size)
+    _local.ttl = current_app.config.get('TENANT_CACHE_TTL', _local.ttl)
+
+def _redis():
+    """Cliente Redis do segundo nível, se habilitado e disponível"""
+    global _redis_client
+    if not current_app.config.get('TENANT_CACHE_REDIS_ENABLED'):
+        return None
+    if _redis_client is None:
+        try:
+            import redis
+        except ImportError:
+            return None
+        _redis_client = redis.Redis.from_url(current_app.config['REDIS_URL'], socket_timeout=0.2)
+    return _redis_client
+
+def _redis_get(slug):
+    client = _redis()
+    if client is None:
+        return MISSING
+    try:
+        raw = client.get(REDIS_KEY_PREFIX + slug)
+    except Exception:
+        _redis_stats['errors'] += 1
+        return MISSING
+    if raw is None:
+        _redis_stats['misses'] += 1
+        return MISSING
+    _redis_stats['hits'] += 1
+    data = json.loads(raw)
+    return NOT_FOUND if data is None else TenantSnapshot(**data)
+
+def _redis_set(slug, snapshot, ttl):
+    client = _redis()
+    if client is None:
+        return
+    payload = None if snapshot is NOT_FOUND else snapshot._asdict()
+    try:
+        client.setex(REDIS_KEY_PREFIX + slug, ttl, json.dumps(payload, default=str))
+    except Exception:
+        _redis_stats['errors'] += 1
+
+def _redis_delete(slug):
+    client = _redis()
+    if client is None:
+        return
+    try:
+        client.delete(REDIS_KEY_PREFIX + slug)
+    except Exception:
+        _redis_stats['errors'] += 1
+
+def make_snapshot(tenant):
+    """Criar snapshot imutável a partir do modelo"""
+    return TenantSnapshot(
+        id=tenant.id,
+        slug=tenant.slug,
+        name=tenant.name,
+        status=tenant.status,
+        plan=getattr(tenant, 'plan', None),
+        config=tenant.config.to_dict() if tenant.config else None
+    )
+
+def resolve_tenant(slug):
+    """Resolver slug (ou subdomínio) em TenantSnapshot, consultando o banco apenas em caso de falta"""
+    if not slug:
+        return None
+    _configure()
+
+    snapshot = _local.get(slug)
+    if snapshot is MISSING:
+        snapshot = _redis_get(slug)
+        if snapshot is MISSING:
+            tenant = Tenant.query.filter_by(slug=slug).first()
+            snapshot = make_snapshot(tenant) if tenant else NOT_FOUND
+            ttl = _local.ttl if tenant else NOT_FOUND_TTL
+            _redis_set(slug, snapshot, ttl)
+        else:
+            ttl = _local.ttl if snapshot is not NOT_FOUND else NOT_FOUND_TTL
+        _local.set(slug, snapshot, ttl=ttl)
+
+    return None if snapshot is NOT_FOUND else snapshot
+
+def resolve_active_tenant(slug):
+    """Resolver slug apenas se o tenant estiver ativo"""
+    snapshot = resolve_tenant(slug)
+    if snapshot and snapshot.status == 'active':
+        return snapshot
+    return None
+
+def on_tenant_invalidated(callback):
+    """Registrar callback(tenant) chamado junto com invalidate_tenant (caches derivados)"""
+    _listeners.append(callback)
+    return callback
+
+def invalidate_tenant(tenant):
+    """Descartar o snapshot do tenant em todos os níveis após uma escrita"""
+    _local.delete(tenant.slug)
+    _redis_delete(tenant.slug)
+    for callback in _listeners:
+        callback(tenant)
+
+def tenant_cache_stats():
+    """Contadores de acerto/erro dos dois níveis"""
+    return {
+        'local': _local.stats(),
+        'redis': dict(_redis_stats, enabled=bool(current_app.config.get('TENANT_CACHE_REDIS_ENABLED')))
+    }
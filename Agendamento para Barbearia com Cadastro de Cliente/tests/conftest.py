@@ -0,0 +1,150 @@
+import os
+import socket
+import sqlite3
+import sys
+from datetime import datetime
+from email import message_from_bytes
+
+import pytest
+
+# Raiz do projeto (pacote src e app.py legado) no fim do caminho de importação:
+# módulos soltos como public.py não podem esconder pacotes instalados (atpublic)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app():
+    """Aplicação mínima com as tabelas do app multi-tenant em SQLite na memória"""
+    models = pytest.importorskip('src.models')
+    from flask import Flask
+    # Modelos fora do __init__ do pacote: registrar antes do create_all
+    import src.models.daily_stats, src.models.media, src.models.notification, src.models.slot_bitmap  # noqa: F401
+
+    app = Flask(__name__)
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI='sqlite://')
+    models.db.init_app(app)
+
+    with app.app_context():
+        models.db.create_all()
+        yield app
+        models.db.session.remove()
+        models.db.drop_all()
+
+
+@pytest.fixture
+def db(app):
+    from src.models import db
+    return db
+
+
+@pytest.fixture
+def shop(db):
+    """Tenant com um funcionário, um serviço de 30 minutos e um cliente"""
+    from src.models import Tenant, Staff, Service, Client
+
+    tenant = Tenant(name='Barbearia Teste', slug='barbearia-teste')
+    db.session.add(tenant)
+    db.session.flush()
+
+    staff = Staff(tenant_id=tenant.id, name='João', work_schedule={
+        day: {'start': '08:00', 'end': '18:00'}
+        for day in ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday')
+    })
+    service = Service(tenant_id=tenant.id, name='Corte', price=40.0, duration_minutes=30)
+    client = Client(tenant_id=tenant.id, name='Maria Silva', email='maria@example.com', phone='(98) 99999-1234')
+    db.session.add_all([staff, service, client])
+    db.session.commit()
+
+    class Shop:
+        pass
+
+    shop = Shop()
+    shop.tenant, shop.staff, shop.service, shop.client = tenant, staff, service, client
+    return shop
+
+
+@pytest.fixture
+def make_appointment(db, shop):
+    """Criar agendamentos do funcionário/serviço/cliente de `shop` (sem commit)"""
+    from src.models import Appointment
+
+    def make(appointment_date=None, **fields):
+        values = {
+            'tenant_id': shop.tenant.id,
+            'client_id': shop.client.id,
+            'service_id': shop.service.id,
+            'staff_id': shop.staff.id,
+            'appointment_date': appointment_date or datetime(2030, 1, 7, 10, 0),
+            'duration_minutes': shop.service.duration_minutes,
+            'price': shop.service.price,
+            'final_price': shop.service.price
+        }
+        values.update(fields)
+        appointment = Appointment(**values)
+        db.session.add(appointment)
+        db.session.flush()
+        return appointment
+
+    return make
+
+
+@pytest.fixture
+def legacy(tmp_path, monkeypatch):
+    """Site legado (app.py) apontando para um banco SQLite temporário"""
+    legacy = pytest.importorskip('app')
+    monkeypatch.setattr(legacy, 'DATABASE', str(tmp_path / 'database.db'))
+    # Escritor novo: a thread anterior mantém a conexão do banco de outro teste
+    writer = legacy.WriterQueue()
+    monkeypatch.setattr(legacy, 'booking_writer', writer)
+    legacy.init_db()
+    yield legacy
+
+    writer.stop()
+    conn = getattr(legacy._local, 'conn', None)
+    if conn is not None:
+        sqlite3.Connection.close(conn)
+        del legacy._local.conn
+
+
+class RecordingHandler:
+    """Servidor SMTP de teste: guarda as mensagens e recusa os destinatários de `refused`"""
+
+    def __init__(self):
+        self.messages = []
+        self.refused = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused:
+            return '550 Destinatario recusado'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(message_from_bytes(envelope.content))
+        return '250 OK'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """Servidor aiosmtpd local; retorna o handler com a porta em `port`"""
+    controller_module = pytest.importorskip('aiosmtpd.controller')
+
+    handler = RecordingHandler()
+    handler.port = _free_port()
+    controller = controller_module.Controller(handler, hostname='127.0.0.1', port=handler.port)
+    controller.start()
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def closed_port():
+    """Porta local sem servidor (conexão recusada)"""
+    return _free_port()
+
@@ -0,0 +1,177 @@
+from datetime import date, datetime
+
+import pytest
+
+np = pytest.importorskip('numpy')
+analytics_engine = pytest.importorskip('src.utils.analytics_engine')
+
+MONDAY = date(2030, 1, 7)
+
+
+@pytest.fixture(autouse=True)
+def clear_results():
+    # Cache por tenant/período em nível de módulo: cada teste recria o tenant 1
+    analytics_engine._results.clear()
+    yield
+    analytics_engine._results.clear()
+
+
+@pytest.fixture
+def second_staff(db, shop):
+    """Outro funcionário com o mesmo expediente do primeiro"""
+    from src.models import Staff
+
+    staff = Staff(tenant_id=shop.tenant.id, name='Pedro', work_schedule=shop.staff.work_schedule)
+    db.session.add(staff)
+    db.session.commit()
+    return staff
+
+
+@pytest.fixture
+def api(app, db, shop):
+    """Cliente HTTP com o blueprint de analytics, um token válido e o tenant de `shop`"""
+    from flask import g
+    from flask_jwt_extended import JWTManager, create_access_token
+    from src.models import Tenant
+    from src.routes.analytics import analytics_bp
+
+    app.config['JWT_SECRET_KEY'] = 'segredo-de-teste-com-32-bytes-ou-mais'
+    JWTManager(app)
+    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+
+    @app.before_request
+    def set_tenant():
+        g.current_tenant = db.session.get(Tenant, shop.tenant.id)
+
+    token = create_access_token(identity='1')
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
+
+
+def minutes(hour, minute=0, day=MONDAY):
+    return analytics_engine._epoch_minutes(datetime.combine(day, datetime.min.time())) + hour * 60 + minute
+
+
+def test_merge_intervals_fuses_overlaps_per_staff():
+    staff = np.array([1, 2, 1, 1])
+    starts = np.array([minutes(10), minutes(10, 15), minutes(10, 15), minutes(12)])
+    ends = np.array([minutes(10, 30), minutes(10, 45), minutes(11, 15), minutes(12, 30)])
+
+    staff_ids, owners, block_start, block_end = analytics_engine.merge_intervals(staff, starts, ends)
+
+    blocks = sorted(zip(staff_ids[owners].tolist(), block_start.tolist(), block_end.tolist()))
+    assert blocks == [
+        (1, minutes(10), minutes(11, 15)),
+        (1, minutes(12), minutes(12, 30)),
+        (2, minutes(10, 15), minutes(10, 45)),
+    ]
+
+
+def test_merge_intervals_without_bookings():
+    empty = np.zeros(0, dtype=np.int64)
+
+    staff_ids, owners, block_start, block_end = analytics_engine.merge_intervals(empty, empty, empty)
+
+    assert len(staff_ids) == len(owners) == len(block_start) == len(block_end) == 0
+
+
+def test_overlapping_bookings_count_once_in_the_hour_profile(db, shop, second_staff, make_appointment):
+    make_appointment(datetime(2030, 1, 7, 10, 0), duration_minutes=30)
+    make_appointment(datetime(2030, 1, 7, 10, 15), duration_minutes=60)
+    db.session.commit()
+
+    frame = analytics_engine.load_frame(shop.tenant.id, MONDAY, MONDAY)
+    result = analytics_engine.occupancy(frame, analytics_engine.load_staff_schedules(shop.tenant.id), MONDAY, MONDAY)
+
+    # Hora 10 inteira ocupada para um dos dois funcionários em expediente
+    assert result['by_hour'][10] == 50.0
+    assert result['by_hour'][11] == 12.5
+    assert result['by_hour'][9] == 0.0
+    assert result['by_hour'][20] == 0.0
+    first, second = result['staff']
+    assert first['booked_minutes'] == 75
+    assert first['available_minutes'] == 600
+    assert second['booked_minutes'] == 0
+    assert result['occupancy'] == round(75 / 1200 * 100, 1)
+
+
+def test_cancelled_bookings_do_not_occupy(db, shop, make_appointment):
+    from src.models.appointment import AppointmentStatus
+
+    make_appointment(datetime(2030, 1, 7, 10, 0), status=AppointmentStatus.CANCELLED)
+    db.session.commit()
+
+    frame = analytics_engine.load_frame(shop.tenant.id, MONDAY, MONDAY)
+    result = analytics_engine.occupancy(frame, analytics_engine.load_staff_schedules(shop.tenant.id), MONDAY, MONDAY)
+
+    assert result['occupancy'] == 0.0
+    assert result['by_hour'][10] == 0.0
+
+
+def test_group_revenue_and_hour_histogram(db, shop, make_appointment):
+    from src.models.appointment import AppointmentStatus
+
+    make_appointment(datetime(2030, 1, 7, 9, 0), status=AppointmentStatus.COMPLETED)
+    make_appointment(datetime(2030, 1, 7, 9, 30), final_price=20.0)
+    make_appointment(datetime(2030, 1, 8, 14, 0), status=AppointmentStatus.CANCELLED)
+    db.session.commit()
+
+    frame = analytics_engine.load_frame(shop.tenant.id, MONDAY, date(2030, 1, 8))
+
+    assert analytics_engine.group_revenue(frame, 'weekday') == [
+        {'key': 0, 'appointments': 2, 'cancelled': 0, 'revenue': 60.0, 'completed_revenue': 40.0, 'average_ticket': 30.0},
+        {'key': 1, 'appointments': 0, 'cancelled': 1, 'revenue': 0.0, 'completed_revenue': 0.0, 'average_ticket': 0.0},
+    ]
+    histogram = analytics_engine.hour_histogram(frame)
+    assert histogram[9] == 2
+    assert sum(histogram) == 2
+
+
+def test_revenue_endpoint_labels_groups(db, shop, make_appointment, api):
+    make_appointment(datetime(2030, 1, 7, 9, 0))
+    db.session.commit()
+
+    response = api.get('/api/analytics/revenue?group_by=staff&start=2030-01-01&end=2030-01-31')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['start'] == '2030-01-01'
+    assert body['groups'] == [{
+        'key': shop.staff.id, 'label': 'João', 'appointments': 1, 'cancelled': 0,
+        'revenue': 40.0, 'completed_revenue': 0.0, 'average_ticket': 40.0
+    }]
+
+
+def test_hours_endpoint(db, shop, make_appointment, api):
+    make_appointment(datetime(2030, 1, 7, 9, 0))
+    make_appointment(datetime(2030, 1, 7, 15, 0))
+    db.session.commit()
+
+    body = api.get('/api/analytics/hours?start=2030-01-07&end=2030-01-07').get_json()
+
+    assert len(body['histogram']) == 24
+    assert body['histogram'][9] == body['histogram'][15] == 1
+
+
+def test_occupancy_endpoint(db, shop, second_staff, make_appointment, api):
+    make_appointment(datetime(2030, 1, 7, 10, 0), duration_minutes=30)
+    make_appointment(datetime(2030, 1, 7, 10, 15), duration_minutes=60)
+    db.session.commit()
+
+    body = api.get('/api/analytics/occupancy?start=2030-01-07&end=2030-01-07').get_json()
+
+    assert body['by_hour'][10] == 50.0
+    assert [staff['name'] for staff in body['staff']] == ['João', 'Pedro']
+    assert body['staff'][0]['occupancy'] == 12.5
+
+
+@pytest.mark.parametrize('query', [
+    'group_by=client',
+    'start=2030-01-31&end=2030-01-01',
+    'start=2030-01-01',
+    'start=2028-01-01&end=2030-12-31',
+    'period=decade',
+])
+def test_invalid_parameters_are_400(api, query):
+    assert api.get(f'/api/analytics/revenue?{query}').status_code == 400
@@ -0,0 +1,78 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+availability = pytest.importorskip('src.utils.availability')
+
+
+def starts(work_start, work_end, busy, duration, step=30):
+    return [
+        availability.minutes_to_time(start)
+        for start in availability.available_starts(work_start, work_end, busy, duration, step)
+    ]
+
+
+def test_merge_intervals_fuses_overlapping_and_adjacent_intervals():
+    assert availability.merge_intervals([(60, 90), (0, 30), (30, 45), (80, 120), (200, 200)]) == [(0, 45), (60, 120)]
+
+
+def test_busy_intervals_are_relative_to_the_day():
+    day_start = datetime(2030, 1, 7)
+    appointments = [(datetime(2030, 1, 7, 10, 0), 30), (datetime(2030, 1, 7, 9, 45), 30)]
+
+    assert availability.busy_intervals(appointments, day_start) == [(585, 630)]
+
+
+def test_slots_skip_busy_intervals_and_stay_on_the_work_start_grid():
+    # Expediente 08:10-12:00, ocupado 09:00-09:45
+    assert starts(490, 720, [(540, 585)], 30) == ['08:10', '10:10', '10:40', '11:10']
+
+
+def test_long_services_only_fit_in_large_enough_windows():
+    # 60 minutos não cabem entre 09:00 e 09:30
+    busy = [(510, 540), (570, 600)]
+    assert starts(480, 720, busy, 60) == ['10:00', '10:30', '11:00']
+
+
+def test_no_slots_for_invalid_duration_or_step():
+    assert starts(480, 720, [], 0) == []
+    assert starts(480, 720, [], 30, step=0) == []
+
+
+def test_build_slots_uses_the_api_format():
+    slots = availability.build_slots(date(2030, 1, 7), 480, 540, [], 30)
+
+    assert slots == [
+        {'time': '08:00', 'datetime': '2030-01-07T08:00:00', 'duration': 30},
+        {'time': '08:30', 'datetime': '2030-01-07T08:30:00', 'duration': 30}
+    ]
+
+
+def test_overlapping_rejects_intersecting_bookings_only(db, shop, make_appointment):
+    from src.models import Appointment
+
+    start = datetime(2030, 1, 7, 10, 0)
+    make_appointment(start)
+    db.session.commit()
+
+    def conflicts(new_start, minutes=30):
+        return Appointment.overlapping(shop.staff.id, new_start, new_start + timedelta(minutes=minutes)).count()
+
+    assert conflicts(start + timedelta(minutes=15)) == 1
+    assert conflicts(start - timedelta(minutes=15)) == 1
+    assert conflicts(start - timedelta(minutes=10), minutes=60) == 1
+    # Encostados não conflitam
+    assert conflicts(start + timedelta(minutes=30)) == 0
+    assert conflicts(start - timedelta(minutes=30)) == 0
+
+
+def test_cancelled_bookings_free_the_slot(db, shop, make_appointment):
+    from src.models import Appointment
+    from src.models.appointment import AppointmentStatus
+
+    start = datetime(2030, 1, 7, 10, 0)
+    make_appointment(start, status=AppointmentStatus.CANCELLED)
+    db.session.commit()
+
+    assert Appointment.overlapping(shop.staff.id, start, start + timedelta(minutes=30)).count() == 0
+
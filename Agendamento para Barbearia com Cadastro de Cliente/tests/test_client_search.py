@@ -0,0 +1,55 @@
+import pytest
+
+client_search = pytest.importorskip('src.utils.client_search')
+
+
+@pytest.fixture
+def clients(db, shop):
+    from src.models import Client
+
+    rows = [
+        Client(tenant_id=shop.tenant.id, name='Carlos Lima', email='carlos@example.com', phone='(98) 98888-1111'),
+        Client(tenant_id=shop.tenant.id, name='Ana Souza', email='ana.carlos@example.com', phone='98 97777-2222'),
+        Client(tenant_id=shop.tenant.id, name='Cliente 1234', email='c1234@example.com', phone='98 96666-3333')
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return {client.name: client for client in rows}
+
+
+def search(shop, term, ranked=False):
+    from src.models import Client
+
+    query = Client.query.filter_by(tenant_id=shop.tenant.id)
+    return [client.name for client in client_search.apply_search(query, term, ranked=ranked).all()]
+
+
+def test_sqlite_database_gets_the_fts_index(db, shop):
+    assert client_search._has_fts()
+
+
+def test_phone_is_matched_by_digits_whatever_the_formatting(shop, clients):
+    assert search(shop, '99999-1234') == ['Maria Silva']
+    assert search(shop, '(98) 99999 1234') == ['Maria Silva']
+    assert search(shop, '97777.2222') == ['Ana Souza']
+
+
+def test_phone_like_terms_only_look_at_phone_digits(shop, clients):
+    # "1234" aparece no nome e no email de outro cliente, mas é tratado como telefone
+    assert search(shop, '1234') == ['Maria Silva']
+
+
+def test_phone_digits_follow_phone_updates(db, shop, clients):
+    clients['Carlos Lima'].phone = '(98) 91234-0000'
+    db.session.commit()
+
+    assert search(shop, '91234-0000') == ['Carlos Lima']
+    assert search(shop, '98888-1111') == []
+
+
+def test_ranked_search_puts_matches_in_more_fields_first(shop, clients):
+    assert search(shop, 'carlos', ranked=True) == ['Carlos Lima', 'Ana Souza']
+
+
+def test_short_terms_fall_back_to_ilike(shop, clients):
+    assert sorted(search(shop, 'Li')) == ['Carlos Lima', 'Cliente 1234']
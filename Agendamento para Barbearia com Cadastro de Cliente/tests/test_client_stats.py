@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+client_stats = pytest.importorskip('src.utils.client_stats')
+
+
+def stats(db, client):
+    db.session.expire(client)
+    return client.total_appointments, client.total_spent, client.last_visit
+
+
+def book(db, make_appointment, appointment_date, **fields):
+    appointment = make_appointment(appointment_date, **fields)
+    client_stats.apply_transition(None, client_stats.stats_state(appointment))
+    db.session.commit()
+    return appointment
+
+
+def change(db, appointment, **fields):
+    before = client_stats.stats_state(appointment)
+    for name, value in fields.items():
+        setattr(appointment, name, value)
+    client_stats.apply_transition(before, client_stats.stats_state(appointment))
+    db.session.commit()
+
+
+def test_transitions_apply_deltas(db, shop, make_appointment):
+    from src.models.appointment import AppointmentStatus
+
+    first = book(db, make_appointment, datetime(2030, 1, 7, 10, 0))
+    book(db, make_appointment, datetime(2030, 1, 14, 10, 0), final_price=35.0)
+    assert stats(db, shop.client) == (2, 75.0, datetime(2030, 1, 14, 10, 0))
+
+    change(db, first, final_price=50.0)
+    assert stats(db, shop.client)[:2] == (2, 85.0)
+
+    change(db, first, status=AppointmentStatus.CANCELLED)
+    assert stats(db, shop.client)[:2] == (1, 35.0)
+
+    # Reativar volta a contar
+    change(db, first, status=AppointmentStatus.CONFIRMED)
+    assert stats(db, shop.client)[:2] == (2, 85.0)
+
+
+def test_moving_an_appointment_updates_both_clients(db, shop, make_appointment):
+    from src.models import Client
+
+    other = Client(tenant_id=shop.tenant.id, name='Pedro', phone='98988887777')
+    db.session.add(other)
+    db.session.commit()
+
+    appointment = book(db, make_appointment, datetime(2030, 1, 7, 10, 0))
+    change(db, appointment, client_id=other.id)
+
+    assert stats(db, shop.client)[:2] == (0, 0.0)
+    assert stats(db, other) == (1, 40.0, datetime(2030, 1, 7, 10, 0))
+
+
+def test_deltas_do_not_overwrite_concurrent_updates(db, shop, make_appointment):
+    # O cliente já está carregado na sessão com os totais antigos
+    assert stats(db, shop.client)[:2] == (0, 0.0)
+
+    # Outra transação soma um agendamento no meio do caminho
+    db.session.execute(
+        text('UPDATE clients SET total_appointments = total_appointments + 1, total_spent = total_spent + 30 WHERE id = :id'),
+        {'id': shop.client.id}
+    )
+    book(db, make_appointment, datetime(2030, 1, 7, 10, 0))
+
+    assert stats(db, shop.client)[:2] == (2, 70.0)
+
+
+def test_batch_creation_issues_one_update_per_client(db, shop, make_appointment):
+    appointments = [make_appointment(datetime(2030, 1, 7, 10, 0) + timedelta(days=7 * week)) for week in range(4)]
+
+    updates = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE clients'):
+            updates.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        client_stats.apply_created([client_stats.stats_state(appointment) for appointment in appointments])
+        db.session.commit()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert len(updates) == 1
+    assert stats(db, shop.client) == (4, 160.0, datetime(2030, 1, 28, 10, 0))
+
+
+def test_reconcile_matches_incremental_totals(db, shop, make_appointment):
+    from src.models.appointment import AppointmentStatus
+
+    book(db, make_appointment, datetime(2030, 1, 7, 10, 0))
+    book(db, make_appointment, datetime(2030, 1, 8, 10, 0), final_price=25.0)
+    make_appointment(datetime(2030, 1, 9, 10, 0), status=AppointmentStatus.NO_SHOW)
+    db.session.commit()
+    incremental = stats(db, shop.client)
+
+    client_stats.reconcile_client_stats(shop.tenant.id)
+
+    assert stats(db, shop.client) == incremental == (2, 65.0, datetime(2030, 1, 8, 10, 0))
@@ -0,0 +1,83 @@
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+image_derivatives = pytest.importorskip('src.utils.image_derivatives')
+
+GALLERY_SIZES = [(800, 600), (400, 300), (200, 150)]
+
+
+def save_image(path, size, mode='RGB', fmt='JPEG'):
+    Image.new(mode, size, (200, 30, 30) if mode == 'RGB' else (200, 30, 30, 128)).save(path, fmt)
+    return str(path)
+
+
+@pytest.mark.parametrize('size, box, expected', [
+    ((4000, 3000), (800, 600), (800, 600)),
+    ((3000, 4000), (800, 600), (450, 600)),
+    ((300, 200), (800, 600), (300, 200)),
+    ((5000, 10), (200, 150), (200, 1)),
+])
+def test_fit_size_keeps_proportions_without_upscaling(size, box, expected):
+    assert image_derivatives.fit_size(size, box) == expected
+
+
+def test_every_size_is_generated_in_request_order(tmp_path):
+    source = save_image(tmp_path / 'gallery_abc.jpg', (3000, 2000))
+
+    results = image_derivatives.generate_derivatives(source, [(200, 150), (800, 600), (400, 300)])
+
+    assert [path.rsplit('_', 1)[-1] for path, _ in results] == ['200x150.jpg', '800x600.jpg', '400x300.jpg']
+    for (path, webp_path), box in zip(results, [(200, 150), (800, 600), (400, 300)]):
+        with Image.open(path) as resized:
+            assert resized.size == box
+        with Image.open(webp_path) as webp:
+            assert webp.format == 'WEBP'
+            assert webp.size == box
+
+
+def test_png_with_alpha_is_flattened_to_rgb(tmp_path):
+    source = save_image(tmp_path / 'logo_abc.png', (600, 600), mode='RGBA', fmt='PNG')
+
+    (path, webp_path), = image_derivatives.generate_derivatives(source, [(100, 100)], webp=False)
+
+    assert webp_path is None
+    with Image.open(path) as resized:
+        assert resized.mode == 'RGB'
+        assert resized.size == (100, 100)
+
+
+def test_jpeg_is_decoded_reduced_in_draft_mode(tmp_path, monkeypatch):
+    source = save_image(tmp_path / 'gallery_big.jpg', (4000, 3000))
+    decoded = []
+    original_load = Image.Image.load
+
+    def record_load(self):
+        decoded.append(self.size)
+        return original_load(self)
+
+    monkeypatch.setattr(Image.Image, 'load', record_load)
+    image_derivatives.generate_derivatives(source, GALLERY_SIZES, webp=False)
+
+    # O maior raster decodificado fica bem abaixo do original (4000x3000)
+    largest = max(width * height for width, height in decoded)
+    assert largest <= 2000 * 1500
+
+
+def test_images_above_the_pixel_limit_are_rejected(tmp_path):
+    source = save_image(tmp_path / 'gallery_huge.png', (1000, 1000), fmt='PNG')
+
+    with pytest.raises(ValueError):
+        image_derivatives.generate_derivatives(source, GALLERY_SIZES, max_pixels=500 * 500)
+
+
+def test_webp_original_is_not_written_twice(tmp_path):
+    source = save_image(tmp_path / 'gallery_abc.webp', (1200, 900), fmt='WEBP')
+
+    results = image_derivatives.generate_derivatives(source, GALLERY_SIZES)
+
+    assert [webp_path for _, webp_path in results] == [None, None, None]
+    for (path, _), box in zip(results, GALLERY_SIZES):
+        assert path.endswith(f'_{box[0]}x{box[1]}.webp')
+        with Image.open(path) as resized:
+            assert resized.format == 'WEBP'
+            assert resized.size == box
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import text
+
+pytest.importorskip('src.models')
+
+HOT_INDEXES = {
+    'ix_appointments_tenant_date': 'appointments',
+    'ix_appointments_staff_date_status': 'appointments',
+    'ix_clients_tenant_phone': 'clients',
+    'ix_clients_tenant_email': 'clients',
+    'ix_clients_tenant_active_name': 'clients',
+    'ix_staff_tenant_active_name': 'staff',
+    'ix_services_tenant_active_name': 'services',
+}
+
+
+def query_plan(db, sql, **params):
+    rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql), params).all()
+    return ' | '.join(row[-1] for row in rows)
+
+
+def test_create_all_builds_the_hot_query_indexes(db):
+    rows = db.session.execute(text("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'")).all()
+    existing = {name: table for name, table in rows}
+
+    for name, table in HOT_INDEXES.items():
+        assert existing.get(name) == table, name
+
+
+@pytest.mark.parametrize('sql, index', [
+    (
+        'SELECT id FROM appointments WHERE tenant_id = :tenant AND appointment_date >= :start '
+        'AND appointment_date < :end ORDER BY appointment_date',
+        'ix_appointments_tenant_date'
+    ),
+    (
+        'SELECT appointment_date, duration_minutes FROM appointments WHERE staff_id = :staff '
+        "AND appointment_date >= :start AND appointment_date < :end AND status IN ('SCHEDULED', 'CONFIRMED')",
+        'ix_appointments_staff_date_status'
+    ),
+    (
+        'SELECT id FROM clients WHERE tenant_id = :tenant AND phone = :phone',
+        'ix_clients_tenant_phone'
+    ),
+    (
+        'SELECT id FROM clients WHERE tenant_id = :tenant AND is_active = 1 ORDER BY name LIMIT 20',
+        'ix_clients_tenant_active_name'
+    ),
+])
+def test_hot_queries_use_their_index(db, sql, index):
+    params = {'tenant': 1, 'staff': 1, 'start': '2030-01-07', 'end': '2030-01-08', 'phone': '98999991234'}
+    plan = query_plan(db, sql, **params)
+
+    assert index in plan
+    assert 'USE TEMP B-TREE' not in plan
@@ -0,0 +1,148 @@
+import datetime
+import sqlite3
+
+
+def next_weekday(days=7):
+    """Data futura que não cai no domingo (o site não atende aos domingos)"""
+    day = datetime.date.today() + datetime.timedelta(days=days)
+    if day.weekday() == 6:
+        day += datetime.timedelta(days=1)
+    return day.isoformat()
+
+
+def booking(**fields):
+    data = {
+        'nome': 'Maria Silva',
+        'email': 'maria@example.com',
+        'telefone': '(98) 99999-1234',
+        'data': next_weekday(),
+        'horario': '10:00'
+    }
+    data.update(fields)
+    return data
+
+
+def notifications(legacy):
+    conn = legacy.get_db_connection()
+    return conn.execute('SELECT * FROM notificacoes ORDER BY id').fetchall()
+
+
+def use_smtp(legacy, monkeypatch, port):
+    monkeypatch.setattr(legacy, 'SMTP_SERVER', '127.0.0.1')
+    monkeypatch.setattr(legacy, 'SMTP_PORT', port)
+    monkeypatch.setattr(legacy, 'SMTP_USE_TLS', False)
+    monkeypatch.setattr(legacy, 'SMTP_USERNAME', None)
+    monkeypatch.setattr(legacy, 'SMTP_SENDER', 'agenda@barbearia.test')
+
+
+def test_booking_queues_the_confirmation_in_the_outbox(legacy):
+    response = legacy.app.test_client().post('/api/agendamento', json=booking())
+
+    assert response.status_code == 201
+    rows = notifications(legacy)
+    assert [(row['chave'], row['destinatario'], row['status']) for row in rows] == [
+        (f"agendamento:{response.get_json()['appointment_id']}:confirmacao", 'maria@example.com', 'pendente')
+    ]
+
+
+def test_process_notifications_sends_through_smtp(legacy, monkeypatch, smtp_server):
+    use_smtp(legacy, monkeypatch, smtp_server.port)
+    legacy.app.test_client().post('/api/agendamento', json=booking())
+
+    assert legacy.process_notifications() == 1
+    assert notifications(legacy)[0]['status'] == 'enviado'
+    assert smtp_server.messages[0]['To'] == 'maria@example.com'
+    assert legacy.process_notifications() == 0
+
+
+def test_process_notifications_retries_later_when_smtp_is_down(legacy, monkeypatch, closed_port):
+    use_smtp(legacy, monkeypatch, closed_port)
+    legacy.app.test_client().post('/api/agendamento', json=booking())
+
+    assert legacy.process_notifications() == 1
+    row = notifications(legacy)[0]
+    assert row['status'] == 'pendente'
+    assert row['tentativas'] == 1
+    assert row['ultimo_erro'].startswith('Falha na conexão SMTP')
+    assert row['proxima_tentativa'] > legacy.utc_timestamp()
+
+
+def test_second_booking_of_the_same_slot_is_rejected(legacy):
+    client = legacy.app.test_client()
+
+    assert client.post('/api/agendamento', json=booking()).status_code == 201
+    response = client.post('/api/agendamento', json=booking(email='joao@example.com'))
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Horário já ocupado'
+    # A recusa desfaz a transação inteira: nem cliente novo nem notificação
+    conn = legacy.get_db_connection()
+    assert conn.execute('SELECT COUNT(*) FROM clientes').fetchone()[0] == 1
+    assert len(notifications(legacy)) == 1
+
+
+def test_cancelled_slot_can_be_booked_again(legacy):
+    client = legacy.app.test_client()
+    first = client.post('/api/agendamento', json=booking()).get_json()['appointment_id']
+    legacy.booking_writer.submit(
+        lambda conn: conn.execute("UPDATE agendamentos SET status = 'cancelado' WHERE id = ?", (first,))
+    )
+
+    response = client.post('/api/agendamento', json=booking(email='joao@example.com'))
+
+    assert response.status_code == 201
+    data = booking()['data']
+    assert [row['horario'] for row in legacy.get_db_connection().execute(
+        "SELECT horario FROM agendamentos WHERE data_agendamento = ? AND status = 'agendado'", (data,)
+    )] == ['10:00']
+
+
+def test_upsert_client_updates_by_email(legacy):
+    conn = legacy.get_db_connection()
+    cursor = conn.cursor()
+
+    first = legacy.upsert_client(cursor, 'Maria', 'maria@example.com', '98999991234')
+    second = legacy.upsert_client(cursor, 'Maria Silva', 'maria@example.com', '98988887777')
+
+    assert first == second
+    assert [tuple(row) for row in conn.execute('SELECT nome, telefone FROM clientes')] == [
+        ('Maria Silva', '98988887777')
+    ]
+    conn.rollback()
+
+
+def test_init_db_creates_the_slot_indexes(legacy):
+    conn = legacy.get_db_connection()
+    indexes = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+    assert {'idx_agendamentos_data_horario_status', 'uq_agendamentos_horario_agendado'} <= indexes
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == len(legacy.SCHEMA_MIGRATIONS)
+
+    plan = ' | '.join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT horario FROM agendamentos WHERE data_agendamento = ? AND status = 'agendado'",
+        ('2030-01-07',)
+    ))
+    assert 'agendamentos_horario_agendado' in plan or 'idx_agendamentos_data_horario_status' in plan
+
+
+def test_migration_cancels_existing_double_bookings(legacy):
+    # Banco antigo: sem os índices, com o mesmo horário reservado duas vezes
+    conn = sqlite3.connect(legacy.DATABASE)
+    conn.execute('DROP INDEX uq_agendamentos_horario_agendado')
+    conn.execute('DROP INDEX idx_agendamentos_data_horario_status')
+    conn.executemany(
+        'INSERT INTO agendamentos (cliente_id, data_agendamento, horario, status) VALUES (1, ?, ?, ?)',
+        [('2030-01-07', '10:00', 'agendado'), ('2030-01-07', '10:00', 'agendado'),
+         ('2030-01-07', '10:30', 'agendado'), ('2030-01-07', '11:00', 'cancelado')]
+    )
+    conn.execute('PRAGMA user_version = 0')
+    conn.commit()
+    conn.close()
+
+    legacy.init_db()
+
+    conn = sqlite3.connect(legacy.DATABASE)
+    rows = conn.execute('SELECT id, horario, status FROM agendamentos ORDER BY id').fetchall()
+    conn.close()
+    assert rows == [(1, '10:00', 'agendado'), (2, '10:00', 'cancelado'),
+                    (3, '10:30', 'agendado'), (4, '11:00', 'cancelado')]
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+outbox = pytest.importorskip('src.utils.outbox')
+
+
+def mail_config(port):
+    return {
+        'MAIL_SERVER': '127.0.0.1',
+        'MAIL_PORT': port,
+        'MAIL_TIMEOUT': 5,
+        'MAIL_DEFAULT_SENDER': 'agenda@barbearia.test',
+        'NOTIFICATION_MAX_ATTEMPTS': 3
+    }
+
+
+def message(message_id, recipient):
+    return SimpleNamespace(id=message_id, recipient=recipient, subject=f'Assunto {message_id}', body='Olá')
+
+
+def test_deliver_batch_sends_every_message_over_one_connection(smtp_server):
+    errors = outbox.deliver_batch(
+        [message(1, 'ana@example.com'), message(2, 'bia@example.com')], mail_config(smtp_server.port)
+    )
+
+    assert errors == {}
+    assert [(m['To'], m['Subject']) for m in smtp_server.messages] == [
+        ('ana@example.com', 'Assunto 1'),
+        ('bia@example.com', 'Assunto 2')
+    ]
+
+
+def test_deliver_batch_marks_refused_recipient_as_permanent(smtp_server):
+    smtp_server.refused.add('inexistente@example.com')
+
+    errors = outbox.deliver_batch(
+        [message(1, 'inexistente@example.com'), message(2, 'ana@example.com')], mail_config(smtp_server.port)
+    )
+
+    assert list(errors) == [1]
+    assert errors[1][1] is True
+    assert [m['To'] for m in smtp_server.messages] == ['ana@example.com']
+
+
+def test_deliver_batch_keeps_messages_queued_when_server_is_down(closed_port):
+    errors = outbox.deliver_batch([message(1, 'ana@example.com'), message(2, 'bia@example.com')], mail_config(closed_port))
+
+    assert set(errors) == {1, 2}
+    assert not any(permanent for _, permanent in errors.values())
+
+
+def test_cancellation_is_queued_once_per_appointment_date(db, make_appointment):
+    from src.models.notification import NotificationOutbox
+
+    appointment = make_appointment(datetime(2030, 1, 7, 10, 0))
+    outbox.enqueue_cancellation(appointment)
+    outbox.enqueue_cancellation(appointment)
+    db.session.commit()
+    assert NotificationOutbox.query.filter_by(kind='cancellation').count() == 1
+
+    # Reativado, remarcado e cancelado de novo: novo aviso
+    appointment.appointment_date += timedelta(days=7)
+    outbox.enqueue_cancellation(appointment)
+    db.session.commit()
+    assert NotificationOutbox.query.filter_by(kind='cancellation').count() == 2
+
+
+def test_drain_outbox_marks_delivered_messages_as_sent(db, make_appointment, smtp_server):
+    from src.models.notification import NotificationOutbox, SENT
+
+    outbox.enqueue_cancellation(make_appointment(datetime(2030, 1, 7, 10, 0)))
+    db.session.commit()
+
+    assert outbox.drain_outbox(mail_config(smtp_server.port), batch_size=10) == 1
+    sent = NotificationOutbox.query.one()
+    assert sent.status == SENT
+    assert sent.attempts == 1
+    assert smtp_server.messages[0]['To'] == 'maria@example.com'
+
+
+def test_drain_outbox_schedules_a_retry_when_server_is_down(db, make_appointment, closed_port):
+    from src.models.notification import NotificationOutbox, PENDING
+
+    outbox.enqueue_cancellation(make_appointment(datetime(2030, 1, 7, 10, 0)))
+    db.session.commit()
+
+    outbox.drain_outbox(mail_config(closed_port), batch_size=10)
+    pending = NotificationOutbox.query.one()
+    assert pending.status == PENDING
+    assert pending.attempts == 1
+    assert pending.next_attempt_at > datetime.utcnow()
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pagination = pytest.importorskip('src.utils.pagination')
+
+
+def test_cursor_round_trip_restores_column_types(app):
+    from src.models import Appointment
+
+    columns = [Appointment.appointment_date, Appointment.id]
+    token = pagination.encode_cursor([datetime(2030, 1, 7, 10, 30), 42])
+
+    assert pagination.decode_cursor(token, columns) == [datetime(2030, 1, 7, 10, 30), 42]
+
+
+@pytest.mark.parametrize('token', ['não-é-base64', pagination.encode_cursor([1]), pagination.encode_cursor({'id': 1})])
+def test_invalid_cursors_are_rejected(app, token):
+    from src.models import Appointment
+
+    with pytest.raises(ValueError):
+        pagination.decode_cursor(token, [Appointment.appointment_date, Appointment.id])
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_pages_cover_every_row_once_with_tied_sort_keys(db, make_appointment, descending):
+    from src.models import Appointment
+
+    # Dois agendamentos por horário: o id desempata a chave
+    start = datetime(2030, 1, 7, 8, 0)
+    created = [make_appointment(start + timedelta(hours=index // 2)).id for index in range(7)]
+    db.session.commit()
+
+    columns = [Appointment.appointment_date, Appointment.id]
+    seen, cursor, pages = [], None, 0
+    while True:
+        items, cursor, total = pagination.paginate_keyset(
+            Appointment.query, columns, cursor=cursor, per_page=3, descending=descending
+        )
+        seen.extend(item.id for item in items)
+        pages += 1
+        assert total == 7
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == (sorted(created, reverse=True) if descending else sorted(created))
@@ -0,0 +1,138 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+query_options = pytest.importorskip('src.utils.query_options')
+
+
+@contextmanager
+def count_queries(db):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def appointments(db, shop, make_appointment):
+    from src.models import Client, Staff
+
+    # Clientes e funcionários distintos: um carregamento preguiçoso por linha apareceria na contagem
+    for index in range(6):
+        client = Client(tenant_id=shop.tenant.id, name=f'Cliente {index}', phone=f'9899999000{index}')
+        staff = Staff(tenant_id=shop.tenant.id, name=f'Barbeiro {index}')
+        db.session.add_all([client, staff])
+        db.session.flush()
+        make_appointment(datetime(2030, 1, 7, 8, 0) + timedelta(hours=index), client_id=client.id, staff_id=staff.id)
+    db.session.commit()
+    db.session.expunge_all()
+
+
+@pytest.fixture
+def api(app, db, appointments):
+    """Cliente HTTP com os blueprints de agendamentos e clientes e o tenant de `shop` já carregado"""
+    from flask import g
+    from flask_jwt_extended import JWTManager, create_access_token
+    from src.models import Tenant
+    from src.routes.appointments import appointments_bp
+    from src.routes.clients import clients_bp
+
+    app.config['JWT_SECRET_KEY'] = 'segredo-de-teste-com-32-bytes-ou-mais'
+    JWTManager(app)
+    app.register_blueprint(appointments_bp, url_prefix='/api/appointments')
+    app.register_blueprint(clients_bp, url_prefix='/api/clients')
+
+    # Carregado antes da contagem (o de `shop` foi desanexado): só as consultas da rota entram no total
+    tenant = Tenant.query.one()
+
+    @app.before_request
+    def set_tenant():
+        g.current_tenant = tenant
+
+    token = create_access_token(identity='1')
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
+
+
+def request_queries(db, api, url):
+    """Resposta JSON e quantidade de consultas SQL de um GET completo (consulta e serialização)"""
+    with count_queries(db) as statements:
+        response = api.get(url)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json(), len(statements)
+
+
+def appointment_ids(db):
+    from sqlalchemy import select
+    from src.models import Appointment
+
+    return db.session.scalars(select(Appointment.id).order_by(Appointment.appointment_date)).all()
+
+
+def test_list_profile_loads_relations_with_one_query_each(db, api):
+    data, queries = request_queries(db, api, '/api/appointments/')
+
+    assert len(data['appointments']) == 6
+    assert {item['client']['name'] for item in data['appointments']} == {f'Cliente {index}' for index in range(6)}
+    # Contagem da paginação, página e um SELECT ... IN por relacionamento
+    assert queries == 5
+
+
+def test_shallow_view_skips_relations(db, api):
+    data, queries = request_queries(db, api, '/api/appointments/?view=shallow')
+
+    assert 'client' not in data['appointments'][0]
+    assert queries == 2
+
+
+def test_cursor_page_keeps_the_list_profile(db, api):
+    data, queries = request_queries(db, api, '/api/appointments/?cursor=&include_total=false')
+
+    assert len(data['appointments']) == 6
+    assert queries == 4
+
+
+def test_detail_profile_joins_everything_in_one_query(db, api):
+    first = appointment_ids(db)[0]
+
+    data, queries = request_queries(db, api, f'/api/appointments/{first}')
+
+    assert data['appointment']['staff_member']['name'] == 'Barbeiro 0'
+    assert queries == 1
+
+
+def test_calendar_profile_joins_the_names_in_one_query(db, api):
+    data, queries = request_queries(db, api, '/api/appointments/calendar?date_from=2030-01-07&date_to=2030-01-07')
+
+    assert [event['staff_name'] for event in data['events']] == [f'Barbeiro {index}' for index in range(6)]
+    assert queries == 1
+
+
+def test_history_profile_joins_the_names_in_one_query(db, api):
+    from sqlalchemy import select
+    from src.models import Client
+
+    client_id = db.session.scalar(select(Client.id).filter_by(name='Cliente 3'))
+
+    data, queries = request_queries(db, api, f'/api/clients/{client_id}')
+
+    # Cliente e histórico com os nomes relacionados
+    assert [item['staff_name'] for item in data['client']['appointments_history']] == ['Barbeiro 3']
+    assert queries == 2
+
+
+def test_get_view_rejects_unknown_modes():
+    assert query_options.get_view({'view': 'Shallow'}) == query_options.VIEW_SHALLOW
+    assert query_options.get_view({}) == query_options.VIEW_EXPANDED
+    with pytest.raises(ValueError):
+        query_options.get_view({'view': 'full'})
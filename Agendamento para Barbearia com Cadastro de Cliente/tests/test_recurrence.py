@@ -0,0 +1,139 @@
+from datetime import date, datetime
+
+import pytest
+
+recurrence = pytest.importorskip('src.utils.recurrence')
+availability = pytest.importorskip('src.utils.availability')
+
+
+def test_weekly_series_by_count():
+    occurrences = recurrence.expand_occurrences(datetime(2030, 1, 7, 10, 0), 'weekly', count=3)
+
+    assert occurrences == [datetime(2030, 1, 7, 10, 0), datetime(2030, 1, 14, 10, 0), datetime(2030, 1, 21, 10, 0)]
+
+
+def test_biweekly_series_until_is_inclusive():
+    occurrences = recurrence.expand_occurrences(datetime(2030, 1, 7, 10, 0), 'biweekly', until=date(2030, 2, 4))
+
+    assert [value.day for value in occurrences] == [7, 21, 4]
+
+
+def test_monthly_series_skips_months_without_the_day():
+    occurrences = recurrence.expand_occurrences(datetime(2030, 1, 31, 10, 0), 'monthly', count=4)
+
+    assert [value.month for value in occurrences] == [1, 3, 5, 7]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'frequency': 'daily', 'count': 2},
+    {'frequency': 'weekly'},
+    {'frequency': 'weekly', 'count': 0},
+    {'frequency': 'weekly', 'count': 2, 'interval': 0},
+    {'frequency': 'weekly', 'until': date(2040, 1, 1)},
+])
+def test_invalid_rules_are_rejected(kwargs):
+    frequency = kwargs.pop('frequency')
+    with pytest.raises(ValueError):
+        recurrence.expand_occurrences(datetime(2030, 1, 7, 10, 0), frequency, **kwargs)
+
+
+def test_overlapping_indices_flags_each_conflicting_occurrence():
+    intervals = [(0, 30), (60, 90), (120, 150), (180, 210)]
+    busy = [(20, 40), (150, 160), (200, 260)]
+
+    assert availability.overlapping_indices(intervals, busy) == [0, 3]
+
+
+@pytest.fixture
+def api(app, db, shop):
+    """Cliente HTTP com o blueprint de agendamentos, um token válido e o tenant de `shop`"""
+    from flask import g
+    from flask_jwt_extended import JWTManager, create_access_token
+    from src.models import Tenant
+    from src.routes.appointments import appointments_bp
+
+    app.config['JWT_SECRET_KEY'] = 'segredo-de-teste-com-32-bytes-ou-mais'
+    JWTManager(app)
+    app.register_blueprint(appointments_bp, url_prefix='/api/appointments')
+
+    @app.before_request
+    def set_tenant():
+        g.current_tenant = db.session.get(Tenant, shop.tenant.id)
+
+    token = create_access_token(identity='1')
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
+
+
+def series_payload(shop, **recurrence_rule):
+    return {
+        'client_id': shop.client.id,
+        'service_id': shop.service.id,
+        'staff_id': shop.staff.id,
+        'appointment_date': '2030-01-07T10:00:00',
+        'recurrence': recurrence_rule or {'frequency': 'weekly', 'count': 4}
+    }
+
+
+def test_series_skips_conflicting_occurrences(db, shop, make_appointment, api):
+    from src.models import Appointment
+    from src.models.notification import NotificationOutbox
+
+    # Ocupado na segunda semana, sobrepondo 10:00-10:30
+    make_appointment(datetime(2030, 1, 14, 9, 45))
+    db.session.commit()
+
+    response = api.post('/api/appointments/recurring', json=series_payload(shop))
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['total_occurrences'] == 4
+    assert [conflict['appointment_date'] for conflict in body['conflicts']] == ['2030-01-14T10:00:00']
+    assert [item['appointment_date'] for item in body['appointments']] == [
+        '2030-01-07T10:00:00', '2030-01-21T10:00:00', '2030-01-28T10:00:00'
+    ]
+    assert Appointment.query.count() == 4
+    # Uma confirmação para a série inteira
+    assert NotificationOutbox.query.filter_by(kind='confirmation').count() == 1
+
+
+def test_series_with_only_conflicts_is_rejected(db, shop, make_appointment, api):
+    from src.models import Appointment
+
+    make_appointment(datetime(2030, 1, 7, 10, 15))
+    db.session.commit()
+
+    response = api.post('/api/appointments/recurring', json=series_payload(shop, frequency='weekly', count=1))
+
+    assert response.status_code == 400
+    assert len(response.get_json()['conflicts']) == 1
+    assert Appointment.query.count() == 1
+
+
+def test_series_updates_client_statistics_once(db, shop, api):
+    response = api.post('/api/appointments/recurring', json=series_payload(shop, frequency='biweekly', count=3))
+
+    assert response.status_code == 201
+    db.session.expire(shop.client)
+    assert shop.client.total_appointments == 3
+    assert shop.client.total_spent == 120.0
+    assert shop.client.last_visit == datetime(2030, 2, 4, 10, 0)
+
+
+@pytest.mark.parametrize('recurrence_rule', [
+    {'frequency': 'weekly', 'until': '2030-01-01'},
+    'weekly',
+    ['weekly', 4],
+    {'frequency': 'weekly', 'until': 20300201},
+])
+def test_malformed_or_empty_series_is_rejected(db, shop, api, recurrence_rule):
+    from src.models import Appointment
+
+    payload = series_payload(shop)
+    payload['recurrence'] = recurrence_rule
+    response = api.post('/api/appointments/recurring', json=payload)
+
+    assert response.status_code == 400
+    assert 'Recorrência' in response.get_json()['error']
+    assert Appointment.query.count() == 0
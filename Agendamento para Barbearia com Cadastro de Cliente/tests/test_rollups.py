@@ -0,0 +1,106 @@
+from datetime import date, datetime
+
+import pytest
+
+rollups = pytest.importorskip('src.utils.rollups')
+
+
+def tenant_day(shop, day):
+    from src.models.daily_stats import DailyTenantStats
+
+    rows = DailyTenantStats.query.filter_by(tenant_id=shop.tenant.id, date=day).all()
+    assert len(rows) <= 1
+    return rows[0].to_dict() if rows else None
+
+
+def counters(appointments=0, completed=0, cancelled=0, revenue=0.0, completed_revenue=0.0, day=date(2030, 1, 7)):
+    return {
+        'date': day.isoformat(),
+        'appointments_count': appointments,
+        'completed_count': completed,
+        'cancelled_count': cancelled,
+        'revenue': revenue,
+        'completed_revenue': completed_revenue
+    }
+
+
+def book(db, make_appointment, appointment_date, **fields):
+    appointment = make_appointment(appointment_date, **fields)
+    rollups.apply_rollup_transition(None, rollups.rollup_state(appointment))
+    db.session.commit()
+    return appointment
+
+
+def change(db, appointment, **fields):
+    before = rollups.rollup_state(appointment)
+    for name, value in fields.items():
+        setattr(appointment, name, value)
+    rollups.apply_rollup_transition(before, rollups.rollup_state(appointment))
+    db.session.commit()
+
+
+def test_upsert_accumulates_into_one_row_per_day(db, shop, make_appointment):
+    book(db, make_appointment, datetime(2030, 1, 7, 9, 0))
+    book(db, make_appointment, datetime(2030, 1, 7, 11, 0), final_price=25.0)
+    book(db, make_appointment, datetime(2030, 1, 8, 9, 0))
+
+    assert tenant_day(shop, date(2030, 1, 7)) == counters(appointments=2, revenue=65.0)
+    assert tenant_day(shop, date(2030, 1, 8)) == counters(appointments=1, revenue=40.0, day=date(2030, 1, 8))
+
+
+def test_status_changes_move_counters(db, shop, make_appointment):
+    from src.models.appointment import AppointmentStatus
+
+    appointment = book(db, make_appointment, datetime(2030, 1, 7, 9, 0))
+
+    change(db, appointment, status=AppointmentStatus.COMPLETED)
+    assert tenant_day(shop, date(2030, 1, 7)) == counters(appointments=1, completed=1, revenue=40.0, completed_revenue=40.0)
+
+    change(db, appointment, status=AppointmentStatus.CANCELLED)
+    assert tenant_day(shop, date(2030, 1, 7)) == counters(cancelled=1)
+
+
+def test_rescheduling_moves_the_appointment_between_days(db, shop, make_appointment):
+    appointment = book(db, make_appointment, datetime(2030, 1, 7, 9, 0))
+
+    change(db, appointment, appointment_date=datetime(2030, 1, 9, 9, 0))
+
+    assert tenant_day(shop, date(2030, 1, 7)) == counters()
+    assert tenant_day(shop, date(2030, 1, 9)) == counters(appointments=1, revenue=40.0, day=date(2030, 1, 9))
+
+
+def test_unchanged_transition_writes_nothing(db, shop, make_appointment):
+    appointment = make_appointment(datetime(2030, 1, 7, 9, 0))
+    state = rollups.rollup_state(appointment)
+
+    rollups.apply_rollup_changes([(state, state)])
+    db.session.commit()
+
+    assert tenant_day(shop, date(2030, 1, 7)) is None
+
+
+def test_backfill_matches_incremental_rollups(db, shop, make_appointment):
+    from src.models.appointment import AppointmentStatus
+
+    book(db, make_appointment, datetime(2030, 1, 7, 9, 0), status=AppointmentStatus.COMPLETED)
+    book(db, make_appointment, datetime(2030, 1, 7, 10, 0), status=AppointmentStatus.NO_SHOW)
+    book(db, make_appointment, datetime(2030, 1, 8, 9, 0), final_price=30.0)
+    start, end = date(2030, 1, 7), date(2030, 1, 8)
+    incremental = rollups.load_dashboard_stats(shop.tenant.id, start, end)
+
+    assert rollups.backfill_daily_stats(shop.tenant.id) == 2
+    assert rollups.load_dashboard_stats(shop.tenant.id, start, end) == incremental
+    assert incremental['totals'] == {
+        'appointments_count': 2,
+        'completed_count': 1,
+        'cancelled_count': 1,
+        'revenue': 70.0,
+        'completed_revenue': 40.0
+    }
+    assert incremental['staff'] == [dict(incremental['totals'], staff_id=shop.staff.id)]
+
+
+def test_period_range_includes_today():
+    assert rollups.period_range('week', today=date(2030, 1, 7)) == (date(2030, 1, 1), date(2030, 1, 7))
+    with pytest.raises(ValueError):
+        rollups.period_range('decade')
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+import pytest
+
+slot_index = pytest.importorskip('src.utils.slot_index')
+
+
+def blocks(mask):
+    return [index for index in range(mask.bit_length()) if mask >> index & 1]
+
+
+def staff_rows(shop):
+    from src.models.slot_bitmap import StaffDaySlots
+
+    return {slots.date: slots.busy_bits for slots in StaffDaySlots.query.filter_by(staff_id=shop.staff.id)}
+
+
+def test_spanned_days_include_the_day_after_midnight():
+    assert slot_index.spanned_days(datetime(2030, 1, 7, 10, 0), 30) == [date(2030, 1, 7)]
+    assert slot_index.spanned_days(datetime(2030, 1, 7, 23, 30), 30) == [date(2030, 1, 7)]
+    assert slot_index.spanned_days(datetime(2030, 1, 7, 23, 30), 60) == [date(2030, 1, 7), date(2030, 1, 8)]
+
+
+def test_refresh_marks_the_spill_over_day(db, shop, make_appointment):
+    appointment = make_appointment(datetime(2030, 1, 7, 23, 30), duration_minutes=60)
+    slot_index.refresh_appointment_days(appointment)
+    db.session.commit()
+
+    rows = staff_rows(shop)
+    assert blocks(rows[date(2030, 1, 7)]) == list(range(282, 288))
+    assert blocks(rows[date(2030, 1, 8)]) == list(range(0, 6))
+
+
+def test_refresh_updates_a_row_created_by_another_transaction(db, shop, make_appointment):
+    from src.models.slot_bitmap import StaffDaySlots, MASK_BYTES
+
+    # A primeira reserva concorrente já criou a linha do dia (ainda sem este agendamento)
+    db.session.add(StaffDaySlots(tenant_id=shop.tenant.id, staff_id=shop.staff.id, date=date(2030, 1, 7),
+                                 busy_mask=bytes(MASK_BYTES)))
+    db.session.commit()
+
+    appointment = make_appointment(datetime(2030, 1, 7, 10, 0))
+    slot_index.refresh_appointment_days(appointment)
+    db.session.commit()
+
+    assert StaffDaySlots.query.count() == 1
+    assert blocks(staff_rows(shop)[date(2030, 1, 7)]) == list(range(120, 126))
+
+
+def test_bitmap_keeps_every_booking_of_the_day(db, shop, make_appointment):
+    for hour in (9, 14):
+        appointment = make_appointment(datetime(2030, 1, 7, hour, 0))
+        slot_index.refresh_appointment_days(appointment)
+        db.session.commit()
+
+    assert blocks(staff_rows(shop)[date(2030, 1, 7)]) == list(range(108, 114)) + list(range(168, 174))
+
+
+def test_rescheduling_clears_the_previous_day(db, shop, make_appointment):
+    appointment = make_appointment(datetime(2030, 1, 7, 23, 45), duration_minutes=30)
+    slot_index.refresh_appointment_days(appointment)
+    db.session.commit()
+
+    previous = (appointment.staff_id, appointment.appointment_date, appointment.duration_minutes)
+    appointment.appointment_date = datetime(2030, 1, 9, 10, 0)
+    slot_index.refresh_appointment_days(appointment, previous)
+    db.session.commit()
+
+    rows = staff_rows(shop)
+    assert rows[date(2030, 1, 7)] == rows[date(2030, 1, 8)] == 0
+    assert blocks(rows[date(2030, 1, 9)]) == list(range(120, 126))
+
+
+def test_load_day_masks_computes_missing_days_without_writing(db, shop, make_appointment):
+    from src.models.slot_bitmap import StaffDaySlots
+
+    make_appointment(datetime(2030, 1, 7, 23, 30), duration_minutes=60)
+    db.session.commit()
+
+    masks = slot_index.load_day_masks(shop.tenant.id, date(2030, 1, 8), [shop.staff.id])
+
+    assert blocks(masks[shop.staff.id]) == list(range(0, 6))
+    assert StaffDaySlots.query.count() == 0
@@ -0,0 +1,134 @@
+import gzip
+import os
+
+import pytest
+
+static_assets = pytest.importorskip('src.utils.static_assets')
+
+HASHED_JS = 'assets/index-4f2a1b3c.js'
+SCRIPT = b'console.log("barbearia");\n' * 100
+
+
+@pytest.fixture
+def static_root(tmp_path):
+    """Build do Vite com variantes .gz/.br do bundle, uma imagem e uploads de tenants"""
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'uploads').mkdir()
+    (tmp_path / 'index.html').write_bytes(b'<!doctype html><div id="root"></div>')
+    (tmp_path / HASHED_JS).write_bytes(SCRIPT)
+    (tmp_path / 'logo.png').write_bytes(b'\x89PNG fake')
+    (tmp_path / 'uploads' / 'logo_1.png').write_bytes(b'\x89PNG upload')
+    static_assets.compress_assets(str(tmp_path))
+    # Variante brotli fictícia: o pacote brotli pode não estar instalado
+    (tmp_path / (HASHED_JS + '.br')).write_bytes(b'brotli')
+    return tmp_path
+
+
+@pytest.fixture
+def client(static_root):
+    from flask import Flask, abort
+
+    app = Flask(__name__)
+    index = static_assets.build_asset_index(str(static_root))
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        response = static_assets.serve_path(index, path)
+        if response is None:
+            abort(404)
+        return response
+
+    return app.test_client()
+
+
+def test_index_skips_variants_and_uploads(static_root):
+    index = static_assets.build_asset_index(str(static_root))
+
+    assert sorted(index) == ['assets/index-4f2a1b3c.js', 'index.html', 'logo.png']
+    assert sorted(index[HASHED_JS].variants) == ['br', 'gzip']
+
+
+def test_stale_variant_is_ignored(static_root):
+    original = static_root / HASHED_JS
+    stat = original.stat()
+    os.utime(original, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    index = static_assets.build_asset_index(str(static_root))
+
+    assert index[HASHED_JS].variants == {}
+
+
+def test_compress_assets_skips_small_and_binary_files(static_root):
+    assert os.path.exists(static_root / (HASHED_JS + '.gz'))
+    assert not os.path.exists(static_root / 'index.html.gz')
+    assert not os.path.exists(static_root / 'logo.png.gz')
+    assert gzip.decompress((static_root / (HASHED_JS + '.gz')).read_bytes()) == SCRIPT
+
+
+@pytest.mark.parametrize('accept, encoding, body', [
+    ('gzip, br', 'br', b'brotli'),
+    ('gzip', 'gzip', None),
+    ('', None, SCRIPT),
+])
+def test_best_accepted_encoding_is_served(client, accept, encoding, body):
+    response = client.get('/' + HASHED_JS, headers={'Accept-Encoding': accept})
+
+    assert response.status_code == 200
+    assert response.headers.get('Content-Encoding') == encoding
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.mimetype.endswith('javascript')
+    data = response.get_data()
+    assert data == body if body is not None else gzip.decompress(data) == SCRIPT
+
+
+def test_cache_headers_depend_on_the_content_hash(client):
+    assert client.get('/' + HASHED_JS).headers['Cache-Control'] == static_assets.IMMUTABLE_CACHE
+    assert client.get('/logo.png').headers['Cache-Control'] == static_assets.REVALIDATE_CACHE
+    assert client.get('/').headers['Cache-Control'] == static_assets.REVALIDATE_CACHE
+
+
+def test_matching_etag_returns_304_per_encoding(client):
+    first = client.get('/' + HASHED_JS, headers={'Accept-Encoding': 'gzip'})
+    etag = first.headers['ETag']
+
+    cached = client.get('/' + HASHED_JS, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+    assert cached.headers['Cache-Control'] == static_assets.IMMUTABLE_CACHE
+    assert cached.get_data() == b''
+
+    # O ETag da variante gzip não vale para a resposta sem compressão
+    identity = client.get('/' + HASHED_JS, headers={'Accept-Encoding': '', 'If-None-Match': etag})
+    assert identity.status_code == 200
+    assert identity.headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('path', ['/clientes/42', '/agendamentos', '/'])
+def test_spa_routes_get_the_index_html(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/html'
+    assert b'id="root"' in response.get_data()
+
+
+@pytest.mark.parametrize('path', ['/assets/index-deadbeef.js', '/assets/rota', '/api/nao-existe', '/favicon.ico'])
+def test_missing_files_and_api_paths_are_404(client, path):
+    assert client.get(path).status_code == 404
+
+
+def test_file_deleted_after_indexing_is_a_miss(client, static_root):
+    os.remove(static_root / 'logo.png')
+
+    assert client.get('/logo.png').status_code == 404
+
+
+def test_deleted_variant_falls_back_to_the_original(client, static_root):
+    os.remove(static_root / (HASHED_JS + '.br'))
+
+    response = client.get('/' + HASHED_JS, headers={'Accept-Encoding': 'br'})
+
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == SCRIPT
@@ -1,12 +1,21 @@
 import os
+import re
 import uuid
+import hashlib
+import json
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
+from sqlalchemy.exc import IntegrityError
 from PIL import Image
 import mimetypes
-from src.models import db, TenantConfig
+import click
+from src.models import db, Tenant, TenantConfig
+from src.models.media import MediaFile
 from src.middleware.tenant import get_current_tenant
+from src.middleware.tenant_cache import invalidate_tenant
+from src.utils.image_jobs import ImageJob, QueueFullError, reserve_slot, release_slot, submit_job, get_job
+from src.utils.pagination import paginate_keyset
 
 upload_bp = Blueprint('upload', __name__)
 
@@ -15,6 +24,8 @@ ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 UPLOAD_FOLDER = 'uploads'
 LOGO_SIZES = [(200, 200), (100, 100), (50, 50)]  # Diferentes tamanhos para logos
+GALLERY_SIZES = [(800, 600), (400, 300), (200, 150)]  # Grande, médio, thumbnail
+GALLERY_SIZE_NAMES = ['large', 'medium', 'thumbnail']
 
 def allowed_file(filename):
     """Verificar se o arquivo tem extensão permitida"""
@@ -27,42 +38,151 @@ def create_upload_folder():
     os.makedirs(upload_path, exist_ok=True)
     return upload_path
 
-def resize_image(image_path, sizes):
-    """Redimensionar imagem para diferentes tamanhos"""
-    resized_paths = []
+def publish_logo(tenant_id, logo_url):
+    """Gravar o logo em TenantConfig e descartar os caches do tenant"""
+    config = TenantConfig.query.filter_by(tenant_id=tenant_id).first()
+    if not config:
+        config = TenantConfig(tenant_id=tenant_id)
+        db.session.add(config)
     
+    config.logo_url = logo_url
+    db.session.commit()
+    invalidate_tenant(Tenant.query.get(tenant_id))
+
+def hash_stream(stream):
+    """SHA-256 do arquivo enviado, lido em blocos"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(64 * 1024), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+def image_dimensions(file_path):
+    """Largura e altura lidas apenas do cabeçalho (None para SVG ou formato desconhecido)"""
     try:
-        with Image.open(image_path) as img:
-            # Converter para RGB se necessário
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
-            
-            base_name = os.path.splitext(image_path)[0]
-            extension = os.path.splitext(image_path)[1]
-            
-            for width, height in sizes:
-                # Redimensionar mantendo proporção
-                img_resized = img.copy()
-                img_resized.thumbnail((width, height), Image.Resampling.LANCZOS)
-                
-                # Criar nova imagem com fundo branco se necessário
-                if img_resized.size != (width, height):
-                    new_img = Image.new('RGB', (width, height), (255, 255, 255))
-                    paste_x = (width - img_resized.width) // 2
-                    paste_y = (height - img_resized.height) // 2
-                    new_img.paste(img_resized, (paste_x, paste_y))
-                    img_resized = new_img
-                
-                # Salvar imagem redimensionada
-                resized_path = f"{base_name}_{width}x{height}{extension}"
-                img_resized.save(resized_path, quality=85, optimize=True)
-                resized_paths.append(resized_path)
+        with Image.open(file_path) as img:
+            return img.size
+    except Exception:
+        return None, None
+
+def is_latest_logo(media):
+    """Verificar se nenhum logo foi enviado depois deste (falhas não contam)"""
+    newer = MediaFile.query.filter(
+        MediaFile.tenant_id == media.tenant_id,
+        MediaFile.kind == 'logo',
+        MediaFile.id > media.id,
+        MediaFile.status != 'failed'
+    ).first()
+    return newer is None
+
+def on_derivatives_ready(job):
+    """Callback do pool: registrar as versões no manifesto e publicar o logo"""
+    media = MediaFile.query.get(job.media_id)
+    if not media:
+        return
+    media.derivatives = json.dumps({name: url for name, url in job.urls.items() if name != 'original'})
+    media.status = 'ready'
+    db.session.commit()
+    # Jobs terminam fora de ordem: um logo mais antigo não substitui o mais recente
+    if job.kind == 'logo' and is_latest_logo(media):
+        publish_logo(job.tenant_id, job.urls['original'])
+
+def on_derivatives_failed(job):
+    """Callback do pool: marcar o arquivo como falho para permitir novo envio"""
+    media = MediaFile.query.get(job.media_id)
+    if media:
+        media.status = 'failed'
+        db.session.commit()
+
+def remove_media_files(media, tenant_folder):
+    """Excluir do disco o original e as versões registradas no manifesto"""
+    folder = os.path.dirname(os.path.join(tenant_folder, media.path))
+    paths = [os.path.join(tenant_folder, media.path)]
+    for name, url in media.derivative_urls.items():
+        urls = url.values() if isinstance(url, dict) else [url]
+        paths.extend(os.path.join(folder, os.path.basename(value)) for value in urls)
     
-    except Exception as e:
-        print(f"Erro ao redimensionar imagem: {e}")
-        return []
+    for path in paths:
+        if os.path.commonpath([os.path.abspath(path), os.path.abspath(tenant_folder)]) != os.path.abspath(tenant_folder):
+            continue
+        if os.path.exists(path):
+            os.remove(path)
+
+def store_upload(tenant, file, kind, subfolder, sizes, size_names):
+    """Gravar o upload, registrá-lo no manifesto e enfileirar as versões
+
+    Conteúdo idêntico já enviado pelo tenant é reaproveitado. Retorna
+    (MediaFile, ImageJob ou None, deduplicado).
+    """
+    content_hash = hash_stream(file.stream)
+    
+    upload_path = create_upload_folder()
+    tenant_folder = os.path.join(upload_path, f'tenant_{tenant.id}')
+    target_folder = os.path.join(tenant_folder, subfolder) if subfolder else tenant_folder
+    os.makedirs(target_folder, exist_ok=True)
+    
+    # Deduplicação por hash do conteúdo
+    existing = MediaFile.query.filter_by(tenant_id=tenant.id, kind=kind, content_hash=content_hash).first()
+    if existing and existing.status != 'failed':
+        return existing, None, True
+    if existing:
+        remove_media_files(existing, tenant_folder)
+        db.session.delete(existing)
+        db.session.commit()
+    
+    file_extension = secure_filename(file.filename).rsplit('.', 1)[1].lower()
+    resize = file_extension != 'svg'
+    
+    # Reservar capacidade no pool antes de gravar qualquer coisa
+    if resize:
+        reserve_slot()
     
-    return resized_paths
+    try:
+        # Gerar nome único e salvar o original
+        unique_filename = f"{kind}_{uuid.uuid4().hex}.{file_extension}"
+        file_path = os.path.join(target_folder, unique_filename)
+        file.save(file_path)
+        
+        relative_path = os.path.relpath(file_path, tenant_folder)
+        url_prefix = f"/static/{UPLOAD_FOLDER}/tenant_{tenant.id}" + (f"/{subfolder}" if subfolder else '')
+        width, height = image_dimensions(file_path) if resize else (None, None)
+        
+        media = MediaFile(
+            tenant_id=tenant.id,
+            kind=kind,
+            filename=unique_filename,
+            path=relative_path,
+            url=f"{url_prefix}/{unique_filename}",
+            size=os.path.getsize(file_path),
+            mime_type=mimetypes.guess_type(file_path)[0],
+            width=width,
+            height=height,
+            content_hash=content_hash,
+            status='processing' if resize else 'ready'
+        )
+        db.session.add(media)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Envio simultâneo do mesmo conteúdo: manter o registro que venceu
+            db.session.rollback()
+            os.remove(file_path)
+            if resize:
+                release_slot()
+            winner = MediaFile.query.filter_by(tenant_id=tenant.id, kind=kind, content_hash=content_hash).first()
+            return winner, None, True
+        
+        job = None
+        if resize:
+            job = submit_job(ImageJob(
+                tenant.id, kind, file_path, sizes, size_names, url_prefix,
+                on_complete=on_derivatives_ready, on_failed=on_derivatives_failed, media_id=media.id
+            ))
+        return media, job, False
+    except Exception:
+        if resize:
+            release_slot()
+        raise
 
 @upload_bp.route('/logo', methods=['POST'])
 @jwt_required()
@@ -93,55 +213,33 @@ def upload_logo():
         if file_size > MAX_FILE_SIZE:
             return jsonify({'error': 'Arquivo muito grande. Máximo 5MB'}), 400
         
-        # Criar pasta de uploads
-        upload_path = create_upload_folder()
-        tenant_folder = os.path.join(upload_path, f'tenant_{tenant.id}')
-        os.makedirs(tenant_folder, exist_ok=True)
-        
-        # Gerar nome único para o arquivo
-        file_extension = secure_filename(file.filename).rsplit('.', 1)[1].lower()
-        unique_filename = f"logo_{uuid.uuid4().hex}.{file_extension}"
-        file_path = os.path.join(tenant_folder, unique_filename)
-        
-        # Salvar arquivo original
-        file.save(file_path)
-        
-        # Redimensionar para diferentes tamanhos (apenas para imagens não SVG)
-        resized_paths = []
-        if file_extension != 'svg':
-            resized_paths = resize_image(file_path, LOGO_SIZES)
-        
-        # Gerar URLs públicas
-        base_url = f"/static/{UPLOAD_FOLDER}/tenant_{tenant.id}/{unique_filename}"
-        logo_urls = {
-            'original': base_url
-        }
-        
-        # Adicionar URLs das versões redimensionadas
-        for i, (width, height) in enumerate(LOGO_SIZES):
-            if i < len(resized_paths):
-                resized_filename = os.path.basename(resized_paths[i])
-                logo_urls[f'{width}x{height}'] = f"/static/{UPLOAD_FOLDER}/tenant_{tenant.id}/{resized_filename}"
-        
-        # Atualizar configuração do tenant
-        config = TenantConfig.query.filter_by(tenant_id=tenant.id).first()
-        if not config:
-            config = TenantConfig(tenant_id=tenant.id)
-            db.session.add(config)
-        
-        config.logo_url = logo_urls['original']
-        db.session.commit()
-        
+        media, job, deduplicated = store_upload(
+            tenant, file, 'logo', None, LOGO_SIZES,
+            [f'{width}x{height}' for width, height in LOGO_SIZES]
+        )
+        
+        # SVG, ou conteúdo já processado: publicar imediatamente
+        if job is None:
+            if media.status == 'ready':
+                publish_logo(tenant.id, media.url)
+            return jsonify({
+                'message': 'Logo enviado com sucesso',
+                'logo_urls': media.urls,
+                'media': media.to_dict(),
+                'deduplicated': deduplicated
+            }), 200
+        
+        # Versões geradas no pool; o logo é publicado ao final
         return jsonify({
-            'message': 'Logo enviado com sucesso',
-            'logo_urls': logo_urls,
-            'file_info': {
-                'filename': unique_filename,
-                'size': file_size,
-                'type': mimetypes.guess_type(file_path)[0]
-            }
-        }), 200
-        
+            'message': 'Logo enviado; versões em processamento',
+            'logo_urls': job.urls,
+            'media': media.to_dict(),
+            'job': job.to_dict(),
+            'status_url': f'/api/upload/jobs/{job.id}'
+        }), 202
+        
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Erro ao fazer upload: {str(e)}'}), 500
@@ -175,48 +273,50 @@ def upload_gallery_image():
         if file_size > MAX_FILE_SIZE:
             return jsonify({'error': 'Arquivo muito grande. Máximo 5MB'}), 400
         
-        # Criar pasta de uploads
-        upload_path = create_upload_folder()
-        tenant_folder = os.path.join(upload_path, f'tenant_{tenant.id}', 'gallery')
-        os.makedirs(tenant_folder, exist_ok=True)
-        
-        # Gerar nome único para o arquivo
-        file_extension = secure_filename(file.filename).rsplit('.', 1)[1].lower()
-        unique_filename = f"gallery_{uuid.uuid4().hex}.{file_extension}"
-        file_path = os.path.join(tenant_folder, unique_filename)
+        media, job, deduplicated = store_upload(
+            tenant, file, 'gallery', 'gallery', GALLERY_SIZES, GALLERY_SIZE_NAMES
+        )
         
-        # Salvar arquivo original
-        file.save(file_path)
+        if job is None:
+            return jsonify({
+                'message': 'Imagem enviada com sucesso',
+                'image_urls': media.urls,
+                'media': media.to_dict(),
+                'deduplicated': deduplicated
+            }), 200
         
-        # Redimensionar para galeria (tamanhos específicos)
-        gallery_sizes = [(800, 600), (400, 300), (200, 150)]  # Grande, médio, thumbnail
-        resized_paths = resize_image(file_path, gallery_sizes)
-        
-        # Gerar URLs públicas
-        base_url = f"/static/{UPLOAD_FOLDER}/tenant_{tenant.id}/gallery/{unique_filename}"
-        image_urls = {
-            'original': base_url
-        }
+        # Versões para galeria geradas no pool de imagens
+        return jsonify({
+            'message': 'Imagem enviada; versões em processamento',
+            'image_urls': job.urls,
+            'media': media.to_dict(),
+            'job': job.to_dict(),
+            'status_url': f'/api/upload/jobs/{job.id}'
+        }), 202
+        
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Erro ao fazer upload: {str(e)}'}), 500
+
+@upload_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_upload_job(job_id):
+    """Consultar o processamento das versões de um upload"""
+    try:
+        tenant = get_current_tenant()
+        if not tenant:
+            return jsonify({'error': 'Tenant não encontrado'}), 404
         
-        # Adicionar URLs das versões redimensionadas
-        size_names = ['large', 'medium', 'thumbnail']
-        for i, (width, height) in enumerate(gallery_sizes):
-            if i < len(resized_paths):
-                resized_filename = os.path.basename(resized_paths[i])
-                image_urls[size_names[i]] = f"/static/{UPLOAD_FOLDER}/tenant_{tenant.id}/gallery/{resized_filename}"
+        job = get_job(job_id, tenant.id)
+        if not job:
+            return jsonify({'error': 'Job não encontrado'}), 404
         
-        return jsonify({
-            'message': 'Imagem enviada com sucesso',
-            'image_urls': image_urls,
-            'file_info': {
-                'filename': unique_filename,
-                'size': file_size,
-                'type': mimetypes.guess_type(file_path)[0]
-            }
-        }), 200
+        return jsonify({'job': job.to_dict()}), 200
         
     except Exception as e:
-        return jsonify({'error': f'Erro ao fazer upload: {str(e)}'}), 500
+        return jsonify({'error': str(e)}), 500
 
 @upload_bp.route('/files/<path:filename>', methods=['DELETE'])
 @jwt_required()
@@ -227,9 +327,22 @@ def delete_file(filename):
         if not tenant:
             return jsonify({'error': 'Tenant não encontrado'}), 404
         
-        # Construir caminho do arquivo
         upload_path = create_upload_folder()
         tenant_folder = os.path.join(upload_path, f'tenant_{tenant.id}')
+        
+        # Arquivo registrado no manifesto: excluir original, versões e registro
+        media = MediaFile.query.filter_by(
+            tenant_id=tenant.id,
+            filename=secure_filename(os.path.basename(filename))
+        ).first()
+        
+        if media:
+            remove_media_files(media, tenant_folder)
+            db.session.delete(media)
+            db.session.commit()
+            return jsonify({'message': 'Arquivo excluído com sucesso'}), 200
+        
+        # Arquivos antigos, anteriores ao manifesto
         file_path = os.path.join(tenant_folder, secure_filename(filename))
         
         # Verificar se arquivo existe e pertence ao tenant
@@ -247,14 +360,15 @@ def delete_file(filename):
         base_name = os.path.splitext(file_path)[0]
         extension = os.path.splitext(file_path)[1]
         
-        for width, height in LOGO_SIZES + [(800, 600), (400, 300), (200, 150)]:
-            resized_path = f"{base_name}_{width}x{height}{extension}"
-            if os.path.exists(resized_path):
-                os.remove(resized_path)
+        for width, height in LOGO_SIZES + GALLERY_SIZES:
+            for resized_path in (f"{base_name}_{width}x{height}{extension}", f"{base_name}_{width}x{height}.webp"):
+                if os.path.exists(resized_path):
+                    os.remove(resized_path)
         
         return jsonify({'message': 'Arquivo excluído com sucesso'}), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': f'Erro ao excluir arquivo: {str(e)}'}), 500
 
 @upload_bp.route('/files', methods=['GET'])
@@ -266,40 +380,122 @@ def list_files():
         if not tenant:
             return jsonify({'error': 'Tenant não encontrado'}), 404
         
-        # Construir caminho da pasta do tenant
-        upload_path = create_upload_folder()
-        tenant_folder = os.path.join(upload_path, f'tenant_{tenant.id}')
-        
-        files = []
-        
-        if os.path.exists(tenant_folder):
-            for root, dirs, filenames in os.walk(tenant_folder):
-                for filename in filenames:
-                    # Pular arquivos redimensionados (que contêm dimensões no nome)
-                    if '_' in filename and 'x' in filename.split('_')[-1]:
-                        continue
-                    
-                    file_path = os.path.join(root, filename)
-                    relative_path = os.path.relpath(file_path, tenant_folder)
-                    
-                    # Obter informações do arquivo
-                    stat = os.stat(file_path)
-                    file_info = {
-                        'filename': filename,
-                        'path': relative_path,
-                        'size': stat.st_size,
-                        'created_at': stat.st_ctime,
-                        'type': mimetypes.guess_type(file_path)[0],
-                        'url': f"/static/{UPLOAD_FOLDER}/tenant_{tenant.id}/{relative_path}"
-                    }
-                    
-                    files.append(file_info)
+        page = int(request.args.get('page', 1))
+        per_page = min(int(request.args.get('per_page', 20)), 100)
+        kind = request.args.get('kind')
+        
+        # Consulta indexada no manifesto por (tenant_id, created_at, id)
+        query = MediaFile.query.filter_by(tenant_id=tenant.id)
+        if kind:
+            query = query.filter_by(kind=kind)
+        
+        # Paginação por cursor (opt-in): mais recentes primeiro
+        if 'cursor' in request.args:
+            files, next_cursor, total = paginate_keyset(
+                query,
+                [MediaFile.created_at, MediaFile.id],
+                cursor=request.args.get('cursor'),
+                per_page=per_page,
+                descending=True,
+                include_total=request.args.get('include_total', 'true').lower() == 'true'
+            )
+            
+            return jsonify({
+                'files': [media.to_dict() for media in files],
+                'next_cursor': next_cursor,
+                'total': total,
+                'per_page': per_page
+            }), 200
+        
+        pagination = query.order_by(MediaFile.created_at.desc(), MediaFile.id.desc()).paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
         
         return jsonify({
-            'files': files,
-            'total': len(files)
+            'files': [media.to_dict() for media in pagination.items],
+            'total': pagination.total,
+            'pages': pagination.pages,
+            'current_page': page,
+            'per_page': per_page
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': 'Parâmetros inválidos: ' + str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro ao listar arquivos: {str(e)}'}), 500
 
+# Versões geradas seguem o padrão <original>_<largura>x<altura>.<ext>
+DERIVATIVE_PATTERN = re.compile(r'_\d+x\d+\.\w+$')
+
+@upload_bp.cli.command('index-media')
+@click.option('--tenant-id', type=int, default=None, help='Indexar apenas um tenant')
+def index_media_command(tenant_id):
+    """Registrar no manifesto os arquivos enviados antes da sua criação"""
+    upload_path = create_upload_folder()
+    tenant_ids = [tenant_id] if tenant_id is not None else [row[0] for row in db.session.query(Tenant.id)]
+    
+    for current_tenant_id in tenant_ids:
+        tenant_folder = os.path.join(upload_path, f'tenant_{current_tenant_id}')
+        if not os.path.exists(tenant_folder):
+            continue
+        
+        known = {
+            (kind, content_hash)
+            for kind, content_hash in db.session.query(MediaFile.kind, MediaFile.content_hash).filter_by(
+                tenant_id=current_tenant_id
+            )
+        }
+        known_files = {
+            filename for (filename,) in db.session.query(MediaFile.filename).filter_by(tenant_id=current_tenant_id)
+        }
+        
+        added = 0
+        for root, dirs, filenames in os.walk(tenant_folder):
+            for filename in filenames:
+                if DERIVATIVE_PATTERN.search(filename) or filename in known_files:
+                    continue
+                
+                file_path = os.path.join(root, filename)
+                relative_path = os.path.relpath(file_path, tenant_folder)
+                kind = 'gallery' if filename.startswith('gallery_') else 'logo'
+                with open(file_path, 'rb') as stream:
+                    content_hash = hash_stream(stream)
+                if (kind, content_hash) in known:
+                    continue
+                
+                base_name, extension = os.path.splitext(file_path)
+                sizes, names = (GALLERY_SIZES, GALLERY_SIZE_NAMES) if kind == 'gallery' else \
+                    (LOGO_SIZES, [f'{width}x{height}' for width, height in LOGO_SIZES])
+                url_prefix = f"/static/{UPLOAD_FOLDER}/tenant_{current_tenant_id}/" + os.path.dirname(relative_path)
+                url_prefix = url_prefix.rstrip('/')
+                
+                derivatives = {}
+                for (width, height), name in zip(sizes, names):
+                    for suffix, target in ((extension, derivatives), ('.webp', derivatives.setdefault('webp', {}))):
+                        if os.path.exists(f"{base_name}_{width}x{height}{suffix}"):
+                            target[name] = f"{url_prefix}/{os.path.basename(base_name)}_{width}x{height}{suffix}"
+                if not derivatives['webp']:
+                    del derivatives['webp']
+                
+                width, height = image_dimensions(file_path)
+                db.session.add(MediaFile(
+                    tenant_id=current_tenant_id,
+                    kind=kind,
+                    filename=filename,
+                    path=relative_path,
+                    url=f"{url_prefix}/{filename}",
+                    size=os.path.getsize(file_path),
+                    mime_type=mimetypes.guess_type(file_path)[0],
+                    width=width,
+                    height=height,
+                    content_hash=content_hash,
+                    derivatives=json.dumps(derivatives) if derivatives else None,
+                    status='ready'
+                ))
+                known.add((kind, content_hash))
+                added += 1
+        
+        db.session.commit()
+        click.echo(f'Tenant {current_tenant_id}: {added} arquivos indexados')